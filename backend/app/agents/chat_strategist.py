@@ -6,12 +6,19 @@ Conducts buyer preference discovery conversation.
 import logging
 from collections.abc import AsyncGenerator
 
-from openai import AsyncOpenAI
+from openai import AsyncStream
+from openai.types.chat import ChatCompletionChunk
 
-from app.core.config import settings
+from app.agents import resilience
+from app.agents.llm import get_client
+from app.agents.resilience import CircuitOpenError
+from app.agents.scheduler import Priority, estimate_tokens, scheduler
 
 logger = logging.getLogger(__name__)
 
+MODEL = "gpt-4o-mini"
+MAX_TOKENS = 500
+
 SYSTEM_PROMPT = """\
 You are a warm, knowledgeable real estate assistant helping a home buyer \
 discover and refine their ideal property preferences. Your name is Mia.
@@ -40,6 +47,22 @@ Guidelines:
 - If they seem done or satisfied, offer to wrap up and summarize
 """
 
+CONVERSATION_SUMMARY_CONTEXT = """
+Summary of the earlier part of this conversation (the most recent messages \
+follow verbatim):
+{conversation_summary}
+"""
+
+SUMMARY_PROMPT = """\
+You maintain a running summary of a chat between a home buyer and Mia, a \
+real estate assistant. Update the existing summary with the new messages. \
+Keep every preference, requirement, confirmation and open question the \
+buyer mentioned; drop pleasantries. Write at most 150 words of plain prose \
+and reply with the updated summary only.
+"""
+
+SUMMARY_MAX_TOKENS = 300
+
 
 def build_preferences_context(preferences: list[dict]) -> str:
     """Format preferences into readable context for the system prompt."""
@@ -55,39 +78,98 @@ def build_preferences_context(preferences: list[dict]) -> str:
 
 async def stream_chat_response(
     messages: list[dict],
-    preferences: list[dict],
+    preferences_context: str,
+    conversation_summary: str | None = None,
 ) -> AsyncGenerator[str, None]:
     """
     Stream chat response tokens from OpenAI.
 
     Args:
-        messages: Chat history as [{"role": "user"|"assistant", "content": "..."}]
-        preferences: List of preference dicts for context
+        messages: Recent chat history as [{"role": "user"|"assistant", "content": "..."}]
+        preferences_context: Preferences rendered by ``build_preferences_context``
+        conversation_summary: Rolling summary of turns older than ``messages``
 
     Yields:
         String tokens as they arrive from OpenAI
     """
-    client = AsyncOpenAI(api_key=settings.openai_api_key)
+    client = get_client()
 
-    prefs_context = build_preferences_context(preferences)
-    system_msg = SYSTEM_PROMPT.format(preferences_context=prefs_context)
+    system_msg = SYSTEM_PROMPT.format(preferences_context=preferences_context)
+    if conversation_summary:
+        system_msg += CONVERSATION_SUMMARY_CONTEXT.format(
+            conversation_summary=conversation_summary
+        )
 
     full_messages = [{"role": "system", "content": system_msg}] + messages
 
     try:
-        stream = await client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=full_messages,
-            stream=True,
-            max_tokens=500,
-            temperature=0.8,
-        )
-
-        async for chunk in stream:
-            delta = chunk.choices[0].delta
-            if delta.content:
-                yield delta.content
 
+        async def open_stream() -> AsyncStream[ChatCompletionChunk]:
+            async with scheduler.slot(
+                Priority.chat, estimate_tokens(full_messages, MAX_TOKENS)
+            ):
+                return await client.chat.completions.create(
+                    model=MODEL,
+                    messages=full_messages,  # type: ignore[arg-type]
+                    stream=True,
+                    max_tokens=MAX_TOKENS,
+                    temperature=0.8,
+                )
+
+        # Only opening the stream is retried — once tokens have been
+        # yielded a retry would repeat them.
+        stream = await resilience.call(MODEL, "chat_open", open_stream)
+
+        # Closing the stream (including on cancellation) drops the HTTP
+        # response, which stops generation upstream
+        async with stream:
+            async for chunk in stream:
+                delta = chunk.choices[0].delta
+                if delta.content:
+                    yield delta.content
+
+    except CircuitOpenError:
+        logger.warning("OpenAI circuit open; chat reply unavailable")
+        yield "I'm sorry, I'm having trouble responding right now. Please try again."
     except Exception:
         logger.exception("Chat strategist streaming failed")
         yield "I'm sorry, I'm having trouble responding right now. Please try again."
+
+
+async def summarize_conversation(
+    previous_summary: str | None,
+    messages: list[dict],
+) -> str:
+    """
+    Fold ``messages`` into the rolling conversation summary.
+
+    Raises on OpenAI errors so the caller keeps the previous summary.
+    """
+    client = get_client()
+    transcript = "\n".join(
+        f"{m['role'].capitalize()}: {m['content']}" for m in messages
+    )
+    summary_messages = [
+        {"role": "system", "content": SUMMARY_PROMPT},
+        {
+            "role": "user",
+            "content": (
+                f"Existing summary:\n{previous_summary or '(none yet)'}\n\n"
+                f"New messages:\n{transcript}"
+            ),
+        },
+    ]
+
+    async def attempt() -> str:
+        async with scheduler.slot(
+            Priority.background, estimate_tokens(summary_messages, SUMMARY_MAX_TOKENS)
+        ):
+            response = await client.chat.completions.create(
+                model=MODEL,
+                messages=summary_messages,  # type: ignore[arg-type]
+                max_tokens=SUMMARY_MAX_TOKENS,
+                temperature=0.2,
+            )
+        return (response.choices[0].message.content or "").strip()
+
+    return await resilience.call(MODEL, "chat_summary", attempt)
@@ -0,0 +1,238 @@
+"""
+Offline keyword/pattern preference extraction.
+
+Pulls the most common, most mechanical preferences — budget, bedrooms,
+bathrooms, property type, location, commute, schools and pets — out of a
+transcript with precompiled patterns and a small category lexicon, without
+calling OpenAI. Output has the same shape as the LLM parser's
+``ExtractedPreference`` dicts.
+
+Used as an instant draft returned with the transcript upload while the LLM
+parse runs, and as the degraded result when the LLM is unavailable. It
+scans buyer turns only (unlabelled text counts as the buyer's) and runs in
+a few milliseconds even on long transcripts.
+"""
+
+import re
+from typing import Any
+
+# A speaker label at the start of a line, e.g. "Agent:", "[00:12] Buyer (Sam):"
+_SPEAKER = re.compile(
+    r"^[ \t]*(?:\[?\d{1,2}:\d{2}(?::\d{2})?\]?[ \t]*)?([A-Za-z][\w .'()-]{0,40}):",
+    re.MULTILINE,
+)
+_AGENT_LABEL = re.compile(r"\b(agent|realtor|broker|assistant|interviewer)\b", re.IGNORECASE)
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+|\n+")
+
+_HEDGE = re.compile(
+    r"\b(maybe|not sure|possibly|perhaps|might|open to|flexible|i guess|probably)\b",
+    re.IGNORECASE,
+)
+_FIRM = re.compile(
+    r"\b(must|need(s|ed)?|have to|has to|at least|no more than|non[- ]?negotiable|"
+    r"definitely|absolutely|require[ds]?)\b",
+    re.IGNORECASE,
+)
+
+_NUMBER_WORDS = {
+    "one": "1",
+    "two": "2",
+    "three": "3",
+    "four": "4",
+    "five": "5",
+    "six": "6",
+}
+_COUNT = r"(\d+(?:\.5)?|one|two|three|four|five|six)"
+_QUALIFIER = r"(?:(at least|minimum of|min(?:imum)?|no more than|at most|up to)\s+)?"
+
+_MONEY = r"\$?\s?\d[\d,]*(?:\.\d+)?\s*(?:k|m|mil|million|thousand)?\b"
+_BUDGET = re.compile(
+    rf"(?:(under|below|less than|up to|max(?:imum)?|no more than|around|about|"
+    rf"roughly|between|over|at least)\s+)?"
+    rf"({_MONEY})(?:\s*(?:-|to|and)\s*({_MONEY}))?",
+    re.IGNORECASE,
+)
+# A bare number only counts as money with a currency sign, a magnitude
+# suffix or a budget word in the same sentence
+_MONEY_SIGNAL = re.compile(r"\$|\d\s*(?:k|m|mil|million|thousand)\b", re.IGNORECASE)
+_YEAR = re.compile(r"(?:19|20)\d{2}")
+_BUDGET_WORD = re.compile(r"\b(budget|afford|spend|price|pre-?approved|mortgage)\b", re.IGNORECASE)
+# Units after a number that make it a count of something else ("3 bedrooms")
+_NOT_MONEY_UNIT = re.compile(
+    r"\s*\+?\s*-?\s*(bed|br\b|bath|ba\b|min|hour|hr|year|kid|child|car)", re.IGNORECASE
+)
+
+_BEDROOMS = re.compile(
+    rf"{_QUALIFIER}{_COUNT}\s*\+?\s*(?:-\s*)?(?:bed(?:room)?s?|br)\b", re.IGNORECASE
+)
+_BATHROOMS = re.compile(
+    rf"{_QUALIFIER}{_COUNT}(\s+and a half)?\s*\+?\s*(?:-\s*)?(?:bath(?:room)?s?|ba)\b",
+    re.IGNORECASE,
+)
+
+_PROPERTY_TYPES = {
+    "single-family home": r"single[- ]family(?: home| house)?|detached (?:home|house)",
+    "condo": r"condo(?:minium)?s?",
+    "townhouse": r"town ?(?:house|home)s?",
+    "duplex": r"duplex(?:es)?",
+    "multi-family": r"multi[- ]family",
+    "ranch": r"ranch(?:-style)?(?: home| house)?",
+    "bungalow": r"bungalows?",
+    "colonial": r"colonials?",
+    "new construction": r"new (?:construction|build)s?",
+    "loft": r"lofts?",
+    "apartment": r"apartments?",
+}
+_PROPERTY_TYPE = re.compile(
+    "|".join(rf"(?P<t{i}>\b(?:{p})\b)" for i, p in enumerate(_PROPERTY_TYPES.values())),
+    re.IGNORECASE,
+)
+_PROPERTY_TYPE_NAMES = list(_PROPERTY_TYPES)
+
+_LOCATION = re.compile(
+    r"\b(?:in|near|around|close to|live in|move to|looking at)\s+"
+    r"((?:the\s+)?[A-Z][\w'-]+(?:\s+(?:[A-Z][\w'-]+|of|on))*(?:\s+[A-Z][\w'-]+)?)"
+)
+_NOT_PLACES = {
+    "I", "The", "A", "An", "We", "My", "Our", "It", "That", "This",
+    "January", "February", "March", "April", "May", "June", "July", "August",
+    "September", "October", "November", "December", "Spring", "Summer", "Fall",
+    "Winter", "Monday", "Tuesday", "Wednesday", "Thursday", "Friday",
+    "Saturday", "Sunday",
+}
+
+_COMMUTE = re.compile(
+    r"\b(?:commute|drive|driving|get to work)\b[^.!?\n]{0,40}?"
+    r"(\d+)\s*(min(?:ute)?s?|hours?|hrs?)\b"
+    r"|\b(\d+)[- ]?(min(?:ute)?s?|hours?|hrs?)\s+(?:commute|drive)\b",
+    re.IGNORECASE,
+)
+
+_SCHOOLS = re.compile(
+    r"\b((?:good|great|top|strong|excellent|highly[- ]rated|best|decent)\s+)?"
+    r"(school district|schools?)\b",
+    re.IGNORECASE,
+)
+
+_PETS = re.compile(r"\b(dogs?|cats?|pets?|puppy|puppies|kittens?)\b", re.IGNORECASE)
+
+_CONFIDENCE_RANK = {"low": 0, "medium": 1, "high": 2}
+
+
+def _buyer_text(raw_text: str) -> str:
+    """Drop the turns spoken by the agent; keep everything else."""
+    labels = list(_SPEAKER.finditer(raw_text))
+    if not labels:
+        return raw_text
+    parts = [raw_text[: labels[0].start()]]
+    for label, following in zip(labels, labels[1:] + [None]):
+        end = following.start() if following else len(raw_text)
+        if not _AGENT_LABEL.search(label.group(1)):
+            parts.append(raw_text[label.end() : end])
+    return "\n".join(parts)
+
+
+def _confidences(sentence: str) -> tuple[str, str]:
+    """Confidence for (explicit, implied) statements in ``sentence``."""
+    if _HEDGE.search(sentence):
+        return "low", "low"
+    if _FIRM.search(sentence):
+        return "high", "high"
+    return "high", "medium"
+
+
+def _count(word: str) -> str:
+    return _NUMBER_WORDS.get(word.lower(), word)
+
+
+def _with_qualifier(qualifier: str | None, value: str) -> str:
+    return f"{qualifier.lower()} {value}" if qualifier else value
+
+
+def _sentence_preferences(sentence: str) -> list[tuple[str, str, bool]]:
+    """(category, value, explicit) for every match in one sentence."""
+    found: list[tuple[str, str, bool]] = []
+    lower = sentence.lower()
+    # Cheap substring checks skip the patterns that cannot match
+    has_digit = any(c.isdigit() for c in sentence)
+    has_count = has_digit or any(w in lower for w in _NUMBER_WORDS)
+
+    has_budget_word = has_digit and _BUDGET_WORD.search(sentence) is not None
+    for m in _BUDGET.finditer(sentence) if has_digit else ():
+        qualifier, low, high = m.group(1), m.group(2).strip(), m.group(3)
+        money_text = m.group(0)
+        has_money_signal = _MONEY_SIGNAL.search(money_text) is not None
+        if not (has_money_signal or has_budget_word):
+            continue
+        # "move by 2025" next to a budget word is a date, not a price
+        if not has_money_signal and _YEAR.fullmatch(low):
+            continue
+        # Skip counts that belong to other categories ("3 bedrooms")
+        if _NOT_MONEY_UNIT.match(sentence, m.end()):
+            continue
+        value = f"{low}-{high.strip()}" if high else low
+        found.append(("budget", _with_qualifier(qualifier, value), True))
+
+    if has_count and ("bed" in lower or "br" in lower):
+        for m in _BEDROOMS.finditer(sentence):
+            value = _with_qualifier(m.group(1), f"{_count(m.group(2))} bedrooms")
+            found.append(("bedrooms", value, True))
+
+    if has_count and "ba" in lower:
+        for m in _BATHROOMS.finditer(sentence):
+            count = _count(m.group(2)) + (".5" if m.group(3) else "")
+            value = _with_qualifier(m.group(1), f"{count} bathrooms")
+            found.append(("bathrooms", value, True))
+
+    for m in _PROPERTY_TYPE.finditer(sentence):
+        name = _PROPERTY_TYPE_NAMES[int(m.lastgroup[1:])]  # type: ignore[index]
+        found.append(("property_type", name, False))
+
+    for m in _LOCATION.finditer(sentence):
+        place = m.group(1)
+        if place.split()[0] in _NOT_PLACES:
+            continue
+        found.append(("location", place, False))
+
+    for m in _COMMUTE.finditer(sentence) if has_digit else ():
+        amount, unit = (m.group(1), m.group(2)) if m.group(1) else (m.group(3), m.group(4))
+        unit = "hours" if unit.lower().startswith("h") else "minutes"
+        found.append(("commute", f"commute under {amount} {unit}", True))
+
+    m = _SCHOOLS.search(sentence)
+    if m:
+        value = f"{(m.group(1) or '').strip().lower()} {m.group(2).lower()}".strip()
+        found.append(("schools", value, m.group(1) is not None))
+
+    pets = sorted({p.lower().rstrip("s") for p in _PETS.findall(sentence)})
+    if pets:
+        found.append(("pets", "pet-friendly (" + ", ".join(pets) + ")", False))
+
+    return found
+
+
+def extract_keyword_preferences(raw_text: str) -> list[dict[str, Any]]:
+    """
+    Extract preferences from a transcript with local patterns only.
+
+    Returns ``{"category", "value", "confidence"}`` dicts, deduplicated on
+    category and value with the highest confidence kept.
+    """
+    merged: dict[tuple[str, str], dict[str, Any]] = {}
+    for sentence in _SENTENCE_END.split(_buyer_text(raw_text)):
+        if not sentence.strip():
+            continue
+        found = _sentence_preferences(sentence)
+        if not found:
+            continue
+        explicit_confidence, implied_confidence = _confidences(sentence)
+        for category, value, explicit in found:
+            confidence = explicit_confidence if explicit else implied_confidence
+            key = (category, " ".join(value.lower().split()))
+            existing = merged.get(key)
+            if existing is None:
+                merged[key] = {"category": category, "value": value, "confidence": confidence}
+            elif _CONFIDENCE_RANK[confidence] > _CONFIDENCE_RANK[existing["confidence"]]:
+                existing["confidence"] = confidence
+    return list(merged.values())
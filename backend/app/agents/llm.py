@@ -0,0 +1,62 @@
+"""
+Shared OpenAI client gateway for all agents.
+
+One long-lived ``AsyncOpenAI`` client per process, backed by a tuned httpx
+connection pool (HTTP/2, keep-alive) so agent calls reuse warm connections
+instead of paying TLS and connection setup on every request. The client is
+created and closed by the FastAPI lifespan hook; ``OPENAI_BASE_URL`` points
+it at any OpenAI-compatible server, e.g. a local stand-in.
+"""
+
+import logging
+
+import httpx
+from openai import AsyncOpenAI
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_client: AsyncOpenAI | None = None
+
+
+def _build_client() -> AsyncOpenAI:
+    http_client = httpx.AsyncClient(
+        http2=settings.llm_http2,
+        limits=httpx.Limits(
+            max_connections=settings.llm_max_connections,
+            max_keepalive_connections=settings.llm_max_keepalive_connections,
+            keepalive_expiry=settings.llm_keepalive_expiry_seconds,
+        ),
+        timeout=httpx.Timeout(
+            settings.llm_timeout_seconds,
+            connect=settings.llm_connect_timeout_seconds,
+        ),
+    )
+    return AsyncOpenAI(
+        api_key=settings.openai_api_key,
+        base_url=settings.openai_base_url or None,
+        http_client=http_client,
+        # Retries are handled by app.agents.resilience
+        max_retries=0,
+    )
+
+
+def get_client() -> AsyncOpenAI:
+    """Return the process-wide client, creating it on first use."""
+    global _client
+    if _client is None:
+        _client = _build_client()
+    return _client
+
+
+async def startup() -> None:
+    get_client()
+    logger.info("LLM client ready (base_url=%s)", get_client().base_url)
+
+
+async def shutdown() -> None:
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
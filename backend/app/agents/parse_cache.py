@@ -0,0 +1,133 @@
+"""
+Content-addressed cache for transcript parse results.
+
+Keys are a hash of the parser version plus the whitespace-normalized
+transcript, so re-pasting the same conversation skips the OpenAI call. An
+in-process LRU sits in front of the ``parse_cache`` Postgres table; both
+tiers honour the same TTL and are bounded in size.
+"""
+
+import copy
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import delete
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.agents.transcript_parser import PARSER_VERSION
+from app.core.config import settings
+from app.core.database import async_session
+from app.core.metrics import metrics
+from app.models.parse_cache import ParseCacheEntry
+
+logger = logging.getLogger(__name__)
+
+
+def cache_key(raw_text: str) -> str:
+    """Hash the parser version and the transcript with whitespace collapsed."""
+    normalized = " ".join(raw_text.split())
+    return hashlib.sha256(f"{PARSER_VERSION}\n{normalized}".encode()).hexdigest()
+
+
+class ParseCache:
+    def __init__(self, max_entries: int, max_rows: int, ttl_seconds: int) -> None:
+        self._max_entries = max_entries
+        self._max_rows = max_rows
+        self._ttl = ttl_seconds
+        # key -> (expires_at on the monotonic clock, result)
+        self._memory: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+        metrics.gauge("parse_cache.memory_entries", lambda: len(self._memory))
+
+    def _remember(self, key: str, result: dict[str, Any], ttl: float) -> None:
+        self._memory[key] = (time.monotonic() + ttl, result)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self._max_entries:
+            self._memory.popitem(last=False)
+            metrics.inc("parse_cache.evictions.memory")
+
+    async def get(self, key: str) -> dict[str, Any] | None:
+        entry = self._memory.get(key)
+        if entry is not None:
+            expires_at, result = entry
+            if expires_at > time.monotonic():
+                self._memory.move_to_end(key)
+                metrics.inc("parse_cache.hits.memory")
+                return copy.deepcopy(result)
+            del self._memory[key]
+            metrics.inc("parse_cache.evictions.memory")
+
+        now = datetime.now(timezone.utc)
+        try:
+            async with async_session() as db:
+                row = await db.get(ParseCacheEntry, key)
+                remaining = (
+                    self._ttl - (now - row.created_at).total_seconds() if row else 0
+                )
+                if row is not None and remaining > 0:
+                    row.last_hit_at = now
+                    db.add(row)
+                    await db.commit()
+                    self._remember(key, row.result, remaining)
+                    metrics.inc("parse_cache.hits.db")
+                    return copy.deepcopy(row.result)
+        except Exception:
+            logger.exception("Parse cache lookup failed")
+
+        metrics.inc("parse_cache.misses")
+        return None
+
+    async def put(self, key: str, result: dict[str, Any]) -> None:
+        # Never cache an empty result — it is what a failed parse looks like
+        if not result.get("preferences") and not result.get("summary"):
+            return
+
+        self._remember(key, copy.deepcopy(result), self._ttl)
+        now = datetime.now(timezone.utc)
+        try:
+            async with async_session() as db:
+                await db.exec(
+                    insert(ParseCacheEntry)
+                    .values(key=key, result=result, created_at=now, last_hit_at=now)
+                    .on_conflict_do_update(
+                        index_elements=["key"],
+                        set_={"result": result, "created_at": now, "last_hit_at": now},
+                    )
+                )
+                evicted = await self._prune(db, now)
+                await db.commit()
+            if evicted:
+                metrics.inc("parse_cache.evictions.db", evicted)
+        except Exception:
+            logger.exception("Parse cache write failed")
+
+    async def _prune(self, db: AsyncSession, now: datetime) -> int:
+        """Drop expired rows, then the least recently hit rows over the size cap."""
+        expired = await db.exec(
+            delete(ParseCacheEntry).where(
+                ParseCacheEntry.created_at < now - timedelta(seconds=self._ttl)  # type: ignore[arg-type, operator]
+            )
+        )
+        overflow_keys = (
+            select(ParseCacheEntry.key)
+            .order_by(ParseCacheEntry.last_hit_at.desc())  # type: ignore[attr-defined]
+            .offset(self._max_rows)
+        )
+        overflow = await db.exec(
+            delete(ParseCacheEntry).where(
+                ParseCacheEntry.key.in_(overflow_keys)  # type: ignore[attr-defined]
+            )
+        )
+        return expired.rowcount + overflow.rowcount
+
+
+parse_cache = ParseCache(
+    max_entries=settings.parse_cache_max_entries,
+    max_rows=settings.parse_cache_max_rows,
+    ttl_seconds=settings.parse_cache_ttl_seconds,
+)
@@ -0,0 +1,120 @@
+"""
+Per-turn chat preference extraction agent using OpenAI structured output.
+
+Runs after each assistant reply on just the newest user/assistant exchange
+plus the preferences already known for the session, and reports what the
+buyer stated in that exchange: either a restatement of a known preference
+(by its number in the list) or a new one.
+"""
+
+import logging
+from typing import Any
+
+from pydantic import BaseModel
+
+from app.agents import resilience
+from app.agents.llm import get_client
+from app.agents.scheduler import Priority, estimate_tokens, scheduler
+
+logger = logging.getLogger(__name__)
+
+MODEL = "gpt-4o-mini"
+# Budgeted completion size for the scheduler's tokens-per-minute estimate
+EXPECTED_OUTPUT_TOKENS = 300
+
+SYSTEM_PROMPT = """\
+You track a home buyer's preferences during a chat with a real estate \
+assistant. You receive the numbered list of preferences already known and \
+the latest exchange (one buyer message and the assistant's reply).
+
+Report every preference the BUYER states or clearly implies in their \
+message. Ignore anything only the assistant said.
+- If it restates or confirms a known preference, set "existing" to that \
+  preference's number and repeat its category and value unchanged.
+- Otherwise set "existing" to null and give a short category (e.g. budget, \
+  location, bedrooms, amenities, commute, schools) and a concise value.
+- Assign a confidence: "high" when stated explicitly, "medium" when \
+  implied, "low" when vague or uncertain.
+
+Return an empty list if the buyer's message contains no preferences.
+"""
+
+
+# ── Pydantic models for OpenAI structured output ──────────────────────
+
+
+class TurnPreference(BaseModel):
+    existing: int | None  # Number of the known preference it restates
+    category: str
+    value: str
+    confidence: str  # "low" | "medium" | "high"
+
+
+class TurnPreferencesResult(BaseModel):
+    preferences: list[TurnPreference]
+
+
+# ── Public API ─────────────────────────────────────────────────────────
+
+
+async def extract_turn_preferences(
+    user_message: str,
+    assistant_message: str,
+    known_preferences: list[dict],
+) -> list[dict[str, Any]]:
+    """
+    Extract the preferences stated in one chat exchange.
+
+    Returns dicts with ``category``, ``value``, ``confidence`` and
+    ``existing`` — the zero-based index into ``known_preferences`` the
+    statement restates, or None for a new preference.
+
+    Raises on OpenAI errors; the caller just skips the turn.
+    """
+    client = get_client()
+
+    known = "\n".join(
+        f"{i}. {p['category']}: {p['value']}" for i, p in enumerate(known_preferences, 1)
+    )
+    messages = [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {
+            "role": "user",
+            "content": (
+                f"Known preferences:\n{known or '(none yet)'}\n\n"
+                f"Buyer: {user_message}\n\n"
+                f"Assistant: {assistant_message}"
+            ),
+        },
+    ]
+
+    async def attempt() -> TurnPreferencesResult | None:
+        async with scheduler.slot(
+            Priority.background, estimate_tokens(messages, EXPECTED_OUTPUT_TOKENS)
+        ):
+            response = await client.beta.chat.completions.parse(
+                model=MODEL,
+                messages=messages,  # type: ignore[arg-type]
+                response_format=TurnPreferencesResult,
+            )
+        return response.choices[0].message.parsed
+
+    parsed = await resilience.call(MODEL, "turn_preferences", attempt)
+    if parsed is None:
+        logger.warning("OpenAI returned None parsed result for turn preferences")
+        return []
+
+    extracted = []
+    for pref in parsed.preferences:
+        existing = pref.existing
+        if existing is not None and not 1 <= existing <= len(known_preferences):
+            existing = None
+        extracted.append(
+            {
+                "category": pref.category,
+                "value": pref.value,
+                "confidence": pref.confidence,
+                "existing": existing - 1 if existing is not None else None,
+            }
+        )
+    return extracted
@@ -0,0 +1,155 @@
+"""
+Local, deterministic buyer profile scoring.
+
+Scores every preference 1-10 from its confidence, source, confirmation,
+category weight and the intensity of its wording ("must have", "ideally",
+"maybe"), then derives deal-breakers, nice-to-haves, a budget summary and
+buying readiness — all without calling OpenAI. Used for the "fast" profile
+mode and as the fallback when the model is unavailable.
+
+The rules are plain table lookups plus one precompiled regex per intensity
+band, so a profile with hundreds of preferences scores in well under a
+millisecond.
+"""
+
+import re
+from typing import Any
+
+_CONFIDENCE_BASE = {"high": 7, "medium": 5, "low": 3}
+
+# Added to the base score; categories not listed weigh 0
+_CATEGORY_WEIGHT = {
+    "budget": 2,
+    "deal_breakers": 3,
+    "must_haves": 3,
+    "financing": 1,
+    "location": 1,
+    "bedrooms": 1,
+    "bathrooms": 1,
+    "property_type": 1,
+    "schools": 1,
+    "commute": 1,
+    "timeline": 0,
+    "nice_to_haves": -2,
+    "style": -1,
+}
+
+# Wording bands, strongest first. A "floor" lifts the score to at least
+# that value, a "cap" limits it.
+_MUST = re.compile(
+    r"\b(must|need(s|ed)?|non[- ]?negotiable|required?|essential|at least|no more than|"
+    r"at most|can'?t|cannot|won'?t|has to|have to|absolutely|definitely)\b",
+    re.IGNORECASE,
+)
+_STRONG = re.compile(
+    r"\b(really want|important|strongly|prefer(s|red)? strongly|priority|top)\b",
+    re.IGNORECASE,
+)
+_SOFT = re.compile(
+    r"\b(ideally|would be nice|nice to have|prefer(s|red)?|like to|bonus|if possible)\b",
+    re.IGNORECASE,
+)
+_UNSURE = re.compile(
+    r"\b(maybe|not sure|possibly|perhaps|might|open to|flexible|undecided)\b",
+    re.IGNORECASE,
+)
+
+_URGENT = re.compile(
+    r"\b(asap|urgent(ly)?|immediately|this month|pre-?approved|ready to (buy|offer)|"
+    r"lease (ends|is up)|relocating)\b",
+    re.IGNORECASE,
+)
+
+_BUDGET_CATEGORIES = {"budget", "financing"}
+
+
+def score_preference(preference: dict) -> dict[str, Any]:
+    """Score one preference; returns a ScoredPreference-shaped dict."""
+    category = preference.get("category", "unknown")
+    value = preference.get("value", "")
+    confidence = preference.get("confidence", "low")
+    key = category.strip().lower()
+
+    score = _CONFIDENCE_BASE.get(confidence, 3) + _CATEGORY_WEIGHT.get(key, 0)
+    reasons = [f"{confidence} confidence"]
+
+    if preference.get("source") == "both":
+        score += 1
+        reasons.append("stated in transcript and chat")
+    if preference.get("is_confirmed"):
+        score += 1
+        reasons.append("confirmed")
+
+    text = f"{category} {value}"
+    if _MUST.search(text):
+        score = max(score, 9)
+        reasons.append("firm wording")
+    elif _STRONG.search(value):
+        score = max(score + 1, 7)
+        reasons.append("strong wording")
+    elif _UNSURE.search(value):
+        score = min(score, 3)
+        reasons.append("tentative wording")
+    elif _SOFT.search(text):
+        score = min(score, 6)
+        reasons.append("soft wording")
+
+    return {
+        "category": category,
+        "value": value,
+        "score": max(1, min(10, score)),
+        "confidence": confidence,
+        "notes": "Scored locally: " + ", ".join(reasons),
+    }
+
+
+def _label(entry: dict) -> str:
+    return f"{entry['category'].replace('_', ' ').capitalize()}: {entry['value']}"
+
+
+def _readiness(preferences: list[dict], scored: list[dict]) -> str:
+    if any(_URGENT.search(p.get("value", "")) for p in preferences):
+        return "ready_to_buy"
+    has_budget = any(e["category"].strip().lower() in _BUDGET_CATEGORIES for e in scored)
+    firm = sum(1 for e in scored if e["score"] >= 7)
+    if has_budget and firm >= 3:
+        return "active"
+    return "exploring"
+
+
+def build_local_profile(preferences: list[dict]) -> dict[str, Any]:
+    """Build a complete BuyerProfileResult-shaped profile without the LLM."""
+    scored = [score_preference(p) for p in preferences]
+
+    deal_breakers = [
+        _label(e)
+        for e in scored
+        if e["score"] >= 9 or e["category"].strip().lower() in ("deal_breakers", "must_haves")
+    ]
+    nice_to_haves = [
+        _label(e)
+        for e in scored
+        if 4 <= e["score"] <= 6 or e["category"].strip().lower() == "nice_to_haves"
+    ]
+
+    budget = [e["value"] for e in scored if e["category"].strip().lower() in _BUDGET_CATEGORIES]
+    budget_summary = "; ".join(budget) if budget else "No budget information captured yet."
+
+    top = sorted(scored, key=lambda e: e["score"], reverse=True)[:3]
+    if top:
+        profile_summary = (
+            "Top priorities: "
+            + "; ".join(e["value"] for e in top)
+            + ". Scored locally from the extracted preferences."
+        )
+    else:
+        profile_summary = "No preferences captured yet."
+
+    return {
+        "scored_preferences": scored,
+        "deal_breakers": deal_breakers,
+        "nice_to_haves": nice_to_haves,
+        "budget_summary": budget_summary,
+        "overall_readiness": _readiness(preferences, scored),
+        "profile_summary": profile_summary,
+    }
@@ -1,63 +1,80 @@
 """
 Buyer profile generation agent using OpenAI structured output.
 
-Takes all extracted preferences (from transcript + chat) and an optional
-chat history, then produces a scored buyer profile with deal-breakers,
-nice-to-haves, budget analysis, readiness assessment, and a summary.
+Takes all extracted preferences (from transcript + chat) and produces a
+scored buyer profile with deal-breakers, nice-to-haves, budget analysis,
+readiness assessment, and a summary.
 """
 
+import hashlib
 import logging
 from typing import Any
 
-from openai import AsyncOpenAI
 from pydantic import BaseModel
 
-from app.core.config import settings
+from app.agents import resilience
+from app.agents.llm import get_client
+from app.agents.preference_scorer import build_local_profile, score_preference
+from app.agents.resilience import CircuitOpenError
+from app.agents.scheduler import Priority, estimate_tokens, scheduler
+from app.core.metrics import metrics
 
 logger = logging.getLogger(__name__)
 
+MODEL = "gpt-4o-mini"
+# Budgeted completion size for the scheduler's tokens-per-minute estimate
+EXPECTED_OUTPUT_TOKENS = 1500
+
 SYSTEM_PROMPT = """\
-You are a real estate buyer profiling expert. You receive a list of buyer \
-preferences (extracted from transcripts and chat conversations) and, \
-optionally, the full chat history for additional context.
+You are a real estate buyer profiling expert. You receive the list of buyer \
+preferences extracted from the agent's consultation transcript and from the \
+buyer's chat with our assistant.
 
-Your job is to synthesize everything into a comprehensive buyer profile.
+Your job is to synthesize them into a comprehensive buyer profile.
 
 Instructions:
-1. **Extract NEW preferences from the chat** — The chat often reveals \
-   preferences NOT in the original list (e.g., "we need a library", "must \
-   have a home office", "want a pool"). Add these as new scored preferences \
-   with source context. Be thorough — every stated want, need, or preference \
-   from the chat should appear as a scored preference.
-2. **Score every preference** on a 1-10 importance scale based on how \
-   critical it is to the buyer. Use the buyer's own language as a guide:
+1. **Score every preference** on a 1-10 importance scale based on how \
+   critical it is to the buyer. Keep each preference's category and value \
+   exactly as given. Use the buyer's own language as a guide:
    - "must have", "definitely need", "non-negotiable" → 9-10
    - "really want", "important to us" → 7-8
    - "would be nice", "ideally" → 4-6
    - "maybe", "not sure" → 1-3
-3. **Assign confidence** ("low", "medium", "high") to each score based on \
+   Preferences stated in both the transcript and the chat, or marked \
+   [CONFIRMED], deserve extra weight.
+2. **Assign confidence** ("low", "medium", "high") to each score based on \
    how clearly the buyer expressed the preference.
-4. **Identify deal breakers** — items the buyer absolutely will not \
-   compromise on. Use direct quotes when possible (e.g., "Must have 3+ \
-   bedrooms", "Budget under $500k", "Needs a home library").
-5. **Identify nice-to-haves** — things the buyer would like but can flex on \
+3. **Identify deal breakers** — items the buyer absolutely will not \
+   compromise on (e.g., "Must have 3+ bedrooms", "Budget under $500k", \
+   "Needs a home library").
+4. **Identify nice-to-haves** — things the buyer would like but can flex on \
    (e.g., "Pool would be great", "Prefer open floor plan").
-6. **Summarize the budget situation** — what is their range, are they \
+5. **Summarize the budget situation** — what is their range, are they \
    pre-approved, any constraints?
-7. **Assess overall buying readiness**:
+6. **Assess overall buying readiness**:
    - "exploring" — just starting to look, unclear on many preferences
    - "active" — actively searching, knows what they want
    - "ready_to_buy" — urgent, clear preferences, ready to make offers
-8. **Write a profile summary** — 2-3 sentences describing the ideal match \
+7. **Write a profile summary** — 2-3 sentences describing the ideal match \
    for this buyer, suitable for a real estate agent to use when searching \
    listings. Mention specific features from both the transcript AND chat.
+"""
+
 
-IMPORTANT: Do not limit yourself to only the preferences already extracted. \
-The chat conversation often contains critical new information. Every \
-preference or requirement mentioned by the buyer should appear in your \
-scored_preferences list.
+UPDATE_NOTE = """
+You are updating an existing profile. The preferences listed as already \
+scored are context only — do not score them again. Return \
+scored_preferences for the new or changed preferences only, and return \
+deal_breakers, nice_to_haves, budget_summary, overall_readiness and \
+profile_summary for the whole updated profile.
 """
 
+# Part of every preference hash, so scores produced with an older prompt or
+# model are never reused.
+SCORING_VERSION = hashlib.sha256(
+    "\0".join([MODEL, SYSTEM_PROMPT, UPDATE_NOTE]).encode()
+).hexdigest()[:16]
+
 
 # -- Pydantic models for OpenAI structured output --------------------------
 
@@ -99,99 +116,220 @@ def _format_preferences(preferences: list[dict]) -> str:
     return "\n".join(lines)
 
 
-def _format_chat_messages(chat_messages: list[dict]) -> str:
-    """Format chat message dicts into a readable conversation log."""
-    if not chat_messages:
-        return ""
+def _preference_key(category: str, value: str) -> tuple[str, str]:
+    return category.strip().lower(), " ".join(value.lower().split())
 
-    lines = []
-    for msg in chat_messages:
-        role = msg.get("role", "unknown").capitalize()
-        content = msg.get("content", "")
-        lines.append(f"{role}: {content}")
-    return "\n".join(lines)
 
+def preference_hash(preference: dict) -> str:
+    """Content hash of everything about a preference that affects its score."""
+    category, value = _preference_key(
+        preference.get("category", ""), preference.get("value", "")
+    )
+    parts = [
+        SCORING_VERSION,
+        category,
+        value,
+        preference.get("confidence", ""),
+        preference.get("source", ""),
+        "confirmed" if preference.get("is_confirmed") else "",
+    ]
+    return hashlib.sha256("\0".join(parts).encode()).hexdigest()[:16]
 
-def _build_fallback(preferences: list[dict]) -> dict[str, Any]:
-    """Return a minimal profile when OpenAI fails."""
-    scored = []
-    for p in preferences:
-        scored.append(
-            {
-                "category": p.get("category", "unknown"),
-                "value": p.get("value", ""),
-                "score": 5,
-                "confidence": p.get("confidence", "low"),
-                "notes": "Auto-scored (AI unavailable)",
-            }
-        )
 
+def _tag_hashes(scored: list[dict], preferences: list[dict]) -> list[dict]:
+    """Attach the hash of the preference each scored entry belongs to.
+
+    Entries the model renamed match nothing and stay untagged, so they are
+    re-scored on the next regeneration rather than reused (as are local
+    fallback scores, which are never tagged).
+    """
+    hashes = {
+        _preference_key(p.get("category", ""), p.get("value", "")): preference_hash(p)
+        for p in preferences
+    }
+    for entry in scored:
+        entry_hash = hashes.get(_preference_key(entry["category"], entry["value"]))
+        if entry_hash:
+            entry["preference_hash"] = entry_hash
+    return scored
+
+
+def _format_profile_context(profile: dict, reused: list[dict]) -> str:
+    """Compact view of an existing profile for an incremental update."""
+    scored = "\n".join(
+        f"- {e['category']}: {e['value']} (score {e['score']})" for e in reused
+    )
+    return (
+        f"Profile summary: {profile.get('profile_summary', '')}\n"
+        f"Budget summary: {profile.get('budget_summary', '')}\n"
+        f"Readiness: {profile.get('overall_readiness', '')}\n"
+        f"Deal breakers: {'; '.join(profile.get('deal_breakers', [])) or 'none'}\n"
+        f"Nice to haves: {'; '.join(profile.get('nice_to_haves', [])) or 'none'}\n\n"
+        f"Already scored preferences:\n{scored or 'none'}"
+    )
+
+
+# -- OpenAI call ------------------------------------------------------------
+
+
+async def _request_profile(system: str, user_content: str) -> BuyerProfileResult | None:
+    client = get_client()
+    messages = [
+        {"role": "system", "content": system},
+        {"role": "user", "content": user_content},
+    ]
+
+    async def attempt() -> BuyerProfileResult | None:
+        async with scheduler.slot(
+            Priority.profile, estimate_tokens(messages, EXPECTED_OUTPUT_TOKENS)
+        ):
+            response = await client.beta.chat.completions.parse(
+                model=MODEL,
+                messages=messages,  # type: ignore[arg-type]
+                response_format=BuyerProfileResult,
+            )
+        return response.choices[0].message.parsed
+
+    return await resilience.call(MODEL, "profile", attempt, hedge=True)
+
+
+def _result_dict(parsed: BuyerProfileResult, scored: list[dict]) -> dict[str, Any]:
     return {
         "scored_preferences": scored,
-        "deal_breakers": [],
-        "nice_to_haves": [],
-        "budget_summary": "Unable to analyze budget — AI service unavailable.",
-        "overall_readiness": "exploring",
-        "profile_summary": (
-            "Profile generated with fallback scoring. "
-            "Re-run profile generation when the AI service is available "
-            "for a more accurate analysis."
-        ),
+        "deal_breakers": parsed.deal_breakers,
+        "nice_to_haves": parsed.nice_to_haves,
+        "budget_summary": parsed.budget_summary,
+        "overall_readiness": parsed.overall_readiness,
+        "profile_summary": parsed.profile_summary,
     }
 
 
+def _split_reusable(
+    preferences: list[dict], previous: dict[str, Any] | None
+) -> tuple[list[dict], list[dict]]:
+    """(previous entries still valid, preferences that need scoring)."""
+    reusable: dict[str, dict] = {}
+    for entry in (previous or {}).get("scored_preferences", []):
+        if entry.get("preference_hash"):
+            reusable[entry["preference_hash"]] = entry
+
+    reused: list[dict] = []
+    pending: list[dict] = []
+    for pref in preferences:
+        entry = reusable.pop(preference_hash(pref), None)
+        if entry is not None:
+            reused.append(entry)
+        else:
+            pending.append(pref)
+    return reused, pending
+
+
 # -- Public API ------------------------------------------------------------
 
 
 async def generate_profile(
     preferences: list[dict],
-    chat_messages: list[dict] | None = None,
+    previous: dict[str, Any] | None = None,
 ) -> dict[str, Any]:
     """
-    Generate a scored buyer profile from preferences and optional chat history.
+    Generate a scored buyer profile from the session's preferences.
+
+    Chat preferences are extracted turn by turn as the conversation happens
+    (see ``app.chat.preferences``), so the raw chat log is not sent.
+
+    When ``previous`` (the last generated profile) is given, its entries for
+    unchanged preferences are reused and only the rest are scored; if
+    nothing changed, no OpenAI call is made at all.
 
     Returns:
         A dict matching the BuyerProfileResult schema.
-        On error, returns a minimal fallback profile.
+        On error, returns a profile scored locally by ``preference_scorer``.
     """
-    try:
-        client = AsyncOpenAI(api_key=settings.openai_api_key)
+    reused, pending = _split_reusable(preferences, previous)
+
+    metrics.inc("profile.preferences_reused", len(reused))
+    metrics.inc("profile.preferences_scored", len(pending))
+
+    if previous and reused:
+        if not pending:
+            return {**previous, "scored_preferences": reused}
+        return await _update_profile(previous, reused, pending)
+    return await _full_profile(preferences)
 
-        user_content = (
+
+async def _full_profile(preferences: list[dict]) -> dict[str, Any]:
+    try:
+        parsed = await _request_profile(
+            SYSTEM_PROMPT,
             "Here are the buyer's extracted preferences:\n\n"
-            f"{_format_preferences(preferences)}"
+            f"{_format_preferences(preferences)}",
         )
+        if parsed is None:
+            logger.warning("OpenAI returned None parsed result for profile generation")
+            return build_local_profile(preferences)
 
-        if chat_messages:
-            user_content += (
-                "\n\nHere is the chat conversation for additional context:\n\n"
-                f"{_format_chat_messages(chat_messages)}"
-            )
+        scored = [sp.model_dump() for sp in parsed.scored_preferences]
+        return _result_dict(parsed, _tag_hashes(scored, preferences))
 
-        response = await client.beta.chat.completions.parse(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user", "content": user_content},
-            ],
-            response_format=BuyerProfileResult,
-        )
+    except CircuitOpenError:
+        logger.warning("OpenAI circuit open; using fallback profile")
+        return build_local_profile(preferences)
+    except Exception:
+        logger.exception("Failed to generate buyer profile with OpenAI")
+        return build_local_profile(preferences)
 
-        parsed: BuyerProfileResult | None = response.choices[0].message.parsed
 
+async def _update_profile(
+    previous: dict[str, Any],
+    reused: list[dict],
+    pending: list[dict],
+) -> dict[str, Any]:
+    """Score only ``pending`` and merge it into the previous profile."""
+    try:
+        parsed = await _request_profile(
+            SYSTEM_PROMPT + UPDATE_NOTE,
+            f"{_format_profile_context(previous, reused)}\n\n"
+            "New or changed preferences to score:\n\n"
+            f"{_format_preferences(pending)}",
+        )
         if parsed is None:
-            logger.warning("OpenAI returned None parsed result for profile generation")
-            return _build_fallback(preferences)
+            logger.warning("OpenAI returned None parsed result for profile update")
+        else:
+            # Ignore anything the model re-scored despite being told not to
+            reused_keys = {_preference_key(e["category"], e["value"]) for e in reused}
+            scored = [
+                sp.model_dump()
+                for sp in parsed.scored_preferences
+                if _preference_key(sp.category, sp.value) not in reused_keys
+            ]
+            return _result_dict(parsed, reused + _tag_hashes(scored, pending))
+    except CircuitOpenError:
+        logger.warning("OpenAI circuit open; using fallback scores for new preferences")
+    except Exception:
+        logger.exception("Failed to update buyer profile with OpenAI")
+
+    # Keep the previous analysis; local scores are untagged, so these
+    # preferences are scored by the model next time
+    fallback = [score_preference(p) for p in pending]
+    return {**previous, "scored_preferences": reused + fallback}
+
 
+def refresh_profile_locally(
+    preferences: list[dict],
+    previous: dict[str, Any] | None = None,
+) -> dict[str, Any]:
+    """
+    Update the profile without OpenAI (the "fast" mode).
+
+    Model scores in ``previous`` for unchanged preferences are kept, tags
+    and all, and only the rest are scored by ``preference_scorer``. Local
+    scores are untagged, so the next full generation sends just those
+    preferences to the model instead of rescoring the whole profile.
+    """
+    reused, pending = _split_reusable(preferences, previous)
+    if previous and reused:
         return {
-            "scored_preferences": [sp.model_dump() for sp in parsed.scored_preferences],
-            "deal_breakers": parsed.deal_breakers,
-            "nice_to_haves": parsed.nice_to_haves,
-            "budget_summary": parsed.budget_summary,
-            "overall_readiness": parsed.overall_readiness,
-            "profile_summary": parsed.profile_summary,
+            **previous,
+            "scored_preferences": reused + [score_preference(p) for p in pending],
         }
-
-    except Exception:
-        logger.exception("Failed to generate buyer profile with OpenAI")
-        return _build_fallback(preferences)
+    return build_local_profile(preferences)
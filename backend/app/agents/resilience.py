@@ -0,0 +1,197 @@
+"""
+Resilience layer for agent calls to OpenAI.
+
+``call()`` wraps a single API call with:
+- jittered exponential retry for transient errors (connection failures,
+  timeouts, 429s and 5xx), honouring Retry-After on rate limits;
+- a per-model circuit breaker that fails fast while OpenAI is down and lets
+  a single probe through once the cool-down has passed;
+- optional hedging: if the call has not returned by the observed p95
+  latency of the same operation, a second identical call is fired and the
+  first to succeed wins.
+
+Latency is tracked per model and operation: a chat stream open and a full
+transcript parse on the same model differ by an order of magnitude, so a
+shared p95 would hedge nearly every slow call.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from collections.abc import Awaitable, Callable
+from typing import TypeVar
+
+from openai import (
+    APIConnectionError,
+    APITimeoutError,
+    InternalServerError,
+    RateLimitError,
+)
+
+from app.agents.scheduler import retry_after_seconds
+from app.core.config import settings
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+RETRYABLE_ERRORS = (APIConnectionError, APITimeoutError, InternalServerError, RateLimitError)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling OpenAI while a model's circuit is open."""
+
+    def __init__(self, model: str) -> None:
+        super().__init__(f"Circuit open for model {model}")
+        self.model = model
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int, reset_seconds: float) -> None:
+        self._threshold = failure_threshold
+        self._reset = reset_seconds
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._probing = False
+
+    @property
+    def is_open(self) -> bool:
+        return self._opened_at is not None
+
+    def allow(self) -> bool:
+        if self._opened_at is None:
+            return True
+        # Half-open: after the cool-down let exactly one probe through
+        if not self._probing and time.monotonic() - self._opened_at >= self._reset:
+            self._probing = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    def abandon_probe(self) -> None:
+        """Release the half-open probe without a verdict (caller cancelled)."""
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self._probing or self._failures >= self._threshold:
+            if self._opened_at is None or self._probing:
+                logger.warning("Opening circuit after %d failures", self._failures)
+            self._opened_at = time.monotonic()
+            self._probing = False
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+
+
+def breaker(model: str) -> CircuitBreaker:
+    if model not in _breakers:
+        b = CircuitBreaker(
+            failure_threshold=settings.llm_breaker_failure_threshold,
+            reset_seconds=settings.llm_breaker_reset_seconds,
+        )
+        _breakers[model] = b
+        metrics.gauge(f"llm.circuit_open.{model}", lambda: int(b.is_open))
+    return _breakers[model]
+
+
+def _backoff(attempt: int, exc: Exception) -> float:
+    """Full-jitter exponential backoff, at least as long as Retry-After."""
+    ceiling = min(
+        settings.llm_retry_max_delay_seconds,
+        settings.llm_retry_base_delay_seconds * 2 ** (attempt - 1),
+    )
+    delay = random.uniform(0, ceiling)
+    if isinstance(exc, RateLimitError):
+        delay = max(delay, retry_after_seconds(exc) or 0)
+    return delay
+
+
+async def _hedged(name: str, fn: Callable[[], Awaitable[T]]) -> T:
+    latency = metrics.histogram(f"llm.latency_seconds.{name}")
+    hedge_after = latency.percentile(95)
+    if latency.count < settings.llm_hedge_min_samples or hedge_after is None:
+        return await fn()
+
+    first = asyncio.ensure_future(fn())
+    done, _ = await asyncio.wait({first}, timeout=hedge_after)
+    if done:
+        return first.result()
+
+    metrics.inc(f"llm.hedged.{name}")
+    pending = {first, asyncio.ensure_future(fn())}
+    error: BaseException | None = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is not first:
+                        metrics.inc(f"llm.hedge_wins.{name}")
+                    return task.result()
+                error = task.exception()
+        assert error is not None
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def call(
+    model: str,
+    operation: str,
+    fn: Callable[[], Awaitable[T]],
+    *,
+    hedge: bool = False,
+) -> T:
+    """Run ``fn`` (one OpenAI call) with retries, circuit breaking and hedging.
+
+    ``operation`` names the kind of call (e.g. ``transcript_parse``); its
+    latency history sets the hedge delay. The breaker is shared per model.
+    """
+    circuit = breaker(model)
+    name = f"{model}.{operation}"
+    attempts = settings.llm_retry_attempts
+    attempt = 0
+    while True:
+        if not circuit.allow():
+            metrics.inc(f"llm.circuit_rejected.{model}")
+            raise CircuitOpenError(model)
+
+        started = time.monotonic()
+        try:
+            if hedge and settings.llm_hedge_enabled:
+                result = await _hedged(name, fn)
+            else:
+                result = await fn()
+        except RETRYABLE_ERRORS as exc:
+            circuit.record_failure()
+            attempt += 1
+            if attempt >= attempts:
+                raise
+            delay = _backoff(attempt, exc)
+            logger.warning(
+                "OpenAI call failed (%s); retry %d/%d in %.2fs",
+                type(exc).__name__, attempt, attempts - 1, delay,
+            )
+            metrics.inc(f"llm.retries.{model}")
+            await asyncio.sleep(delay)
+            continue
+        except asyncio.CancelledError:
+            circuit.abandon_probe()
+            raise
+        except Exception:
+            # Anything else (bad request, schema mismatch) means OpenAI
+            # answered — not an outage, so it must not trip the breaker.
+            circuit.record_success()
+            raise
+
+        circuit.record_success()
+        metrics.observe(f"llm.latency_seconds.{name}", time.monotonic() - started)
+        return result
@@ -0,0 +1,209 @@
+"""
+Priority-aware admission scheduler for OpenAI calls.
+
+Every agent call asks for a slot before it hits the API. Slots are granted
+by priority class — chat streaming first, then transcript parsing, then
+profile generation, then background housekeeping — subject to token
+buckets on requests-per-minute and tokens-per-minute (estimated before each
+call) and a cap on in-flight calls.
+Within a class callers are admitted FIFO, and waiting callers age towards
+the front so background work is delayed but never starved. A 429 with
+Retry-After pauses all admissions until the quota resets.
+"""
+
+import asyncio
+import itertools
+import logging
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from enum import IntEnum
+
+from openai import RateLimitError
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class Priority(IntEnum):
+    chat = 0
+    parse = 1
+    profile = 2
+    background = 3
+
+
+def estimate_tokens(messages: list[dict], max_output_tokens: int) -> int:
+    """Rough prompt + completion size (~4 characters per token)."""
+    prompt_chars = sum(len(str(m.get("content", ""))) for m in messages)
+    return prompt_chars // 4 + max_output_tokens
+
+
+def retry_after_seconds(exc: RateLimitError) -> float | None:
+    """Read the server's back-off hint from a 429 response, if any."""
+    headers = exc.response.headers
+    if "retry-after-ms" in headers:
+        try:
+            return float(headers["retry-after-ms"]) / 1000
+        except ValueError:
+            pass
+    if "retry-after" in headers:
+        try:
+            return float(headers["retry-after"])
+        except ValueError:
+            pass
+    return None
+
+
+class TokenBucket:
+    """Continuously refilling bucket sized for one minute of quota."""
+
+    def __init__(self, per_minute: float) -> None:
+        self.capacity = per_minute
+        self._level = per_minute
+        self._rate = per_minute / 60
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self._level = min(self.capacity, self._level + (now - self._updated) * self._rate)
+        self._updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until ``amount`` (capped at capacity) is available."""
+        self._refill(now)
+        deficit = min(amount, self.capacity) - self._level
+        return max(0.0, deficit / self._rate)
+
+    def take(self, amount: float, now: float) -> None:
+        self._refill(now)
+        self._level -= min(amount, self.capacity)
+
+
+@dataclass
+class _Waiter:
+    priority: Priority
+    tokens: int
+    seq: int
+    enqueued_at: float
+    future: asyncio.Future = field(repr=False)
+
+    def rank(self, now: float, aging_seconds: float) -> tuple[float, int]:
+        # Each ``aging_seconds`` spent waiting promotes the caller one class
+        return (self.priority - (now - self.enqueued_at) / aging_seconds, self.seq)
+
+
+class LLMScheduler:
+    def __init__(
+        self,
+        requests_per_minute: float,
+        tokens_per_minute: float,
+        max_in_flight: int,
+        aging_seconds: float,
+    ) -> None:
+        self._requests = TokenBucket(requests_per_minute)
+        self._tokens = TokenBucket(tokens_per_minute)
+        self._max_in_flight = max_in_flight
+        self._aging = aging_seconds
+        self._in_flight = 0
+        self._paused_until = 0.0
+        self._waiters: list[_Waiter] = []
+        self._seq = itertools.count()
+        self._changed = asyncio.Event()
+        self._pump_task: asyncio.Task | None = None
+
+        metrics.gauge("llm.in_flight", lambda: self._in_flight)
+        for priority in Priority:
+            metrics.gauge(
+                f"llm.queue_depth.{priority.name}",
+                lambda p=priority: sum(1 for w in self._waiters if w.priority == p),
+            )
+
+    @asynccontextmanager
+    async def slot(self, priority: Priority, estimated_tokens: int) -> AsyncIterator[None]:
+        """Wait for admission, then hold an in-flight slot for the block."""
+        await self._acquire(priority, estimated_tokens)
+        try:
+            yield
+        except RateLimitError as exc:
+            self.pause(retry_after_seconds(exc) or settings.llm_rate_limit_pause_seconds)
+            raise
+        finally:
+            self._in_flight -= 1
+            self._changed.set()
+
+    def pause(self, seconds: float) -> None:
+        """Stop admitting calls for ``seconds`` (e.g. after a 429)."""
+        until = time.monotonic() + seconds
+        if until > self._paused_until:
+            logger.warning("OpenAI rate limited; pausing admissions for %.1fs", seconds)
+            self._paused_until = until
+            metrics.inc("llm.rate_limited")
+
+    async def _acquire(self, priority: Priority, estimated_tokens: int) -> None:
+        loop = asyncio.get_running_loop()
+        waiter = _Waiter(
+            priority=priority,
+            tokens=estimated_tokens,
+            seq=next(self._seq),
+            enqueued_at=time.monotonic(),
+            future=loop.create_future(),
+        )
+        self._waiters.append(waiter)
+        self._changed.set()
+        if self._pump_task is None or self._pump_task.done():
+            self._pump_task = asyncio.create_task(self._pump())
+
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+            elif waiter.future.done() and not waiter.future.cancelled():
+                # Admitted just as the caller gave up — hand the slot back
+                self._in_flight -= 1
+            self._changed.set()
+            raise
+
+        waited = time.monotonic() - waiter.enqueued_at
+        metrics.observe(f"llm.wait_seconds.{priority.name}", waited)
+        metrics.inc(f"llm.admitted.{priority.name}")
+
+    async def _pump(self) -> None:
+        """Admit waiters in rank order as quota and in-flight capacity allow."""
+        while self._waiters:
+            self._changed.clear()
+            now = time.monotonic()
+            head = min(self._waiters, key=lambda w: w.rank(now, self._aging))
+
+            delay = max(
+                self._paused_until - now,
+                self._requests.wait_time(1, now),
+                self._tokens.wait_time(head.tokens, now),
+            )
+            if self._in_flight >= self._max_in_flight:
+                delay = max(delay, 1.0)  # re-checked as soon as a slot frees up
+
+            if delay <= 0:
+                self._waiters.remove(head)
+                self._requests.take(1, now)
+                self._tokens.take(head.tokens, now)
+                self._in_flight += 1
+                head.future.set_result(None)
+                continue
+
+            # Sleep until quota refills, or until something changes (a new,
+            # possibly higher-priority waiter or a freed in-flight slot)
+            try:
+                await asyncio.wait_for(self._changed.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+
+scheduler = LLMScheduler(
+    requests_per_minute=settings.openai_requests_per_minute,
+    tokens_per_minute=settings.openai_tokens_per_minute,
+    max_in_flight=settings.llm_max_in_flight,
+    aging_seconds=settings.llm_priority_aging_seconds,
+)
@@ -3,15 +3,38 @@ Transcript parsing agent using OpenAI structured output.
 
 Extracts buyer preferences from raw agent-buyer conversation transcripts
 and returns structured preference data with confidence levels.
+
+Long transcripts are parsed map-reduce style: the text is split on speaker
+turns into overlapping chunks, each chunk is extracted concurrently, and the
+per-chunk results are merged and their summaries reduced into one.
+
+The text is first compacted by ``transcript_preprocessor`` (timestamps,
+fillers, boilerplate and small talk removed); the token counts before and
+after are reported with the result.
+
+When OpenAI is unavailable the result falls back to the local keyword
+extractor and is flagged ``degraded`` so callers do not cache it. A chunked
+parse that lost some chunks, or had to join the chunk summaries itself, is
+flagged ``partial`` for the same reason.
 """
 
+import asyncio
+import hashlib
 import logging
+import re
 from typing import Any
 
 from openai import AsyncOpenAI
 from pydantic import BaseModel
 
+from app.agents import resilience
+from app.agents.keyword_extractor import extract_keyword_preferences
+from app.agents.llm import get_client
+from app.agents.resilience import CircuitOpenError
+from app.agents.scheduler import Priority, estimate_tokens, scheduler
+from app.agents.transcript_preprocessor import PREPROCESSOR_VERSION, preprocess_transcript
 from app.core.config import settings
+from app.core.metrics import metrics
 
 logger = logging.getLogger(__name__)
 
@@ -37,6 +60,38 @@ Instructions:
   preferences, return an empty preferences list and a summary saying so.
 """
 
+CHUNK_NOTE = """
+You are seeing part {index} of {total} of a longer transcript. Extract only \
+the preferences stated in this part, and summarize only this part.
+"""
+
+SUMMARY_REDUCE_PROMPT = """\
+You combine partial summaries of one real estate buyer consultation into a \
+single 1-2 sentence summary of the buyer's overall needs. Resolve \
+contradictions in favour of the later parts. Reply with the summary only.
+"""
+
+# A speaker turn starts a line with an optional timestamp and a short label
+# followed by a colon, e.g. "Agent:", "[00:12:03] Buyer (Sarah):".
+_TURN_START = re.compile(
+    r"^[ \t]*(?:\[?\d{1,2}:\d{2}(?::\d{2})?\]?[ \t]*)?[A-Za-z][\w .'()-]{0,40}:",
+    re.MULTILINE,
+)
+
+_CONFIDENCE_RANK = {"low": 0, "medium": 1, "high": 2}
+
+MODEL = "gpt-4o-mini"
+# Budgeted completion size for the scheduler's tokens-per-minute estimate
+EXPECTED_OUTPUT_TOKENS = 1000
+
+# Changes whenever the prompts, model or preprocessing change, so cached
+# parse results produced by an older parser are never reused.
+PARSER_VERSION = hashlib.sha256(
+    "\0".join(
+        [MODEL, SYSTEM_PROMPT, CHUNK_NOTE, SUMMARY_REDUCE_PROMPT, PREPROCESSOR_VERSION]
+    ).encode()
+).hexdigest()[:16]
+
 
 # ── Pydantic models for OpenAI structured output ──────────────────────
 
@@ -52,49 +107,245 @@ class TranscriptParseResult(BaseModel):
     summary: str
 
 
+# ── Chunking ───────────────────────────────────────────────────────────
+
+
+def _split_turns(raw_text: str) -> list[str]:
+    """Split a transcript into speaker turns (falls back to paragraphs)."""
+    starts = [m.start() for m in _TURN_START.finditer(raw_text)]
+    if len(starts) < 2:
+        turns = re.split(r"\n\s*\n", raw_text)
+    else:
+        if starts[0] != 0:
+            starts.insert(0, 0)
+        turns = [raw_text[a:b] for a, b in zip(starts, starts[1:] + [len(raw_text)])]
+    return [t.strip() for t in turns if t.strip()]
+
+
+def _chunk_turns(turns: list[str], max_chars: int, overlap_turns: int) -> list[str]:
+    """Greedily pack turns into chunks of at most ``max_chars``.
+
+    Each chunk after the first repeats the last ``overlap_turns`` turns of the
+    previous one, so a preference split across a question and its answer is
+    still seen whole by at least one chunk.
+    """
+    # Hard-split any single turn that is bigger than a chunk on its own
+    pieces: list[str] = []
+    for turn in turns:
+        while len(turn) > max_chars:
+            pieces.append(turn[:max_chars])
+            turn = turn[max_chars:]
+        pieces.append(turn)
+
+    chunks: list[str] = []
+    current: list[str] = []
+    size = 0
+    fresh = 0  # turns in ``current`` not carried over from the previous chunk
+    for piece in pieces:
+        if current and fresh and size + len(piece) + 1 > max_chars:
+            chunks.append("\n".join(current))
+            current = current[-overlap_turns:] if overlap_turns else []
+            size = sum(len(t) + 1 for t in current)
+            fresh = 0
+            # Drop carried-over turns until the new piece fits
+            while current and size + len(piece) + 1 > max_chars:
+                size -= len(current.pop(0)) + 1
+        current.append(piece)
+        size += len(piece) + 1
+        fresh += 1
+    if current and fresh:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+def _merge_preferences(
+    results: list[TranscriptParseResult],
+) -> list[dict[str, Any]]:
+    """Dedupe preferences across chunks, keeping the highest confidence."""
+    merged: dict[tuple[str, str], dict[str, Any]] = {}
+    for result in results:
+        for pref in result.preferences:
+            key = (
+                pref.category.strip().lower(),
+                " ".join(pref.value.lower().split()),
+            )
+            existing = merged.get(key)
+            if existing is None:
+                merged[key] = pref.model_dump()
+            elif _CONFIDENCE_RANK.get(pref.confidence, 0) > _CONFIDENCE_RANK.get(
+                existing["confidence"], 0
+            ):
+                existing["confidence"] = pref.confidence
+    return list(merged.values())
+
+
+# ── OpenAI calls ───────────────────────────────────────────────────────
+
+
+async def _extract(
+    client: AsyncOpenAI,
+    text: str,
+    chunk_note: str = "",
+) -> TranscriptParseResult | None:
+    messages = [
+        {"role": "system", "content": SYSTEM_PROMPT + chunk_note},
+        {
+            "role": "user",
+            "content": (
+                "Extract all buyer preferences from the following "
+                "real estate transcript:\n\n"
+                f"{text}"
+            ),
+        },
+    ]
+
+    async def attempt() -> TranscriptParseResult | None:
+        async with scheduler.slot(
+            Priority.parse, estimate_tokens(messages, EXPECTED_OUTPUT_TOKENS)
+        ):
+            response = await client.beta.chat.completions.parse(
+                model=MODEL,
+                messages=messages,  # type: ignore[arg-type]
+                response_format=TranscriptParseResult,
+            )
+        return response.choices[0].message.parsed
+
+    return await resilience.call(MODEL, "transcript_parse", attempt, hedge=True)
+
+
+async def _reduce_summaries(client: AsyncOpenAI, summaries: list[str]) -> str:
+    if len(summaries) <= 1:
+        return summaries[0] if summaries else ""
+
+    parts = "\n".join(f"Part {i}: {s}" for i, s in enumerate(summaries, 1))
+    messages = [
+        {"role": "system", "content": SUMMARY_REDUCE_PROMPT},
+        {"role": "user", "content": parts},
+    ]
+
+    async def attempt() -> str:
+        async with scheduler.slot(Priority.parse, estimate_tokens(messages, 200)):
+            response = await client.chat.completions.create(
+                model=MODEL,
+                messages=messages,  # type: ignore[arg-type]
+                max_tokens=200,
+            )
+        return (response.choices[0].message.content or "").strip()
+
+    return await resilience.call(MODEL, "transcript_summary_reduce", attempt)
+
+
+async def _parse_chunked(client: AsyncOpenAI, raw_text: str) -> dict[str, Any]:
+    chunks = _chunk_turns(
+        _split_turns(raw_text),
+        max_chars=settings.transcript_chunk_chars,
+        overlap_turns=settings.transcript_chunk_overlap_turns,
+    )
+    semaphore = asyncio.Semaphore(settings.transcript_chunk_concurrency)
+
+    async def extract_chunk(index: int, chunk: str) -> TranscriptParseResult | None:
+        note = CHUNK_NOTE.format(index=index, total=len(chunks))
+        async with semaphore:
+            try:
+                return await _extract(client, chunk, note)
+            except Exception:
+                logger.exception("Failed to parse transcript chunk %d/%d", index, len(chunks))
+                return None
+
+    logger.info("Parsing transcript in %d chunks", len(chunks))
+    chunk_results = await asyncio.gather(
+        *(extract_chunk(i, c) for i, c in enumerate(chunks, 1))
+    )
+    parsed = [r for r in chunk_results if r is not None]
+    if not parsed:
+        return _degraded(raw_text)
+
+    partial = len(parsed) < len(chunks)
+    if partial:
+        logger.warning(
+            "%d of %d transcript chunks failed; result is partial",
+            len(chunks) - len(parsed),
+            len(chunks),
+        )
+
+    summaries = [r.summary for r in parsed if r.summary]
+    try:
+        summary = await _reduce_summaries(client, summaries)
+    except Exception:
+        # Keep the chunk preferences; a joined summary is still usable
+        logger.exception("Failed to reduce transcript chunk summaries; joining them")
+        summary = " ".join(summaries)
+        partial = True
+
+    result: dict[str, Any] = {"preferences": _merge_preferences(parsed), "summary": summary}
+    if partial:
+        metrics.inc("transcript.parse.partial")
+        result["partial"] = True
+    return result
+
+
 # ── Public API ─────────────────────────────────────────────────────────
 
 
+def _degraded(raw_text: str) -> dict[str, Any]:
+    """Keyword-only result used when the LLM parse produced nothing."""
+    metrics.inc("transcript.parse.degraded")
+    return {
+        "preferences": extract_keyword_preferences(raw_text),
+        "summary": "",
+        "degraded": True,
+    }
+
+
 async def parse_transcript(raw_text: str) -> dict[str, Any]:
     """
     Parse a raw transcript and return extracted preferences + summary.
 
+    The transcript is preprocessed first; if the compacted text is longer
+    than ``settings.transcript_chunk_chars`` it is split into overlapping
+    chunks that are extracted concurrently and merged.
+
     Returns:
         {"preferences": [{"category": ..., "value": ..., "confidence": ...}, ...],
-         "summary": "..."}
+         "summary": "...",
+         "tokens_before": ..., "tokens_after": ...}
 
-    On any error, returns {"preferences": [], "summary": ""}.
+    On any error, returns the keyword extractor's preferences with an empty
+    summary and ``"degraded": True``. A chunked parse missing some chunks, or
+    whose summary reduce failed, carries ``"partial": True``.
     """
+    prepared = preprocess_transcript(raw_text)
+    metrics.observe("transcript.tokens.before", prepared.tokens_before)
+    metrics.observe("transcript.tokens.after", prepared.tokens_after)
+    metrics.inc("transcript.tokens.saved", prepared.tokens_before - prepared.tokens_after)
+    token_counts = {
+        "tokens_before": prepared.tokens_before,
+        "tokens_after": prepared.tokens_after,
+    }
+    return {**await _parse(prepared.text), **token_counts}
+
+
+async def _parse(text: str) -> dict[str, Any]:
     try:
-        client = AsyncOpenAI(api_key=settings.openai_api_key)
-
-        response = await client.beta.chat.completions.parse(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {
-                    "role": "user",
-                    "content": (
-                        "Extract all buyer preferences from the following "
-                        "real estate transcript:\n\n"
-                        f"{raw_text}"
-                    ),
-                },
-            ],
-            response_format=TranscriptParseResult,
-        )
+        client = get_client()
+
+        if len(text) > settings.transcript_chunk_chars:
+            return await _parse_chunked(client, text)
 
-        parsed: TranscriptParseResult | None = response.choices[0].message.parsed
+        parsed = await _extract(client, text)
 
         if parsed is None:
             logger.warning("OpenAI returned None parsed result")
-            return {"preferences": [], "summary": ""}
+            return _degraded(text)
 
         return {
             "preferences": [p.model_dump() for p in parsed.preferences],
             "summary": parsed.summary,
         }
 
+    except CircuitOpenError:
+        logger.warning("OpenAI circuit open; using keyword extraction for transcript")
+        return _degraded(text)
     except Exception:
         logger.exception("Failed to parse transcript with OpenAI")
-        return {"preferences": [], "summary": ""}
+        return _degraded(text)
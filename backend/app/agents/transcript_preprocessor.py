@@ -0,0 +1,154 @@
+"""
+Token-shrinking cleanup of pasted transcripts before they reach the LLM.
+
+Zoom captions, Otter exports and call-recording transcripts carry a lot the
+parser never needs: cue numbers and timestamps, a speaker header repeated on
+every caption, filler words, recording boilerplate and greetings. This
+stage rewrites the text to one ``Speaker: text`` line per turn with all of
+that removed. It works on a copy; ``Transcript.raw_text`` is never touched.
+
+Token counts use the same ~4 characters per token estimate as the scheduler.
+"""
+
+import re
+from dataclasses import dataclass
+
+# Bump when the rules change so parse results cached from the old output
+# are not reused (folded into the parser version)
+PREPROCESSOR_VERSION = "3"
+
+_WEBVTT_HEADER = re.compile(r"^\s*WEBVTT\b.*$", re.MULTILINE)
+_CUE_TIMING = re.compile(
+    r"^\s*(?:\d+\s*\n)?\s*\d{1,2}:\d{2}(?::\d{2})?[.,]\d{1,3}\s*-->\s*"
+    r"\d{1,2}:\d{2}(?::\d{2})?[.,]\d{1,3}.*$",
+    re.MULTILINE,
+)
+# Otter-style header: a speaker name and a timestamp alone on a line, with
+# the spoken text on the following line(s)
+_HEADER_LINE = re.compile(
+    r"^[ \t]*([A-Za-z][\w .'-]{0,40}?)[ \t]+\(?\d{1,2}:\d{2}(?::\d{2})?\)?[ \t]*$",
+    re.MULTILINE,
+)
+# Timestamps are only stripped where captions put them: at the start of a
+# line or bracketed next to a speaker label. A clock time inside speech
+# ("at work by 8:30") is a preference and stays.
+_TIME = r"\d{1,2}:\d{2}(?::\d{2})?(?:[.,]\d{1,3})?"
+_BRACKETED_TIME = rf"(?:\[{_TIME}\]|\({_TIME}\))"
+_LINE_TIMESTAMP = re.compile(
+    # Bare times only when a speaker label or the end of the line follows
+    rf"^[ \t]*(?:{_BRACKETED_TIME}|{_TIME}(?=[ \t]*(?:[-–][ \t]*)?"
+    rf"(?:[A-Za-z][\w .'()-]{{0,40}}?[ \t]*:|$)))[ \t]*(?:[-–][ \t]*)?",
+    re.MULTILINE,
+)
+_LABEL_TIMESTAMP = re.compile(
+    rf"^([ \t]*[A-Za-z][\w .'-]{{0,40}}?)[ \t]*{_BRACKETED_TIME}[ \t]*:"
+    rf"|^([ \t]*[A-Za-z][\w .'()-]{{0,40}}?[ \t]*:)[ \t]*{_BRACKETED_TIME}",
+    re.MULTILINE,
+)
+_SPEAKER = re.compile(r"^[ \t]*([A-Za-z][\w .'()-]{0,40}?)[ \t]*:[ \t]*", re.MULTILINE)
+
+_BOILERPLATE = re.compile(
+    r"\[(?:inaudible|crosstalk|silence|music|laughter|laughs|pause|noise)[^\]]*\]"
+    r"|\((?:inaudible|crosstalk|laughs|laughter|pause|coughs)\)"
+    r"|^.*\b(?:transcribed by|transcript generated|this (?:call|meeting) is being recorded|"
+    r"recording (?:started|stopped|in progress)|otter\.ai)\b.*$",
+    re.IGNORECASE | re.MULTILINE,
+)
+# True disfluencies only. Hedges such as "sort of" or "kinda" carry the
+# buyer's certainty, which the parser turns into confidence.
+_FILLER = re.compile(
+    r"(?:,\s*)?\b(?:u+m+|u+h+|e+r+m+|hmm+|mm+-?hmm+)\b,?",
+    re.IGNORECASE,
+)
+_REPEATED_WORD = re.compile(r"\b(\w+)(?:\s+\1\b)+", re.IGNORECASE)
+
+# Greetings and call logistics; a short turn made only of these is dropped.
+# Bare answers ("yes", "sure") are kept: they may confirm the question before.
+_SMALL_TALK = re.compile(
+    r"\b(hi|hello|hey|good (?:morning|afternoon|evening)|how are you|how's it going|"
+    r"doing (?:well|good|great)|thanks?(?: you)?|nice to (?:meet|see) you|can you hear me|"
+    r"you're on mute|sorry about that|bye|goodbye|talk soon|have a (?:good|great) (?:day|one)|"
+    r"weather|weekend)\b",
+    re.IGNORECASE,
+)
+_SMALL_TALK_MAX_WORDS = 12
+_SUBSTANCE = re.compile(
+    r"\d|\b(budget|bed|bath|house|home|condo|town|school|commute|neighbo|area|"
+    r"price|offer|mortgage|loan|yard|garage|kitchen|move|buy|sell|rent|need|want|prefer)",
+    re.IGNORECASE,
+)
+_SPACES = re.compile(r"[ \t]+")
+_SPACE_BEFORE_PUNCTUATION = re.compile(r"\s+([,.!?])")
+
+
+@dataclass
+class PreprocessedTranscript:
+    text: str
+    tokens_before: int
+    tokens_after: int
+
+
+def estimate_text_tokens(text: str) -> int:
+    return len(text) // 4
+
+
+def _is_small_talk(text: str) -> bool:
+    words = text.split()
+    if len(words) > _SMALL_TALK_MAX_WORDS or _SUBSTANCE.search(text):
+        return False
+    return len(_SMALL_TALK.sub("", text).strip(" .,!?'-")) <= len(text) // 3
+
+
+def _clean(text: str) -> str:
+    text = _FILLER.sub("", text)
+    text = _REPEATED_WORD.sub(r"\1", text)
+    text = _SPACES.sub(" ", text).strip(" ,")
+    # Filler removal can leave a space before punctuation behind
+    return _SPACE_BEFORE_PUNCTUATION.sub(r"\1", text)
+
+
+def preprocess_transcript(raw_text: str) -> PreprocessedTranscript:
+    """Return a compact copy of ``raw_text`` plus before/after token counts."""
+    text = raw_text.replace("\r\n", "\n")
+    text = _WEBVTT_HEADER.sub("", text)
+    text = _CUE_TIMING.sub("", text)
+    text = _HEADER_LINE.sub(r"\1:", text)
+    text = _BOILERPLATE.sub("", text)
+    text = _LINE_TIMESTAMP.sub("", text)
+    text = _LABEL_TIMESTAMP.sub(lambda m: f"{m.group(1)}:" if m.group(1) else m.group(2), text)
+
+    # Split into (speaker, text) turns; text before any label has no speaker
+    turns: list[tuple[str | None, str]] = []
+    labels = list(_SPEAKER.finditer(text))
+    if not labels or labels[0].start() > 0:
+        head = text[: labels[0].start()] if labels else text
+        turns.append((None, head))
+    for label, following in zip(labels, labels[1:] + [None]):
+        end = following.start() if following else len(text)
+        speaker = " ".join(label.group(1).split())
+        if speaker.isupper():
+            speaker = speaker.title()  # "SARAH SMITH" and "Sarah Smith" are one speaker
+        turns.append((speaker, text[label.end() : end]))
+
+    lines: list[str] = []
+    last_speaker: str | None = None
+    for speaker, body in turns:
+        body = _clean(" ".join(body.split()))
+        if not body or _is_small_talk(body):
+            continue
+        if speaker is not None and speaker == last_speaker and lines:
+            # Captions repeat the speaker on every line; merge into one turn
+            lines[-1] = f"{lines[-1]} {body}"
+        elif speaker is not None:
+            lines.append(f"{speaker}: {body}")
+        else:
+            lines.append(body)
+        last_speaker = speaker
+
+    # If every turn was dropped, parse the original rather than nothing
+    cleaned = "\n".join(lines) or raw_text.strip()
+    return PreprocessedTranscript(
+        text=cleaned,
+        tokens_before=estimate_text_tokens(raw_text),
+        tokens_after=estimate_text_tokens(cleaned),
+    )
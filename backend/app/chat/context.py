@@ -0,0 +1,92 @@
+"""
+Bounded chat context.
+
+Only the most recent ``chat_context_messages`` messages are sent verbatim;
+everything older is folded into a rolling summary stored on the session.
+The summary is refreshed in the background after each assistant reply, so
+prompt size stays flat however long the conversation runs.
+"""
+
+import logging
+import uuid
+
+from sqlalchemy import update
+from sqlmodel import select
+
+from app.agents.chat_strategist import summarize_conversation
+from app.chat.state import load_recent_messages, session_state
+from app.core.config import settings
+from app.core.database import async_session
+from app.models.chat_message import ChatMessage
+from app.models.session import Session
+
+logger = logging.getLogger(__name__)
+
+# Sessions with a summary refresh in flight in this process
+_refreshing: set[uuid.UUID] = set()
+
+
+async def refresh_summary(session_id: uuid.UUID) -> None:
+    """Fold messages that have left the context window into the summary."""
+    if session_id in _refreshing:
+        return
+    # With warm state we know without a query whether anything has left
+    # the context window since the last refresh
+    state = session_state.peek(session_id)
+    if (
+        state is not None
+        and state.last_turn - settings.chat_context_messages <= state.chat_summary_turn
+    ):
+        return
+    _refreshing.add(session_id)
+    try:
+        async with async_session() as db:
+            session = await db.get(Session, session_id)
+            if not session:
+                return
+            previous_summary = session.chat_summary
+            summarized_turn = session.chat_summary_turn
+
+            window = await load_recent_messages(db, session_id)
+            if len(window) < settings.chat_context_messages:
+                return
+            window_start = window[0].turn_number
+
+            result = await db.exec(
+                select(ChatMessage)
+                .where(ChatMessage.session_id == session_id)  # type: ignore[arg-type]
+                .where(ChatMessage.turn_number > summarized_turn)  # type: ignore[arg-type]
+                .where(ChatMessage.turn_number < window_start)  # type: ignore[arg-type]
+                .order_by(ChatMessage.turn_number)  # type: ignore[arg-type]
+            )
+            stale = result.all()
+
+        if not stale:
+            return
+
+        summary = await summarize_conversation(
+            previous_summary,
+            [{"role": m.role, "content": m.content} for m in stale],
+        )
+        if not summary:
+            return
+
+        async with async_session() as db:
+            # Compare-and-set so a concurrent refresh in another worker
+            # cannot be overwritten by an older summary
+            result = await db.exec(
+                update(Session)
+                .where(Session.id == session_id)  # type: ignore[arg-type]
+                .where(Session.chat_summary_turn == summarized_turn)  # type: ignore[arg-type]
+                .values(chat_summary=summary, chat_summary_turn=stale[-1].turn_number)
+            )
+            await db.commit()
+
+        state = session_state.peek(session_id)
+        if state is not None and result.rowcount:
+            state.chat_summary = summary
+            state.chat_summary_turn = stale[-1].turn_number
+    except Exception:
+        logger.exception("Failed to refresh chat summary for session %s", session_id)
+    finally:
+        _refreshing.discard(session_id)
@@ -0,0 +1,66 @@
+"""
+Incremental preference extraction from chat.
+
+After each assistant reply the newest user/assistant exchange is checked
+for preferences in the background and merged into the session's
+``Preference`` rows, so profile generation can work from preferences alone
+instead of re-reading the whole chat log.
+"""
+
+import asyncio
+import logging
+import uuid
+
+from sqlmodel import select
+
+from app.agents.preference_extractor import extract_turn_preferences
+from app.core.database import async_session
+from app.core.metrics import metrics
+from app.models.preference import Preference
+from app.sessions.service import merge_chat_preferences, notify_preferences_changed
+
+logger = logging.getLogger(__name__)
+
+# Turns of one session are merged one at a time so two extractions cannot
+# both insert the same new preference. Locks are dropped with their last user.
+_locks: dict[uuid.UUID, asyncio.Lock] = {}
+_lock_users: dict[uuid.UUID, int] = {}
+
+
+async def extract_from_turn(
+    session_id: uuid.UUID,
+    user_message: str,
+    assistant_message: str,
+) -> None:
+    """Merge the preferences stated in one chat exchange into the session."""
+    lock = _locks.setdefault(session_id, asyncio.Lock())
+    _lock_users[session_id] = _lock_users.get(session_id, 0) + 1
+    try:
+        async with lock:
+            async with async_session() as db:
+                result = await db.exec(
+                    select(Preference)
+                    .where(Preference.session_id == session_id)  # type: ignore[arg-type]
+                )
+                known = list(result.all())
+
+            known_dicts = [{"category": p.category, "value": p.value} for p in known]
+            extracted = await extract_turn_preferences(
+                user_message, assistant_message, known_dicts
+            )
+            if not extracted:
+                return
+
+            async with async_session() as db:
+                changed = await merge_chat_preferences(db, session_id, known, extracted)
+                if changed:
+                    await notify_preferences_changed(db, session_id)
+                await db.commit()
+            metrics.inc("chat.preferences.extracted", changed)
+    except Exception:
+        logger.exception("Failed to extract chat preferences for session %s", session_id)
+    finally:
+        _lock_users[session_id] -= 1
+        if not _lock_users[session_id]:
+            del _lock_users[session_id]
+            del _locks[session_id]
@@ -1,19 +1,29 @@
-import json
+import asyncio
 import uuid
-from collections.abc import AsyncGenerator
+from collections.abc import AsyncIterator
 from datetime import datetime, timezone
 from typing import Any
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException
 from fastapi.responses import StreamingResponse
-from sqlmodel import func, select
+from sqlalchemy import case, update
+from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.agents.chat_strategist import stream_chat_response
+from app.agents.chat_strategist import MAX_TOKENS, stream_chat_response
+from app.chat.context import refresh_summary
+from app.chat.preferences import extract_from_turn
 from app.chat.schemas import ChatMessageRead, ChatMessageSend
+from app.chat.state import session_state
+from app.chat.streaming import coalesce_tokens
+from app.chat.streams import ChatStream, chat_streams, parse_event_id
+from app.core.config import settings
 from app.core.database import async_session, get_session
+from app.core.events import notify_session_event
+from app.core.metrics import metrics
+from app.core.sse import sse_response
+from app.core.tasks import spawn
 from app.models.chat_message import ChatMessage
-from app.models.preference import Preference
 from app.models.session import Session, SessionStatus
 
 router = APIRouter(prefix="/api/chat", tags=["chat"])
@@ -39,7 +49,7 @@ async def get_messages(
     result = await db.exec(
         select(ChatMessage)
         .where(ChatMessage.session_id == session_id)  # type: ignore[arg-type]
-        .order_by(ChatMessage.turn_number, ChatMessage.created_at)  # type: ignore[arg-type]
+        .order_by(ChatMessage.turn_number)  # type: ignore[arg-type]
     )
     messages = result.all()
 
@@ -52,123 +62,205 @@ async def get_messages(
 # ── POST /api/chat/{session_id}/messages ─────────────────────────────
 
 
-async def _stream_and_save(
-    session_id: uuid.UUID,
+async def _generate_and_save(
+    stream: ChatStream,
+    user_message: str,
     messages_for_openai: list[dict],
-    preferences: list[dict],
-    turn_number: int,
-) -> AsyncGenerator[str, None]:
-    """SSE generator that streams tokens and saves the complete assistant message."""
-    full_response: list[str] = []
+    preferences_context: str,
+    conversation_summary: str | None,
+) -> None:
+    """Publish the reply into ``stream`` and save the complete assistant message.
+
+    Runs as a background task, so the reply is generated (and paid for) once
+    however many times the client reconnects. Tokens are coalesced into
+    fewer, larger frames (see ``coalesce_tokens``). If the task is cancelled
+    because every client went away, the partial reply is saved with
+    ``is_interrupted`` set so the reserved turn number is still used. The
+    saved text is every token received, including any the coalescer had
+    not flushed yet.
+    """
+    session_id = stream.session_id
+    received: list[str] = []
+
+    async def upstream() -> AsyncIterator[str]:
+        async for token in stream_chat_response(
+            messages_for_openai, preferences_context, conversation_summary
+        ):
+            received.append(token)
+            yield token
+
+    interrupted = False
+    try:
+        async for chunk in coalesce_tokens(
+            upstream(),
+            flush_ms=settings.chat_stream_flush_ms,
+            flush_bytes=settings.chat_stream_flush_bytes,
+        ):
+            stream.publish({"type": "token", "content": chunk})
+    except asyncio.CancelledError:
+        interrupted = True
+        # Upper bound: the reply could have run to max_tokens
+        metrics.inc("chat.stream.tokens_saved", max(0, MAX_TOKENS - len(received)))
 
-    async for token in stream_chat_response(messages_for_openai, preferences):
-        full_response.append(token)
-        event = json.dumps({"type": "token", "content": token})
-        yield f"data: {event}\n\n"
+    complete_text = "".join(received)
+    # Publish what was still buffered so a reconnecting client sees it too
+    tail = complete_text[len(stream.text) :]
+    if tail:
+        stream.publish({"type": "token", "content": tail})
 
     # Save assistant message to DB using its own session
-    complete_text = "".join(full_response)
     async with async_session() as db:
         assistant_msg = ChatMessage(
             session_id=session_id,
             role="assistant",
             content=complete_text,
-            turn_number=turn_number,
+            turn_number=stream.turn_number,
+            is_interrupted=interrupted,
         )
         db.add(assistant_msg)
+        await db.exec(
+            update(Session)
+            .where(Session.id == session_id)  # type: ignore[arg-type]
+            .values(
+                message_count=Session.message_count + 1,
+                last_activity_at=datetime.now(timezone.utc),
+            )
+        )
         await db.commit()
-        await db.refresh(assistant_msg)
 
-        done_event = json.dumps(
-            {"type": "done", "message_id": str(assistant_msg.id)}
-        )
-        yield f"data: {done_event}\n\n"
+    state = session_state.peek(session_id)
+    if state is not None and complete_text:
+        state.remember("assistant", complete_text)
+
+    # Fold turns that just left the context window into the summary
+    spawn(refresh_summary(session_id), name=f"chat-summary-{session_id}")
+    # Pick up any preferences the buyer stated in this exchange
+    spawn(
+        extract_from_turn(session_id, user_message, complete_text),
+        name=f"chat-preferences-{session_id}",
+    )
+
+    stream.publish(
+        {"type": "done", "message_id": str(assistant_msg.id), "interrupted": interrupted}
+    )
+    if interrupted:
+        raise asyncio.CancelledError
 
 
 @router.post("/{session_id}/messages")
 async def send_message(
     session_id: uuid.UUID,
     body: ChatMessageSend,
-    db: AsyncSession = Depends(get_session),
 ) -> StreamingResponse:
     """
     Accept a user message and stream the AI assistant response via SSE.
 
     Flow:
-    1. Validate session exists; flip status to chat_active if needed.
-    2. Determine turn_number from existing message count.
-    3. Persist the user message.
-    4. Load preferences and chat history for OpenAI context.
-    5. Return a StreamingResponse that streams tokens, then saves the
-       assistant message and emits a final "done" event.
+    1. Look up the session's hot state (status, rendered preferences
+       context, rolling summary, recent messages); it is loaded from the
+       database only on a cache miss.
+    2. Flip status to chat_active if needed.
+    3. Atomically allocate turn numbers from the session's counter and
+       persist the user message.
+    4. Start the reply generation in the background and return a
+       StreamingResponse subscribed to it; the generation saves the
+       assistant message and emits a final "done" event. Every event has
+       an id, so a dropped client can resume via GET .../stream.
+
+    A warm turn costs one update and one insert before streaming; no pooled
+    connection is held while the reply streams — the final save opens its
+    own session.
     """
-    # 1. Validate session
-    session = await db.get(Session, session_id)
-    if not session:
+    # 1. Hot state (validates the session exists)
+    state = await session_state.get(session_id)
+    if state is None:
         raise HTTPException(status_code=404, detail="Session not found")
 
-    # Flip status to chat_active on the first message
-    if session.status in (SessionStatus.parsed.value, SessionStatus.parsing.value):
-        session.status = SessionStatus.chat_active.value
-        session.updated_at = datetime.now(timezone.utc)
-        db.add(session)
-
-    # 2. Count existing messages to determine turn_number
-    count_result = await db.exec(
-        select(func.count()).where(ChatMessage.session_id == session_id)  # type: ignore[arg-type]
-    )
-    existing_count: int = count_result.one()
-    user_turn = existing_count + 1
-    assistant_turn = existing_count + 2
-
-    # 3. Save user message
-    user_msg = ChatMessage(
-        session_id=session_id,
-        role="user",
-        content=body.content,
-        turn_number=user_turn,
-    )
-    db.add(user_msg)
-    await db.commit()
-    await db.refresh(user_msg)
+    now = datetime.now(timezone.utc)
+    async with async_session() as db:
+        # 2 + 3. One UPDATE ... RETURNING reserves the user and assistant
+        # turns and flips the status; the row lock serialises concurrent
+        # senders, so numbers are never handed out twice.
+        result = await db.exec(
+            update(Session)
+            .where(Session.id == session_id)  # type: ignore[arg-type]
+            .values(
+                last_turn_number=Session.last_turn_number + 2,
+                message_count=Session.message_count + 1,
+                status=case(
+                    (
+                        Session.status.in_(  # type: ignore[attr-defined]
+                            [SessionStatus.parsed.value, SessionStatus.parsing.value]
+                        ),
+                        SessionStatus.chat_active.value,
+                    ),
+                    else_=Session.status,
+                ),
+                updated_at=now,
+                last_activity_at=now,
+            )
+            .returning(Session.last_turn_number, Session.status)
+        )
+        allocated = result.first()
+        if allocated is None:
+            session_state.invalidate(session_id)
+            raise HTTPException(status_code=404, detail="Session not found")
+        last_turn, status = allocated
+        user_turn, assistant_turn = last_turn - 1, last_turn
 
-    # 4a. Load preferences for context
-    pref_result = await db.exec(
-        select(Preference).where(Preference.session_id == session_id)  # type: ignore[arg-type]
-    )
-    preferences_rows = pref_result.all()
-    preferences: list[dict] = [
-        {
-            "category": p.category,
-            "value": p.value,
-            "confidence": p.confidence,
-        }
-        for p in preferences_rows
-    ]
+        db.add(
+            ChatMessage(
+                session_id=session_id,
+                role="user",
+                content=body.content,
+                turn_number=user_turn,
+            )
+        )
+        if status != state.status:
+            await notify_session_event(db, session_id, {"type": "status", "status": status})
+        await db.commit()
 
-    # 4b. Load full chat history (including the message we just saved)
-    history_result = await db.exec(
-        select(ChatMessage)
-        .where(ChatMessage.session_id == session_id)  # type: ignore[arg-type]
-        .order_by(ChatMessage.turn_number, ChatMessage.created_at)  # type: ignore[arg-type]
-    )
-    history = history_result.all()
-    messages_for_openai: list[dict] = [
-        {"role": m.role, "content": m.content} for m in history
-    ]
+    state.status = status
+    state.last_turn = max(state.last_turn, last_turn)
+    state.remember("user", body.content)
 
-    # 5. Return SSE streaming response
-    return StreamingResponse(
-        _stream_and_save(
-            session_id=session_id,
-            messages_for_openai=messages_for_openai,
-            preferences=preferences,
-            turn_number=assistant_turn,
+    # 4. Generate in the background and stream it to this client
+    messages_for_openai = list(state.recent)
+    preferences_context = state.preferences_context
+    conversation_summary = state.chat_summary
+    stream = chat_streams.start(
+        session_id,
+        assistant_turn,
+        lambda stream: _generate_and_save(
+            stream, body.content, messages_for_openai, preferences_context, conversation_summary
         ),
-        media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "X-Accel-Buffering": "no",
-        },
     )
+    return sse_response(stream.subscribe())
+
+
+# ── GET  /api/chat/{session_id}/stream ───────────────────────────────
+
+
+@router.get("/{session_id}/stream")
+async def resume_stream(
+    session_id: uuid.UUID,
+    last_event_id: str = Header(alias="Last-Event-ID"),
+) -> StreamingResponse:
+    """
+    Reconnect to an in-flight (or just finished) assistant reply.
+
+    Replays the events after ``Last-Event-ID`` and then follows the live
+    stream. 404 if this worker no longer holds the stream; the client
+    should then reload the message history.
+    """
+    parsed = parse_event_id(last_event_id)
+    if parsed is None:
+        raise HTTPException(status_code=400, detail="Malformed Last-Event-ID")
+    turn_number, seq = parsed
+
+    stream = chat_streams.get(session_id, turn_number)
+    if stream is None:
+        raise HTTPException(status_code=404, detail="Stream not found")
+
+    metrics.inc("chat.streams.resumed")
+    return sse_response(stream.subscribe(after_seq=seq))
@@ -16,6 +16,7 @@ class ChatMessageRead(BaseModel):
     content: str
     strategy_used: str | None = None
     turn_number: int
+    is_interrupted: bool = False
     created_at: str
 
     model_config = {"from_attributes": True}
@@ -32,6 +33,7 @@ class ChatMessageRead(BaseModel):
             data["content"] = values.content
             data["strategy_used"] = values.strategy_used
             data["turn_number"] = values.turn_number
+            data["is_interrupted"] = values.is_interrupted
             data["created_at"] = (
                 values.created_at.isoformat()
                 if isinstance(values.created_at, datetime)
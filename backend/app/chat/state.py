@@ -0,0 +1,152 @@
+"""
+Per-session hot state for chat turns.
+
+Keeps, for recently active sessions, everything a chat turn needs besides
+the new message itself: the session status, the last turn number seen, the
+rendered preferences context, the rolling summary and the recent message
+window. A warm turn then costs one insert plus the LLM call.
+
+Entries are LRU-evicted and must be invalidated whenever preferences change
+or a profile is generated (see ``session_state.invalidate``).
+"""
+
+import asyncio
+import uuid
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+
+from sqlalchemy import event
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.agents.chat_strategist import build_preferences_context
+from app.core.config import settings
+from app.core.database import async_session
+from app.core.metrics import metrics
+from app.models.chat_message import ChatMessage
+from app.models.preference import Preference
+from app.models.session import Session
+
+
+@dataclass
+class SessionState:
+    status: str
+    last_turn: int
+    preferences_context: str
+    chat_summary: str | None
+    chat_summary_turn: int
+    recent: deque[dict]
+
+    def remember(self, role: str, content: str) -> None:
+        self.recent.append({"role": role, "content": content})
+
+
+async def load_recent_messages(db: AsyncSession, session_id: uuid.UUID) -> list[ChatMessage]:
+    """Return the verbatim context window, oldest first."""
+    result = await db.exec(
+        select(ChatMessage)
+        .where(ChatMessage.session_id == session_id)  # type: ignore[arg-type]
+        .order_by(ChatMessage.turn_number.desc())  # type: ignore[attr-defined]
+        .limit(settings.chat_context_messages)
+    )
+    return list(reversed(result.all()))
+
+
+class SessionStateCache:
+    def __init__(self, max_entries: int) -> None:
+        self._max_entries = max_entries
+        self._entries: OrderedDict[uuid.UUID, SessionState] = OrderedDict()
+        # Single-flight loads so concurrent first turns share one state object
+        self._loading: dict[uuid.UUID, asyncio.Future[SessionState | None]] = {}
+        # Loads that were invalidated mid-flight and must not be cached
+        self._stale_loads: set[uuid.UUID] = set()
+        metrics.gauge("chat.state_cache.entries", lambda: len(self._entries))
+
+    async def get(self, session_id: uuid.UUID) -> SessionState | None:
+        """Return the cached state, loading it from the database on a miss."""
+        state = self._entries.get(session_id)
+        if state is not None:
+            self._entries.move_to_end(session_id)
+            metrics.inc("chat.state_cache.hits")
+            return state
+
+        pending = self._loading.get(session_id)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        metrics.inc("chat.state_cache.misses")
+        future: asyncio.Future[SessionState | None] = asyncio.get_running_loop().create_future()
+        self._loading[session_id] = future
+        try:
+            state = await _load(session_id)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            # Nobody may be waiting on the future; mark its error as seen
+            future.exception()
+            raise
+        finally:
+            self._loading.pop(session_id, None)
+
+        future.set_result(state)
+        stale = session_id in self._stale_loads
+        self._stale_loads.discard(session_id)
+        if state is not None and not stale:
+            self._entries[session_id] = state
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+                metrics.inc("chat.state_cache.evictions")
+        return state
+
+    def peek(self, session_id: uuid.UUID) -> SessionState | None:
+        """Return the cached state without loading it."""
+        return self._entries.get(session_id)
+
+    def invalidate(self, session_id: uuid.UUID) -> None:
+        self._entries.pop(session_id, None)
+        if session_id in self._loading:
+            self._stale_loads.add(session_id)
+
+    def invalidate_on_commit(self, db: AsyncSession, session_id: uuid.UUID) -> None:
+        """Invalidate once ``db``'s transaction commits.
+
+        Invalidating before the commit would let a concurrent turn reload the
+        old rows and cache them again until the next change.
+        """
+        event.listen(
+            db.sync_session, "after_commit", lambda _: self.invalidate(session_id), once=True
+        )
+
+
+async def _load(session_id: uuid.UUID) -> SessionState | None:
+    async with async_session() as db:
+        session = await db.get(Session, session_id)
+        if not session:
+            return None
+
+        pref_result = await db.exec(
+            select(Preference).where(Preference.session_id == session_id)  # type: ignore[arg-type]
+        )
+        preferences = [
+            {"category": p.category, "value": p.value, "confidence": p.confidence}
+            for p in pref_result.all()
+        ]
+
+        history = await load_recent_messages(db, session_id)
+
+    return SessionState(
+        status=session.status,
+        last_turn=session.last_turn_number,
+        preferences_context=build_preferences_context(preferences),
+        chat_summary=session.chat_summary,
+        chat_summary_turn=session.chat_summary_turn,
+        recent=deque(
+            ({"role": m.role, "content": m.content} for m in history),
+            maxlen=settings.chat_context_messages,
+        ),
+    )
+
+
+session_state = SessionStateCache(max_entries=settings.chat_state_cache_size)
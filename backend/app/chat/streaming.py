@@ -0,0 +1,79 @@
+"""
+Token coalescing for the SSE chat stream.
+
+OpenAI streams one delta per token, often only a few bytes each. Writing
+every delta as its own SSE frame means hundreds of tiny socket writes per
+reply; ``coalesce_tokens`` batches them instead, flushing every
+``flush_ms`` milliseconds or ``flush_bytes`` bytes, whichever comes first.
+The first token is always sent immediately so time-to-first-token is
+unchanged, and whatever is buffered is flushed as soon as the upstream
+stream ends.
+"""
+
+import asyncio
+from collections.abc import AsyncIterator
+
+from app.core.metrics import metrics
+
+_END = object()
+
+
+async def coalesce_tokens(
+    tokens: AsyncIterator[str],
+    flush_ms: int,
+    flush_bytes: int,
+) -> AsyncIterator[str]:
+    """Re-chunk a token stream into larger, time- and size-bounded pieces."""
+    if flush_ms <= 0:
+        async for token in tokens:
+            metrics.inc("chat.stream.tokens")
+            yield token
+        return
+
+    # Tokens are read by a separate task so a flush deadline can fire while
+    # the next token is still in flight
+    queue: asyncio.Queue[object] = asyncio.Queue()
+
+    async def pump() -> None:
+        try:
+            async for token in tokens:
+                metrics.inc("chat.stream.tokens")
+                queue.put_nowait(token)
+        except Exception as exc:
+            queue.put_nowait(exc)
+        finally:
+            queue.put_nowait(_END)
+
+    loop = asyncio.get_running_loop()
+    reader = asyncio.create_task(pump())
+    buffer: list[str] = []
+    size = 0
+    deadline: float | None = None
+    first = True
+    try:
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - loop.time())
+            try:
+                item = await asyncio.wait_for(queue.get(), timeout)
+            except asyncio.TimeoutError:
+                item = None
+
+            if isinstance(item, str):
+                buffer.append(item)
+                size += len(item.encode())
+                if deadline is None:
+                    deadline = loop.time() + flush_ms / 1000
+                if not first and size < flush_bytes:
+                    continue
+
+            # Deadline reached, buffer full, first token, error or end
+            if buffer:
+                yield "".join(buffer)
+                buffer, size, deadline, first = [], 0, None, False
+
+            if isinstance(item, Exception):
+                raise item
+            if item is _END:
+                return
+    finally:
+        reader.cancel()
@@ -0,0 +1,185 @@
+"""
+Resumable chat reply streams.
+
+Each assistant reply is generated by a background task that publishes SSE
+events into a ``ChatStream``; HTTP responses only subscribe to it. Every
+event carries an id of the form ``<turn>-<seq>``, so a client that drops
+mid-reply can reconnect with ``Last-Event-ID`` and receive what it missed
+followed by the live tail, instead of sending the message again and paying
+for a second generation.
+
+The per-stream event buffer is bounded; a client that has fallen further
+behind than the buffer reaches gets a single ``snapshot`` event with the
+text of the dropped events, then the buffered remainder. Finished streams
+are kept for a short retention window so a reconnect that races the final
+event still succeeds.
+
+When the last subscriber goes away mid-reply, the generation is cancelled
+after a grace period (``chat_stream_disconnect_grace_seconds``) unless a
+client reconnects first, so an abandoned reply stops costing tokens.
+
+The registry is per process: reconnects must reach the worker that owns the
+stream (sticky routing). Anywhere else they get a 404 and the client falls
+back to reloading the message history.
+"""
+
+import asyncio
+import json
+import logging
+import uuid
+from collections import deque
+from collections.abc import AsyncIterator, Awaitable, Callable
+from typing import Any
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.tasks import spawn
+
+logger = logging.getLogger(__name__)
+
+
+def parse_event_id(event_id: str) -> tuple[int, int] | None:
+    """Split a ``<turn>-<seq>`` event id; None if malformed."""
+    turn, _, seq = event_id.partition("-")
+    try:
+        return int(turn), int(seq)
+    except ValueError:
+        return None
+
+
+class ChatStream:
+    def __init__(self, session_id: uuid.UUID, turn_number: int, max_events: int) -> None:
+        self.session_id = session_id
+        self.turn_number = turn_number
+        self.finished = False
+        self.task: asyncio.Task | None = None
+        self.subscribers = 0
+        self._abandon_timer: asyncio.TimerHandle | None = None
+        # (seq, JSON payload, token chunks published before this event)
+        self._events: deque[tuple[int, str, int]] = deque(maxlen=max_events)
+        self._last_seq = 0
+        self._text: list[str] = []
+        self._changed = asyncio.Event()
+
+    @property
+    def text(self) -> str:
+        """All token content published so far."""
+        return "".join(self._text)
+
+    def publish(self, payload: dict[str, Any]) -> None:
+        self._last_seq += 1
+        self._events.append((self._last_seq, json.dumps(payload), len(self._text)))
+        if payload.get("type") == "token":
+            self._text.append(payload["content"])
+        self._wake()
+
+    def finish(self) -> None:
+        self.finished = True
+        self._wake()
+
+    def _attach(self) -> None:
+        self.subscribers += 1
+        if self._abandon_timer is not None:
+            self._abandon_timer.cancel()
+            self._abandon_timer = None
+
+    def _detach(self) -> None:
+        self.subscribers -= 1
+        if self.subscribers == 0 and not self.finished:
+            self._abandon_timer = asyncio.get_running_loop().call_later(
+                settings.chat_stream_disconnect_grace_seconds, self._abandon
+            )
+
+    def _abandon(self) -> None:
+        self._abandon_timer = None
+        if self.subscribers == 0 and not self.finished and self.task is not None:
+            logger.info("No subscribers left; cancelling reply for session %s", self.session_id)
+            metrics.inc("chat.streams.cancelled")
+            self.task.cancel()
+
+    def _wake(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def _frame(self, seq: int, data: str) -> str:
+        # Each frame is one write to the client socket
+        metrics.inc("chat.stream.frames")
+        return f"id: {self.turn_number}-{seq}\ndata: {data}\n\n"
+
+    async def subscribe(self, after_seq: int = 0) -> AsyncIterator[str]:
+        """Yield SSE frames for events after ``after_seq``, then follow live."""
+        cursor = after_seq
+        self._attach()
+        try:
+            while True:
+                changed = self._changed
+                if self._events and cursor < self._events[0][0] - 1:
+                    # Missed events have been dropped from the buffer: send the
+                    # text they carried in one piece, then replay the rest
+                    oldest, _, chunks_before = self._events[0]
+                    metrics.inc("chat.streams.snapshots")
+                    cursor = oldest - 1
+                    snapshot = "".join(self._text[:chunks_before])
+                    yield self._frame(
+                        cursor, json.dumps({"type": "snapshot", "content": snapshot})
+                    )
+                for seq, data, _ in list(self._events):
+                    if seq > cursor:
+                        cursor = seq
+                        yield self._frame(seq, data)
+                if self.finished and cursor >= self._last_seq:
+                    return
+                await changed.wait()
+        finally:
+            self._detach()
+
+
+class StreamRegistry:
+    """Latest reply stream per session, generated in the background."""
+
+    def __init__(self) -> None:
+        self._streams: dict[uuid.UUID, ChatStream] = {}
+        metrics.gauge(
+            "chat.streams.active",
+            lambda: sum(1 for s in self._streams.values() if not s.finished),
+        )
+
+    def start(
+        self,
+        session_id: uuid.UUID,
+        turn_number: int,
+        produce: Callable[[ChatStream], Awaitable[None]],
+    ) -> ChatStream:
+        """Register a new stream and run ``produce`` to fill it."""
+        stream = ChatStream(session_id, turn_number, settings.chat_stream_buffer_events)
+        self._streams[session_id] = stream
+        stream.task = spawn(self._run(stream, produce), name=f"chat-stream-{session_id}")
+        return stream
+
+    def get(self, session_id: uuid.UUID, turn_number: int) -> ChatStream | None:
+        stream = self._streams.get(session_id)
+        if stream is None or stream.turn_number != turn_number:
+            return None
+        return stream
+
+    async def _run(
+        self,
+        stream: ChatStream,
+        produce: Callable[[ChatStream], Awaitable[None]],
+    ) -> None:
+        try:
+            await produce(stream)
+        except Exception:
+            logger.exception("Chat reply generation failed for session %s", stream.session_id)
+        finally:
+            stream.finish()
+            asyncio.get_running_loop().call_later(
+                settings.chat_stream_retention_seconds, self._expire, stream
+            )
+
+    def _expire(self, stream: ChatStream) -> None:
+        if self._streams.get(stream.session_id) is stream:
+            del self._streams[stream.session_id]
+
+
+chat_streams = StreamRegistry()
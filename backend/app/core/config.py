@@ -7,8 +7,99 @@ class Settings(BaseSettings):
     # Direct connection (port 5432) — used by Alembic migrations
     direct_url: str = ""
     openai_api_key: str = ""
+    # Optional OpenAI-compatible endpoint (e.g. a local stand-in server)
+    openai_base_url: str = ""
     frontend_url: str = "http://localhost:5173"
 
+    # SQLAlchemy connection pool (per process)
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout_seconds: float = 30
+
+    # Shared LLM client connection pool
+    llm_http2: bool = True
+    llm_max_connections: int = 100
+    llm_max_keepalive_connections: int = 20
+    llm_keepalive_expiry_seconds: float = 30
+    llm_timeout_seconds: float = 60
+    llm_connect_timeout_seconds: float = 5
+
+    # OpenAI admission scheduler — quotas for the account's rate-limit tier
+    openai_requests_per_minute: float = 500
+    openai_tokens_per_minute: float = 200000
+    llm_max_in_flight: int = 32
+    # Waiting this long promotes a caller one priority class
+    llm_priority_aging_seconds: float = 30
+    # Pause after a 429 that carries no Retry-After header
+    llm_rate_limit_pause_seconds: float = 5
+
+    # Retries, circuit breaker and hedging for agent calls
+    llm_retry_attempts: int = 3
+    llm_retry_base_delay_seconds: float = 0.5
+    llm_retry_max_delay_seconds: float = 8
+    llm_breaker_failure_threshold: int = 5
+    llm_breaker_reset_seconds: float = 30
+    llm_hedge_enabled: bool = False
+    # Observed calls needed before the p95 used as the hedge delay is trusted
+    llm_hedge_min_samples: int = 20
+
+    # Chat context: most recent messages sent verbatim; older ones are
+    # folded into a rolling summary stored on the session
+    chat_context_messages: int = 12
+    # Sessions whose chat hot state is kept in memory (LRU)
+    chat_state_cache_size: int = 1000
+    # SSE token coalescing: buffered tokens are flushed as one frame every
+    # chat_stream_flush_ms or once chat_stream_flush_bytes accumulate,
+    # whichever comes first. 0 ms sends one frame per token.
+    chat_stream_flush_ms: int = 40
+    chat_stream_flush_bytes: int = 256
+    # Events kept per reply stream for Last-Event-ID replay, and how long a
+    # finished stream stays resumable
+    chat_stream_buffer_events: int = 1024
+    chat_stream_retention_seconds: int = 60
+    # A reply nobody is subscribed to for this long is cancelled upstream
+    chat_stream_disconnect_grace_seconds: float = 10
+
+    # Session list pagination
+    session_page_size: int = 20
+    session_page_size_max: int = 100
+
+    # Dashboard session event streams: comment sent on idle connections
+    session_events_keepalive_seconds: float = 15
+
+    # Background job worker pool
+    job_concurrency: int = 4
+    job_max_attempts: int = 3
+    # Jobs left "running" longer than this are assumed orphaned by a restart
+    job_stale_after_seconds: int = 300
+    # How often each worker requeues stale jobs left by a crashed process
+    job_sweep_interval_seconds: float = 60
+    # How often JobQueue.run polls a job another worker is running
+    job_wait_poll_seconds: float = 1.0
+
+    # Transcripts longer than this are parsed map-reduce style in chunks
+    transcript_chunk_chars: int = 12000
+    transcript_chunk_overlap_turns: int = 2
+    transcript_chunk_concurrency: int = 4
+
+    # Transcript parse result cache (in-process LRU in front of Postgres)
+    parse_cache_max_entries: int = 256
+    parse_cache_max_rows: int = 10000
+    parse_cache_ttl_seconds: int = 7 * 24 * 3600
+
+    # Bulk transcript import
+    bulk_import_concurrency: int = 8
+    bulk_import_batch_size: int = 200
+    bulk_import_max_items: int = 1000
+
+    # Cross-worker profile generation lease: held for at most this long (a
+    # crashed holder's lease expires), polled this often by waiters
+    profile_lease_seconds: float = 300
+    profile_lease_poll_seconds: float = 0.5
+
+    # Stored responses for Idempotency-Key replays
+    idempotency_ttl_seconds: int = 24 * 3600
+
     @property
     def async_database_url(self) -> str:
         """Convert pooled postgres URL to asyncpg format."""
@@ -21,6 +112,13 @@ class Settings(BaseSettings):
             return url.replace("postgres://", "postgresql+asyncpg://", 1)
         return url
 
+    @property
+    def listen_database_url(self) -> str:
+        """Direct URL for LISTEN/NOTIFY, which PgBouncer's transaction mode drops."""
+        # asyncpg takes plain postgresql:// URLs, without a "+driver" suffix
+        scheme, sep, rest = self.migration_database_url.partition("://")
+        return scheme.split("+")[0] + sep + rest
+
     @property
     def migration_database_url(self) -> str:
         """Direct URL for Alembic migrations (falls back to database_url)."""
@@ -4,15 +4,30 @@ from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.core.config import settings
+from app.core.metrics import metrics
 
 engine = create_async_engine(
     settings.async_database_url,
     echo=False,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_timeout=settings.db_pool_timeout_seconds,
     # Disable prepared statement cache — required for PgBouncer transaction mode
     connect_args={"statement_cache_size": 0, "prepared_statement_cache_size": 0},
 )
 async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
+# Pool utilisation — connections should only be checked out for short units
+# of work, never across an LLM call or an SSE stream.
+metrics.gauge("db.pool.size", lambda: engine.pool.size())  # type: ignore[attr-defined]
+metrics.gauge("db.pool.checked_out", lambda: engine.pool.checkedout())  # type: ignore[attr-defined]
+metrics.gauge("db.pool.overflow", lambda: max(0, engine.pool.overflow()))  # type: ignore[attr-defined]
+metrics.gauge(
+    "db.pool.utilisation",
+    lambda: engine.pool.checkedout()  # type: ignore[attr-defined]
+    / (settings.db_pool_size + settings.db_max_overflow),
+)
+
 
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
     async with async_session() as session:
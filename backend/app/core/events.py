@@ -0,0 +1,137 @@
+"""
+Session change events, pushed to open dashboards over SSE.
+
+Writers call ``notify_session_event`` inside the transaction that makes the
+change; Postgres delivers the ``NOTIFY`` on commit (and drops it on
+rollback) to every worker's listener, which fans the event out to the
+in-process subscribers of that session. An idle dashboard therefore costs
+no queries at all — only one LISTEN connection per worker.
+
+LISTEN needs a session-level connection, which PgBouncer in transaction
+mode does not provide, so the listener connects with the direct URL.
+NOTIFY itself is sent on the pooled connection of the writing transaction.
+If the listener loses its connection, subscribers get a ``resync`` event on
+reconnect, since anything sent in between was missed.
+"""
+
+import asyncio
+import json
+import logging
+import uuid
+from collections import defaultdict
+from typing import Any
+
+import asyncpg
+from sqlalchemy import func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "session_events"
+
+# Events buffered per subscriber before it is told to resync instead
+_QUEUE_SIZE = 64
+_LISTENER_PING_SECONDS = 60
+_RECONNECT_MAX_SECONDS = 30
+
+
+async def notify_session_event(
+    db: AsyncSession, session_id: uuid.UUID, event: dict[str, Any]
+) -> None:
+    """Queue ``event`` for delivery when ``db``'s transaction commits."""
+    payload = json.dumps({"session_id": str(session_id), "event": event})
+    await db.exec(select(func.pg_notify(CHANNEL, payload)))  # type: ignore[call-overload]
+
+
+class SessionEventBus:
+    def __init__(self) -> None:
+        self._subscribers: dict[uuid.UUID, set[asyncio.Queue]] = defaultdict(set)
+        self._listener: asyncio.Task | None = None
+        metrics.gauge(
+            "session_events.subscribers",
+            lambda: sum(len(queues) for queues in self._subscribers.values()),
+        )
+
+    async def start(self) -> None:
+        self._listener = asyncio.create_task(self._listen(), name="session-events-listener")
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+    def subscribe(self, session_id: uuid.UUID) -> asyncio.Queue:
+        """Return a queue receiving the session's events until unsubscribed."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=_QUEUE_SIZE)
+        self._subscribers[session_id].add(queue)
+        return queue
+
+    def unsubscribe(self, session_id: uuid.UUID, queue: asyncio.Queue) -> None:
+        queues = self._subscribers.get(session_id)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self._subscribers[session_id]
+
+    def _deliver(self, session_id: uuid.UUID, event: dict[str, Any]) -> None:
+        for queue in self._subscribers.get(session_id, ()):
+            if queue.full():
+                # A stalled reader: drop its backlog and have it refetch
+                while not queue.empty():
+                    queue.get_nowait()
+                event_to_send: dict[str, Any] = {"type": "resync"}
+            else:
+                event_to_send = event
+            queue.put_nowait(event_to_send)
+        metrics.inc("session_events.delivered")
+
+    def _on_notify(self, _conn: Any, _pid: int, _channel: str, payload: str) -> None:
+        try:
+            message = json.loads(payload)
+            session_id = uuid.UUID(message["session_id"])
+        except (ValueError, KeyError, TypeError):
+            logger.warning("Ignoring malformed session event: %r", payload)
+            return
+        self._deliver(session_id, message["event"])
+
+    async def _listen(self) -> None:
+        delay = 1.0
+        while True:
+            conn = None
+            try:
+                conn = await asyncpg.connect(settings.listen_database_url)
+                closed = asyncio.Event()
+                conn.add_termination_listener(lambda _conn: closed.set())
+                await conn.add_listener(CHANNEL, self._on_notify)
+                delay = 1.0
+                # Anything sent while we were not listening was missed
+                for session_id in list(self._subscribers):
+                    self._deliver(session_id, {"type": "resync"})
+
+                while not closed.is_set():
+                    try:
+                        await asyncio.wait_for(closed.wait(), timeout=_LISTENER_PING_SECONDS)
+                    except asyncio.TimeoutError:
+                        # Detect a silently dropped connection
+                        await conn.execute("SELECT 1")
+                logger.warning("Session event listener connection closed")
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Session event listener failed")
+            finally:
+                if conn is not None and not conn.is_closed():
+                    await conn.close()
+            metrics.inc("session_events.reconnects")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, _RECONNECT_MAX_SECONDS)
+
+
+session_events = SessionEventBus()
@@ -0,0 +1,110 @@
+"""
+Idempotency-Key support for POST endpoints that spend tokens.
+
+The first response to a request carrying an ``Idempotency-Key`` header is
+stored in ``idempotency_keys``; a retry with the same key on the same path
+gets the stored response back instead of running the endpoint again.
+Concurrent retries in one process share the in-flight execution. Reusing a
+key for a different request body is rejected with 422.
+"""
+
+import hashlib
+import logging
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from fastapi import HTTPException, Response
+from sqlalchemy import delete
+from sqlalchemy.dialects.postgresql import insert
+
+from app.core.config import settings
+from app.core.database import async_session
+from app.core.metrics import metrics
+from app.core.single_flight import SingleFlight
+from app.models.idempotency_key import IdempotencyKey
+
+logger = logging.getLogger(__name__)
+
+_inflight = SingleFlight("idempotency")
+
+
+def fingerprint(body: bytes | str) -> str:
+    if isinstance(body, str):
+        body = body.encode()
+    return hashlib.sha256(body).hexdigest()
+
+
+async def _lookup(scope: str, key: str) -> IdempotencyKey | None:
+    async with async_session() as db:
+        row = await db.get(IdempotencyKey, (scope, key))
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=settings.idempotency_ttl_seconds)
+    if row is None or row.created_at < cutoff:
+        return None
+    return row
+
+
+async def _store(
+    scope: str, key: str, request_fingerprint: str, status_code: int, body: dict[str, Any]
+) -> None:
+    now = datetime.now(timezone.utc)
+    values = {
+        "fingerprint": request_fingerprint,
+        "status_code": status_code,
+        "response": body,
+        "created_at": now,
+    }
+    try:
+        async with async_session() as db:
+            # Overwrites only an expired entry still waiting to be pruned
+            await db.exec(
+                insert(IdempotencyKey)
+                .values(scope=scope, key=key, **values)
+                .on_conflict_do_update(index_elements=["scope", "key"], set_=values)
+            )
+            await db.exec(
+                delete(IdempotencyKey).where(
+                    IdempotencyKey.created_at  # type: ignore[arg-type]
+                    < now - timedelta(seconds=settings.idempotency_ttl_seconds)
+                )
+            )
+            await db.commit()
+    except Exception:
+        logger.exception("Failed to store idempotent response for key %s", key)
+
+
+async def run_idempotent(
+    scope: str,
+    key: str | None,
+    request_fingerprint: str,
+    response: Response,
+    fn: Callable[[], Awaitable[tuple[int, dict[str, Any]]]],
+) -> dict[str, Any]:
+    """Run ``fn`` once per ``(scope, key)`` and replay its response after.
+
+    ``fn`` returns ``(status_code, body)``. Without a key it simply runs.
+    """
+    if key is None:
+        status_code, body = await fn()
+        response.status_code = status_code
+        return body
+
+    async def execute() -> tuple[int, dict[str, Any], str, bool]:
+        stored = await _lookup(scope, key)
+        if stored is not None:
+            return stored.status_code, stored.response, stored.fingerprint, True
+        status_code, body = await fn()
+        await _store(scope, key, request_fingerprint, status_code, body)
+        return status_code, body, request_fingerprint, False
+
+    status_code, body, stored_fingerprint, replayed = await _inflight.run((scope, key), execute)
+    if stored_fingerprint != request_fingerprint:
+        raise HTTPException(
+            status_code=422,
+            detail="Idempotency-Key was already used for a different request",
+        )
+    if replayed:
+        metrics.inc("idempotency.replayed")
+        response.headers["Idempotent-Replayed"] = "true"
+    response.status_code = status_code
+    return body
@@ -0,0 +1,70 @@
+"""
+Minimal in-process metrics registry.
+
+Counters are monotonically increasing floats; gauges are callables sampled
+when a snapshot is taken; histograms keep a bounded window of recent
+observations and report percentiles. Exposed as JSON on ``GET /api/metrics``.
+"""
+
+import math
+from collections import defaultdict, deque
+from collections.abc import Callable
+
+
+class Histogram:
+    """Sliding window of the most recent observations."""
+
+    def __init__(self, window: int = 1000) -> None:
+        self._values: deque[float] = deque(maxlen=window)
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self._values.append(value)
+        self.count += 1
+
+    def percentile(self, p: float) -> float | None:
+        if not self._values:
+            return None
+        ordered = sorted(self._values)
+        index = min(len(ordered) - 1, max(0, math.ceil(p / 100 * len(ordered)) - 1))
+        return ordered[index]
+
+    def summary(self) -> dict[str, float | None]:
+        return {
+            "count": self.count,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "max": max(self._values) if self._values else None,
+        }
+
+
+class Metrics:
+    def __init__(self) -> None:
+        self._counters: dict[str, float] = defaultdict(float)
+        self._gauges: dict[str, Callable[[], float]] = {}
+        self._histograms: dict[str, Histogram] = defaultdict(Histogram)
+
+    def inc(self, name: str, value: float = 1) -> None:
+        self._counters[name] += value
+
+    def gauge(self, name: str, fn: Callable[[], float]) -> None:
+        """Register a callable sampled on every snapshot."""
+        self._gauges[name] = fn
+
+    def observe(self, name: str, value: float) -> None:
+        self._histograms[name].observe(value)
+
+    def histogram(self, name: str) -> Histogram:
+        return self._histograms[name]
+
+    def snapshot(self) -> dict[str, dict]:
+        return {
+            "counters": dict(sorted(self._counters.items())),
+            "gauges": {name: fn() for name, fn in sorted(self._gauges.items())},
+            "histograms": {
+                name: h.summary() for name, h in sorted(self._histograms.items())
+            },
+        }
+
+
+metrics = Metrics()
@@ -0,0 +1,69 @@
+"""
+Coalescing of concurrent identical work.
+
+``SingleFlight.run(key, fn)`` starts ``fn`` at most once per key at a time;
+callers arriving while it is in flight await the same result instead of
+repeating the work. The work runs as its own task, so it completes (and
+its result is shared) even if the caller that started it goes away.
+
+An exception raised by ``fn`` is re-raised in every waiting caller, which
+handles it like its own (a 404 stays a 404). It is only logged here when no
+caller is left waiting to receive it.
+"""
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any, TypeVar
+
+from app.core.metrics import metrics
+from app.core.tasks import spawn
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    def __init__(self, name: str) -> None:
+        self._name = name
+        self._inflight: dict[Hashable, asyncio.Task[tuple[Any, Exception | None]]] = {}
+        self._waiters: dict[Hashable, int] = {}
+
+    async def run(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        task = self._inflight.get(key)
+        if task is None:
+            task = spawn(self._call(key, fn), name=f"single-flight-{self._name}")
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+        else:
+            metrics.inc(f"single_flight.{self._name}.shared")
+
+        self._waiters[key] = self._waiters.get(key, 0) + 1
+        try:
+            result, error = await asyncio.shield(task)
+        finally:
+            self._waiters[key] -= 1
+            if not self._waiters[key]:
+                del self._waiters[key]
+        if error is not None:
+            raise error
+        return result
+
+    async def _call(
+        self, key: Hashable, fn: Callable[[], Awaitable[Any]]
+    ) -> tuple[Any, Exception | None]:
+        # Returned rather than raised so the background task never fails;
+        # the callers re-raise it instead
+        try:
+            return await fn(), None
+        except Exception as exc:
+            if not self._waiters.get(key):
+                logger.error(
+                    "Single-flight %s failed with no caller waiting", self._name, exc_info=exc
+                )
+            return None, exc
+
+    def _forget(self, key: Hashable, task: asyncio.Task[Any]) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
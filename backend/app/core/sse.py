@@ -0,0 +1,20 @@
+"""
+Server-sent event responses.
+"""
+
+from collections.abc import AsyncIterator
+
+from fastapi.responses import StreamingResponse
+
+
+def sse_response(frames: AsyncIterator[str]) -> StreamingResponse:
+    """Stream pre-rendered SSE frames without proxy buffering."""
+    return StreamingResponse(
+        frames,
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",
+        },
+    )
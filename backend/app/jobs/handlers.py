@@ -0,0 +1,87 @@
+"""
+Background job handlers.
+
+Each handler receives the job's JSON payload and returns a JSON-able result
+that is stored on the job row. Raising marks the attempt as failed.
+"""
+
+import logging
+import uuid
+from datetime import datetime, timezone
+from typing import Any
+
+from sqlalchemy import update
+
+from app.agents.parse_cache import cache_key, parse_cache
+from app.agents.transcript_parser import parse_transcript
+from app.core.database import async_session
+from app.core.events import notify_session_event
+from app.jobs.queue import job_queue
+from app.models.session import Session
+from app.models.transcript import Transcript
+from app.sessions.service import apply_parse_result, notify_preferences_changed
+
+logger = logging.getLogger(__name__)
+
+PARSE_TRANSCRIPT = "parse_transcript"
+
+
+@job_queue.handler(PARSE_TRANSCRIPT)
+async def handle_parse_transcript(payload: dict[str, Any]) -> dict[str, Any]:
+    session_id = uuid.UUID(payload["session_id"])
+    transcript_id = uuid.UUID(payload["transcript_id"])
+
+    async with async_session() as db:
+        transcript = await db.get(Transcript, transcript_id)
+        if not transcript:
+            raise LookupError(f"Transcript {transcript_id} not found")
+        if transcript.applied_at is not None:
+            logger.info("Transcript %s already applied; skipping parse", transcript_id)
+            return {"preferences_count": 0, "skipped": True}
+        raw_text = transcript.raw_text
+
+    key = cache_key(raw_text)
+    # Preprocessing token counts describe this parse only; cache hits cost none
+    token_counts: dict[str, int] = {}
+    result = await parse_cache.get(key)
+    if result is None:
+        result = await parse_transcript(raw_text)
+        token_counts = {
+            "tokens_before": result.pop("tokens_before"),
+            "tokens_after": result.pop("tokens_after"),
+        }
+        # Keyword-only fallbacks and partial chunked parses are not cached so
+        # the next upload retries the LLM
+        if not result.get("degraded") and not result.get("partial"):
+            await parse_cache.put(key, result)
+
+    async with async_session() as db:
+        session = await db.get(Session, session_id)
+        if not session:
+            raise LookupError(f"Session {session_id} not found")
+
+        # A retried job may find its result already applied. Keyed on the
+        # transcript, not the session status: another transcript's job can
+        # mark the session parsed while this one is still pending.
+        claimed = await db.exec(
+            update(Transcript)
+            .where(Transcript.id == transcript_id)  # type: ignore[arg-type]
+            .where(Transcript.applied_at.is_(None))  # type: ignore[union-attr]
+            .values(applied_at=datetime.now(timezone.utc))
+            .returning(Transcript.id)
+        )
+        if claimed.first() is None:
+            logger.info("Transcript %s already applied; skipping write", transcript_id)
+            return {"preferences_count": 0, "skipped": True, **token_counts}
+
+        count = await apply_parse_result(db, session, result)
+        await notify_session_event(db, session_id, {"type": "status", "status": session.status})
+        await notify_preferences_changed(db, session_id)
+        await db.commit()
+
+    return {
+        "preferences_count": count,
+        "degraded": bool(result.get("degraded")),
+        "partial": bool(result.get("partial")),
+        **token_counts,
+    }
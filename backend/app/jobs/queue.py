@@ -0,0 +1,222 @@
+"""
+In-process background job queue backed by the durable ``jobs`` table.
+
+Jobs are written to Postgres by the request that creates them and then
+submitted to an asyncio worker pool with bounded concurrency. On startup
+every queued job is picked up again, and a periodic sweep requeues jobs
+left "running" past the stale window by a crashed or restarted process, so
+a restart never loses work. Other workers may still be running their own
+jobs, so a running job is only taken over once it has gone stale; the
+handlers are idempotent for the rare slow job that is run twice.
+"""
+
+import asyncio
+import logging
+import uuid
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import update
+from sqlmodel import select
+
+from app.core.config import settings
+from app.core.database import async_session
+from app.models.job import Job, JobStatus
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[dict[str, Any]], Awaitable[dict[str, Any] | None]]
+
+
+class JobQueue:
+    def __init__(self, concurrency: int, max_attempts: int) -> None:
+        self._concurrency = concurrency
+        self._max_attempts = max_attempts
+        self._handlers: dict[str, JobHandler] = {}
+        self._queue: asyncio.Queue[uuid.UUID] = asyncio.Queue()
+        self._workers: list[asyncio.Task] = []
+        self._sweeper: asyncio.Task | None = None
+
+    def handler(self, kind: str) -> Callable[[JobHandler], JobHandler]:
+        """Decorator registering the coroutine that runs jobs of ``kind``."""
+
+        def register(fn: JobHandler) -> JobHandler:
+            self._handlers[kind] = fn
+            return fn
+
+        return register
+
+    def submit(self, job_id: uuid.UUID) -> None:
+        """Hand a committed job to the worker pool."""
+        self._queue.put_nowait(job_id)
+
+    async def start(self) -> None:
+        """Spawn the workers and resubmit jobs left unfinished by a previous run."""
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"job-worker-{i}")
+            for i in range(self._concurrency)
+        ]
+        try:
+            await self._recover(startup=True)
+        except Exception:
+            logger.exception("Failed to recover unfinished jobs")
+        self._sweeper = asyncio.create_task(self._sweep(), name="job-sweeper")
+
+    async def stop(self) -> None:
+        tasks = self._workers + ([self._sweeper] if self._sweeper else [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers = []
+        self._sweeper = None
+
+    async def _sweep(self) -> None:
+        while True:
+            await asyncio.sleep(settings.job_sweep_interval_seconds)
+            try:
+                await self._recover(startup=False)
+            except Exception:
+                logger.exception("Stale job sweep failed")
+
+    async def _recover(self, startup: bool) -> None:
+        stale_before = datetime.now(timezone.utc) - timedelta(
+            seconds=settings.job_stale_after_seconds
+        )
+        async with async_session() as db:
+            # A job still "running" past the stale window was orphaned by a
+            # crash or restart — put it back in the queue.
+            await db.exec(
+                update(Job)
+                .where(Job.status == JobStatus.running.value)  # type: ignore[arg-type]
+                .where(Job.started_at < stale_before)  # type: ignore[arg-type, operator]
+                .values(status=JobStatus.queued.value)
+            )
+            await db.commit()
+
+            # At startup every queued job is ours to run. Later sweeps only
+            # take jobs queued for longer than the stale window, leaving
+            # fresh ones and retries waiting out their backoff to their owner.
+            query = select(Job.id).where(Job.status == JobStatus.queued.value)  # type: ignore[arg-type]
+            if not startup:
+                query = query.where(Job.created_at < stale_before)  # type: ignore[arg-type, operator]
+            result = await db.exec(query.order_by(Job.created_at))  # type: ignore[arg-type]
+            job_ids = result.all()
+
+        for job_id in job_ids:
+            self.submit(job_id)
+        if job_ids:
+            logger.info("Resubmitted %d unfinished jobs", len(job_ids))
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            except Exception:
+                logger.exception("Job %s crashed the worker loop", job_id)
+            finally:
+                self._queue.task_done()
+
+    async def _claim(self, job_id: uuid.UUID) -> Job | None:
+        """Atomically move a queued job to running; None if someone else has it."""
+        async with async_session() as db:
+            result = await db.exec(
+                update(Job)
+                .where(Job.id == job_id)  # type: ignore[arg-type]
+                .where(Job.status == JobStatus.queued.value)  # type: ignore[arg-type]
+                .values(
+                    status=JobStatus.running.value,
+                    attempts=Job.attempts + 1,
+                    started_at=datetime.now(timezone.utc),
+                )
+                .returning(Job)
+            )
+            job = result.scalars().first()
+            await db.commit()
+            return job
+
+    async def _finish(self, job_id: uuid.UUID, **values: Any) -> None:
+        async with async_session() as db:
+            await db.exec(
+                update(Job).where(Job.id == job_id).values(**values)  # type: ignore[arg-type]
+            )
+            await db.commit()
+
+    async def run(self, job_id: uuid.UUID) -> tuple[str, dict[str, Any] | None]:
+        """Run a committed job in the caller's task instead of the pool.
+
+        Returns the job's resulting status and its result (or error detail).
+        The job row still tracks the attempt, so a crash mid-run is
+        recovered like any other job. If the job was meanwhile taken by the
+        pool (a sweep hands long-queued jobs to it), this waits for that run
+        to finish and returns its outcome instead.
+        """
+        while True:
+            job = await self._claim(job_id)
+            if job is not None:
+                return await self._execute(job)
+
+            async with async_session() as db:
+                job = await db.get(Job, job_id)
+            if job is None:
+                return JobStatus.failed.value, {"error": f"Job {job_id} not found"}
+            if job.status == JobStatus.succeeded.value:
+                return job.status, job.result
+            if job.status == JobStatus.failed.value:
+                return job.status, {"error": job.error}
+            # Running elsewhere, or queued again by a retry or a sweep
+            await asyncio.sleep(settings.job_wait_poll_seconds)
+
+    async def _run(self, job_id: uuid.UUID) -> tuple[str, dict[str, Any] | None]:
+        job = await self._claim(job_id)
+        if job is None:
+            return JobStatus.running.value, None
+        return await self._execute(job)
+
+    async def _execute(self, job: Job) -> tuple[str, dict[str, Any] | None]:
+        job_id = job.id
+        handler = self._handlers.get(job.kind)
+        if handler is None:
+            logger.error("No handler registered for job kind %r", job.kind)
+            error = f"Unknown job kind: {job.kind}"
+            await self._finish(
+                job_id,
+                status=JobStatus.failed.value,
+                error=error,
+                finished_at=datetime.now(timezone.utc),
+            )
+            return JobStatus.failed.value, {"error": error}
+
+        try:
+            result = await handler(job.payload)
+        except Exception as exc:
+            logger.exception("Job %s (%s) failed on attempt %d", job_id, job.kind, job.attempts)
+            if job.attempts >= self._max_attempts:
+                await self._finish(
+                    job_id,
+                    status=JobStatus.failed.value,
+                    error=repr(exc),
+                    finished_at=datetime.now(timezone.utc),
+                )
+                return JobStatus.failed.value, {"error": repr(exc)}
+            await self._finish(job_id, status=JobStatus.queued.value, error=repr(exc))
+            # Back off before retrying so a flapping dependency can recover,
+            # without holding a worker slot while we wait
+            asyncio.get_running_loop().call_later(2**job.attempts, self.submit, job_id)
+            return JobStatus.queued.value, {"error": repr(exc)}
+
+        await self._finish(
+            job_id,
+            status=JobStatus.succeeded.value,
+            result=result,
+            error=None,
+            finished_at=datetime.now(timezone.utc),
+        )
+        return JobStatus.succeeded.value, result
+
+
+job_queue = JobQueue(
+    concurrency=settings.job_concurrency,
+    max_attempts=settings.job_max_attempts,
+)
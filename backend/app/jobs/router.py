@@ -0,0 +1,26 @@
+import uuid
+from typing import Any
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.database import get_session
+from app.jobs.schemas import JobRead
+from app.models.job import Job
+
+router = APIRouter(prefix="/api/jobs", tags=["jobs"])
+
+
+def api_response(data: Any = None, error: dict | None = None) -> dict:
+    return {"data": data, "error": error}
+
+
+@router.get("/{job_id}")
+async def get_job(
+    job_id: uuid.UUID,
+    db: AsyncSession = Depends(get_session),
+) -> dict:
+    job = await db.get(Job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return api_response(data=JobRead.model_validate(job).model_dump(mode="json"))
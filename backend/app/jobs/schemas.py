@@ -0,0 +1,16 @@
+import uuid
+from datetime import datetime
+
+from sqlmodel import SQLModel
+
+
+class JobRead(SQLModel):
+    id: uuid.UUID
+    kind: str
+    status: str
+    attempts: int
+    result: dict | None
+    error: str | None
+    created_at: datetime
+    started_at: datetime | None
+    finished_at: datetime | None
@@ -1,3 +1,5 @@
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from pathlib import Path
 
 from fastapi import FastAPI, Request
@@ -6,13 +8,32 @@ from fastapi.responses import FileResponse
 from fastapi.staticfiles import StaticFiles
 
 from app.core.config import settings
+from app.core.events import session_events
+from app.core.metrics import metrics
+from app.agents import llm
 from app.chat.router import router as chat_router
+from app.jobs import handlers as _job_handlers  # noqa: F401  (registers handlers)
+from app.jobs.queue import job_queue
+from app.jobs.router import router as jobs_router
 from app.sessions.router import router as sessions_router
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    await llm.startup()
+    await job_queue.start()
+    await session_events.start()
+    yield
+    await session_events.stop()
+    await job_queue.stop()
+    await llm.shutdown()
+
+
 app = FastAPI(
     title="RealEstateMadeEasy API",
     description="AI-powered buyer profiling tool for real estate agents",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -24,6 +45,7 @@ app.add_middleware(
 )
 
 app.include_router(chat_router)
+app.include_router(jobs_router)
 app.include_router(sessions_router)
 
 
@@ -32,6 +54,11 @@ async def health_check() -> dict:
     return {"status": "ok"}
 
 
+@app.get("/api/metrics")
+async def get_metrics() -> dict:
+    return metrics.snapshot()
+
+
 # ── Serve frontend static files in production ───────────────────────
 # The Dockerfile copies the built frontend into /app/static.
 # In local dev this directory won't exist, so this is a no-op.
@@ -1,5 +1,8 @@
 from app.models.buyer_profile import BuyerProfile
 from app.models.chat_message import ChatMessage
+from app.models.idempotency_key import IdempotencyKey
+from app.models.job import Job, JobStatus
+from app.models.parse_cache import ParseCacheEntry
 from app.models.preference import ConfidenceLevel, Preference, PreferenceSource
 from app.models.session import Session, SessionStatus
 from app.models.transcript import Transcript
@@ -8,6 +11,10 @@ __all__ = [
     "BuyerProfile",
     "ChatMessage",
     "ConfidenceLevel",
+    "IdempotencyKey",
+    "Job",
+    "JobStatus",
+    "ParseCacheEntry",
     "Preference",
     "PreferenceSource",
     "Session",
@@ -1,19 +1,26 @@
 import uuid
 from datetime import datetime, timezone
 
-from sqlalchemy import Column, DateTime
+from sqlalchemy import Column, DateTime, Index
 from sqlmodel import Field, SQLModel
 
 
 class ChatMessage(SQLModel, table=True):
     __tablename__ = "chat_messages"
+    __table_args__ = (
+        # Turn numbers come from sessions.last_turn_number; this index also
+        # serves every per-session history read in turn order
+        Index("uq_chat_messages_session_turn", "session_id", "turn_number", unique=True),
+    )
 
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
-    session_id: uuid.UUID = Field(foreign_key="sessions.id", index=True)
+    session_id: uuid.UUID = Field(foreign_key="sessions.id")
     role: str = Field(max_length=20)  # "assistant" or "user"
     content: str
     strategy_used: str | None = Field(default=None, max_length=50)
     turn_number: int
+    # Reply generation was cancelled after the client disconnected
+    is_interrupted: bool = Field(default=False)
     created_at: datetime = Field(
         default_factory=lambda: datetime.now(timezone.utc),
         sa_column=Column(DateTime(timezone=True), nullable=False),
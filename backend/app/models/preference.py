@@ -2,7 +2,7 @@ import uuid
 from datetime import datetime, timezone
 from enum import Enum
 
-from sqlalchemy import Column, DateTime, String
+from sqlalchemy import Column, Computed, DateTime, Index, SmallInteger, String, text
 from sqlmodel import Field, SQLModel
 
 
@@ -18,11 +18,33 @@ class PreferenceSource(str, Enum):
     both = "both"
 
 
+CONFIDENCE_RANK_SQL = (
+    "CASE confidence WHEN 'high' THEN 0 WHEN 'medium' THEN 1 WHEN 'low' THEN 2 ELSE 3 END"
+)
+
+
 class Preference(SQLModel, table=True):
     __tablename__ = "preferences"
+    # Serves the per-session listing in display order straight from the index
+    __table_args__ = (
+        Index(
+            "ix_preferences_session_rank_category",
+            "session_id",
+            "confidence_rank",
+            "category",
+        ),
+        # One row per distinct preference; hashed so long values fit the index
+        Index(
+            "uq_preferences_session_category_value",
+            "session_id",
+            "category",
+            text("md5(value)"),
+            unique=True,
+        ),
+    )
 
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
-    session_id: uuid.UUID = Field(foreign_key="sessions.id", index=True)
+    session_id: uuid.UUID = Field(foreign_key="sessions.id")
     category: str = Field(max_length=100)
     value: str
     # Store as VARCHAR, not native Postgres ENUM
@@ -30,6 +52,12 @@ class Preference(SQLModel, table=True):
         default=ConfidenceLevel.low.value,
         sa_column=Column(String(20), nullable=False, server_default="low"),
     )
+    # Display sort key derived by Postgres from confidence: 0 for high
+    # through 2 for low, 3 for anything else
+    confidence_rank: int | None = Field(
+        default=None,
+        sa_column=Column(SmallInteger, Computed(CONFIDENCE_RANK_SQL, persisted=True)),
+    )
     source: str = Field(
         default=PreferenceSource.transcript.value,
         sa_column=Column(String(20), nullable=False, server_default="transcript"),
@@ -2,7 +2,7 @@ import uuid
 from datetime import datetime, timezone
 from enum import Enum
 
-from sqlalchemy import Column, DateTime, String, Text
+from sqlalchemy import Column, DateTime, Index, String, Text, func, text
 from sqlmodel import Field, SQLModel
 
 
@@ -15,6 +15,31 @@ class SessionStatus(str, Enum):
 
 class Session(SQLModel, table=True):
     __tablename__ = "sessions"
+    # Keyset pagination access paths for the session list (newest first)
+    __table_args__ = (
+        Index(
+            "ix_sessions_created_at_id",
+            "created_at",
+            "id",
+            postgresql_include=[
+                "status",
+                "buyer_name",
+                "overall_confidence",
+                "updated_at",
+                "message_count",
+                "preference_count",
+                "last_activity_at",
+            ],
+        ),
+        Index("ix_sessions_status_created_at_id", "status", "created_at", "id"),
+        # Case-insensitive buyer name prefix search (LIKE 'abc%')
+        Index(
+            "ix_sessions_buyer_name_prefix",
+            text("lower(buyer_name) text_pattern_ops"),
+            "created_at",
+            "id",
+        ),
+    )
 
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     buyer_name: str | None = Field(default=None, max_length=255)
@@ -25,6 +50,20 @@ class Session(SQLModel, table=True):
         sa_column=Column(String(20), nullable=False, server_default="parsing"),
     )
     overall_confidence: float | None = Field(default=None)
+    # Highest chat turn_number handed out; bumped atomically per message
+    last_turn_number: int = Field(default=0)
+    # Rolling summary of chat turns older than the verbatim context window
+    chat_summary: str | None = Field(default=None, sa_column=Column(Text, nullable=True))
+    # Last turn_number folded into chat_summary
+    chat_summary_turn: int = Field(default=0)
+    # Denormalised for the session list; bumped by the write paths in the
+    # same transaction as the rows they count
+    message_count: int = Field(default=0)
+    preference_count: int = Field(default=0)
+    # Profile generation lease held by a worker until this time
+    profile_generating_until: datetime | None = Field(
+        default=None, sa_column=Column(DateTime(timezone=True), nullable=True)
+    )
     created_at: datetime = Field(
         default_factory=lambda: datetime.now(timezone.utc),
         sa_column=Column(DateTime(timezone=True), nullable=False),
@@ -33,3 +72,8 @@ class Session(SQLModel, table=True):
         default_factory=lambda: datetime.now(timezone.utc),
         sa_column=Column(DateTime(timezone=True), nullable=False),
     )
+    # Last message, preference or transcript written for the session
+    last_activity_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        sa_column=Column(DateTime(timezone=True), nullable=False, server_default=func.now()),
+    )
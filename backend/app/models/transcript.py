@@ -15,3 +15,9 @@ class Transcript(SQLModel, table=True):
         default_factory=lambda: datetime.now(timezone.utc),
         sa_column=Column(DateTime(timezone=True), nullable=False),
     )
+    # Set in the transaction that stores the transcript's parse result, so a
+    # retried or duplicated job never applies it twice
+    applied_at: datetime | None = Field(
+        default=None,
+        sa_column=Column(DateTime(timezone=True), nullable=True),
+    )
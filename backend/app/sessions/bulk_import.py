@@ -0,0 +1,187 @@
+"""
+Bulk transcript import.
+
+Creates sessions, transcripts and parse jobs for many buyers in batched
+multi-row inserts, then runs the parse jobs with bounded concurrency and
+streams per-item results back as NDJSON.
+"""
+
+import asyncio
+import json
+import logging
+import uuid
+from collections.abc import AsyncGenerator, AsyncIterator
+from datetime import datetime, timezone
+from typing import Any
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+
+from app.core.config import settings
+from app.core.database import async_session
+from app.core.tasks import spawn
+from app.jobs.handlers import PARSE_TRANSCRIPT
+from app.jobs.queue import job_queue
+from app.models.job import Job, JobStatus
+from app.models.session import Session, SessionStatus
+from app.models.transcript import Transcript
+from app.sessions.schemas import BulkImportItem
+
+logger = logging.getLogger(__name__)
+
+MIN_TRANSCRIPT_CHARS = 100
+
+
+def _line(payload: dict[str, Any]) -> str:
+    return json.dumps(payload) + "\n"
+
+
+async def read_lines(chunks: AsyncIterator[bytes], limit: int) -> list[str] | None:
+    """Collect the non-blank lines of an NDJSON body as it arrives.
+
+    Returns None as soon as there are more than ``limit`` lines, without
+    reading the rest of the body. Raises UnicodeDecodeError on bad UTF-8.
+    """
+    lines: list[str] = []
+    pending = b""
+    async for chunk in chunks:
+        pending += chunk
+        *complete, pending = pending.split(b"\n")
+        for line in complete:
+            if line.strip():
+                lines.append(line.decode("utf-8"))
+        if len(lines) > limit:
+            return None
+    if pending.strip():
+        lines.append(pending.decode("utf-8"))
+    return lines if len(lines) <= limit else None
+
+
+def parse_items(
+    lines: list[str],
+) -> tuple[list[tuple[int, BulkImportItem]], list[dict[str, Any]]]:
+    """Split NDJSON lines into valid items and per-line rejections.
+
+    Line indexes are zero-based and count only non-blank lines.
+    """
+    items: list[tuple[int, BulkImportItem]] = []
+    rejected: list[dict[str, Any]] = []
+    for index, line in enumerate(lines):
+        try:
+            item = BulkImportItem.model_validate_json(line)
+        except ValidationError as exc:
+            rejected.append({"index": index, "code": "INVALID_ITEM", "message": str(exc)})
+            continue
+        if len(item.raw_text.strip()) < MIN_TRANSCRIPT_CHARS:
+            rejected.append(
+                {
+                    "index": index,
+                    "code": "TRANSCRIPT_TOO_SHORT",
+                    "message": "Transcript seems too short.",
+                }
+            )
+            continue
+        items.append((index, item))
+    return items, rejected
+
+
+async def create_rows(
+    items: list[tuple[int, BulkImportItem]],
+) -> list[tuple[int, uuid.UUID, uuid.UUID]]:
+    """Insert sessions, transcripts and jobs in batches, in one transaction.
+
+    Either every item is created or none is, so a failing batch cannot
+    leave earlier batches' jobs queued with nobody streaming their results.
+    Returns ``(index, session_id, job_id)`` for every item.
+    """
+    created: list[tuple[int, uuid.UUID, uuid.UUID]] = []
+    batch_size = settings.bulk_import_batch_size
+
+    async with async_session() as db:
+        for start in range(0, len(items), batch_size):
+            batch = items[start : start + batch_size]
+            now = datetime.now(timezone.utc)
+            sessions, transcripts, jobs = [], [], []
+            for index, item in batch:
+                session_id, transcript_id, job_id = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+                sessions.append(
+                    {
+                        "id": session_id,
+                        "buyer_name": item.buyer_name,
+                        "status": SessionStatus.parsing.value,
+                        "created_at": now,
+                        "updated_at": now,
+                        "last_activity_at": now,
+                    }
+                )
+                transcripts.append(
+                    {
+                        "id": transcript_id,
+                        "session_id": session_id,
+                        "raw_text": item.raw_text,
+                        "uploaded_at": now,
+                    }
+                )
+                jobs.append(
+                    {
+                        "id": job_id,
+                        "kind": PARSE_TRANSCRIPT,
+                        "payload": {
+                            "session_id": str(session_id),
+                            "transcript_id": str(transcript_id),
+                        },
+                        "status": JobStatus.queued.value,
+                        "attempts": 0,
+                        "created_at": now,
+                    }
+                )
+                created.append((index, session_id, job_id))
+
+            # One multi-row INSERT per table per batch
+            await db.exec(insert(Session), params=sessions)
+            await db.exec(insert(Transcript), params=transcripts)
+            await db.exec(insert(Job), params=jobs)
+        await db.commit()
+
+    return created
+
+
+async def stream_results(
+    created: list[tuple[int, uuid.UUID, uuid.UUID]],
+    rejected: list[dict[str, Any]],
+) -> AsyncGenerator[str, None]:
+    """Run the parse jobs under the concurrency cap and stream NDJSON results."""
+    yield _line({"type": "accepted", "total": len(created), "rejected": len(rejected)})
+    for rejection in rejected:
+        yield _line({"type": "result", "status": "invalid", **rejection})
+
+    semaphore = asyncio.Semaphore(settings.bulk_import_concurrency)
+
+    async def run(
+        index: int, session_id: uuid.UUID, job_id: uuid.UUID
+    ) -> dict[str, Any]:
+        async with semaphore:
+            status, result = await job_queue.run(job_id)
+        return {
+            "type": "result",
+            "index": index,
+            "session_id": str(session_id),
+            "job_id": str(job_id),
+            "status": status,
+            **(result or {}),
+        }
+
+    # Spawned so parsing carries on if the client disconnects mid-stream
+    tasks = [spawn(run(*c)) for c in created]
+
+    counts: dict[str, int] = {}
+    for done, next_result in enumerate(asyncio.as_completed(tasks), 1):
+        try:
+            payload = await next_result
+        except Exception:
+            logger.exception("Bulk import item crashed")
+            payload = {"type": "result", "status": JobStatus.failed.value}
+        counts[payload["status"]] = counts.get(payload["status"], 0) + 1
+        yield _line({**payload, "completed": done, "total": len(tasks)})
+
+    yield _line({"type": "done", "counts": counts, "rejected": len(rejected)})
@@ -0,0 +1,119 @@
+"""
+Everything a session page renders, in one database round trip.
+
+The session row, its ordered preferences, the buyer profile and the most
+recent chat messages are assembled by a single SELECT: each section the
+client asked for is a correlated JSON subquery on the session row, so a
+missing session and all of its children come back together on one
+connection instead of four existence checks and four queries.
+"""
+
+import uuid
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import func, literal_column, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.chat.schemas import ChatMessageRead
+from app.models.buyer_profile import BuyerProfile
+from app.models.chat_message import ChatMessage
+from app.models.preference import Preference
+from app.models.session import Session
+from app.sessions.schemas import BuyerProfileRead, PreferenceRead, SessionRead
+
+BUNDLE_SECTIONS = ("session", "preferences", "profile", "messages")
+
+
+def _preferences_json(session_id: uuid.UUID):
+    rows = (
+        select(Preference)
+        .where(Preference.session_id == session_id)  # type: ignore[arg-type]
+        .subquery("p")
+    )
+    # High confidence first, then category alphabetically
+    ordered = aggregate_order_by(literal_column("p"), rows.c.confidence_rank, rows.c.category)
+    return (
+        select(func.coalesce(func.json_agg(ordered), literal_column("'[]'::json")))
+        .select_from(rows)
+        .scalar_subquery()
+    )
+
+
+def _profile_json(session_id: uuid.UUID):
+    row = (
+        select(BuyerProfile)
+        .where(BuyerProfile.session_id == session_id)  # type: ignore[arg-type]
+        .subquery("bp")
+    )
+    return select(func.row_to_json(literal_column("bp"))).select_from(row).scalar_subquery()
+
+
+def _messages_json(session_id: uuid.UUID, limit: int):
+    # One extra row tells the caller whether older messages exist
+    rows = (
+        select(ChatMessage)
+        .where(ChatMessage.session_id == session_id)  # type: ignore[arg-type]
+        .order_by(ChatMessage.turn_number.desc())  # type: ignore[attr-defined]
+        .limit(limit + 1)
+        .subquery("m")
+    )
+    ordered = aggregate_order_by(literal_column("m"), rows.c.turn_number)
+    return (
+        select(func.coalesce(func.json_agg(ordered), literal_column("'[]'::json")))
+        .select_from(rows)
+        .scalar_subquery()
+    )
+
+
+async def load_bundle(
+    db: AsyncSession,
+    session_id: uuid.UUID,
+    sections: set[str],
+    messages_limit: int,
+) -> dict[str, Any] | None:
+    """Return the requested sections for a session; None if it does not exist."""
+    columns: list[Any] = [Session.id]
+    if "session" in sections:
+        columns += [getattr(Session, name) for name in SessionRead.model_fields if name != "id"]
+    if "preferences" in sections:
+        columns.append(_preferences_json(session_id).label("preferences"))
+    if "profile" in sections:
+        columns.append(_profile_json(session_id).label("profile"))
+    if "messages" in sections:
+        columns.append(_messages_json(session_id, messages_limit).label("messages"))
+
+    result = await db.exec(select(*columns).where(Session.id == session_id))  # type: ignore[call-overload]
+    row = result.first()
+    if row is None:
+        return None
+    values = row._mapping
+
+    bundle: dict[str, Any] = {}
+    if "session" in sections:
+        bundle["session"] = SessionRead.model_validate(dict(values)).model_dump(mode="json")
+    if "preferences" in sections:
+        bundle["preferences"] = [
+            PreferenceRead.model_validate(p).model_dump(mode="json")
+            for p in values["preferences"]
+        ]
+    if "profile" in sections:
+        profile = values["profile"]
+        bundle["profile"] = (
+            BuyerProfileRead.model_validate(profile).model_dump(mode="json")
+            if profile is not None
+            else None
+        )
+    if "messages" in sections:
+        messages = values["messages"]
+        bundle["has_more_messages"] = len(messages) > messages_limit
+        bundle["messages"] = [
+            # Postgres JSON trims trailing zeros from timestamps; re-render them
+            # the way /api/chat/{id}/messages does
+            ChatMessageRead.model_validate(
+                {**m, "created_at": datetime.fromisoformat(m["created_at"])}
+            ).model_dump(mode="json")
+            for m in messages[-messages_limit:]
+        ]
+    return bundle
@@ -0,0 +1,86 @@
+"""
+Keyset-paginated session listing.
+
+Pages are ordered newest first on ``(created_at, id)`` and continue from an
+opaque cursor holding the last row's key, so every page is an index range
+scan of ``limit + 1`` rows whatever its depth (see migration 009 for the
+indexes behind each filter).
+"""
+
+import base64
+import uuid
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import func, tuple_
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.session import Session
+from app.sessions.schemas import SessionRead
+
+_LIST_COLUMNS = [getattr(Session, name) for name in SessionRead.model_fields]
+
+
+def encode_cursor(created_at: datetime, session_id: uuid.UUID) -> str:
+    raw = f"{created_at.isoformat()}|{session_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID] | None:
+    """Inverse of ``encode_cursor``; None if the cursor is malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, _, session_id = raw.partition("|")
+        return datetime.fromisoformat(created_at), uuid.UUID(session_id)
+    except ValueError:
+        return None
+
+
+def _escape_like(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+async def list_page(
+    db: AsyncSession,
+    limit: int,
+    after: tuple[datetime, uuid.UUID] | None = None,
+    status: str | None = None,
+    buyer_prefix: str | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+) -> dict[str, Any]:
+    """Return ``{"items": [...], "next_cursor": str | None}`` for one page."""
+    query = select(*_LIST_COLUMNS)
+    if after is not None:
+        query = query.where(tuple_(Session.created_at, Session.id) < tuple_(*after))
+    if status is not None:
+        query = query.where(Session.status == status)
+    if buyer_prefix:
+        query = query.where(
+            func.lower(Session.buyer_name).like(
+                _escape_like(buyer_prefix.lower()) + "%", escape="\\"
+            )
+        )
+    if created_from is not None:
+        query = query.where(Session.created_at >= created_from)
+    if created_to is not None:
+        query = query.where(Session.created_at < created_to)
+
+    result = await db.exec(
+        query.order_by(Session.created_at.desc(), Session.id.desc())  # type: ignore[attr-defined]
+        .limit(limit + 1)
+    )
+    rows = result.all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+
+    return {
+        "items": [
+            SessionRead.model_validate(row._mapping).model_dump(mode="json") for row in rows
+        ],
+        "next_cursor": next_cursor,
+    }
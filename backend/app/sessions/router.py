@@ -1,20 +1,36 @@
+import asyncio
+import json
 import uuid
+from collections.abc import AsyncIterator
 from datetime import datetime, timezone
-from typing import Any
+from typing import Any, Literal
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import case
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from starlette.datastructures import UploadFile
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.agents.profile_generator import generate_profile
-from app.agents.transcript_parser import parse_transcript
-from app.core.database import get_session
+from app.agents.keyword_extractor import extract_keyword_preferences
+from app.agents.parse_cache import cache_key, parse_cache
+from app.agents.profile_generator import generate_profile, refresh_profile_locally
+from app.chat.state import session_state
+from app.core.config import settings
+from app.core.database import async_session, get_session
+from app.core.events import notify_session_event, session_events
+from app.core.idempotency import fingerprint, run_idempotent
+from app.core.single_flight import SingleFlight
+from app.core.sse import sse_response
+from app.jobs.handlers import PARSE_TRANSCRIPT
+from app.jobs.queue import job_queue
 from app.models.buyer_profile import BuyerProfile
-from app.models.chat_message import ChatMessage
+from app.models.job import Job
 from app.models.preference import Preference
 from app.models.session import Session, SessionStatus
 from app.models.transcript import Transcript
+from app.sessions import bulk_import as bulk_import_service
+from app.sessions.bundle import BUNDLE_SECTIONS, load_bundle
+from app.sessions.listing import decode_cursor, list_page
 from app.sessions.schemas import (
     BuyerProfileRead,
     PreferenceRead,
@@ -22,9 +38,16 @@ from app.sessions.schemas import (
     SessionRead,
     TranscriptUpload,
 )
+from app.sessions.service import (
+    apply_parse_result,
+    notify_preferences_changed,
+    profile_generation_lease,
+)
 
 router = APIRouter(prefix="/api/sessions", tags=["sessions"])
 
+_profile_generations = SingleFlight("generate_profile")
+
 
 def api_response(data: Any = None, error: dict | None = None) -> dict:
     return {"data": data, "error": error}
@@ -42,18 +65,87 @@ async def create_session(
     return api_response(data=SessionRead.model_validate(session).model_dump(mode="json"))
 
 
+async def _read_upload(upload: UploadFile) -> AsyncIterator[bytes]:
+    while chunk := await upload.read(64 * 1024):
+        yield chunk
+
+
+@router.post("/bulk-import")
+async def bulk_import(request: Request) -> StreamingResponse:
+    """
+    Import many transcripts at once.
+
+    Accepts NDJSON — one ``{"buyer_name": ..., "raw_text": ...}`` object per
+    line — either as the request body or as a multipart ``file`` upload.
+    Rows are created in batched inserts and transcripts are parsed with at
+    most ``bulk_import_concurrency`` concurrent OpenAI calls. Per-item
+    progress and results are streamed back as NDJSON.
+    """
+    chunks: AsyncIterator[bytes]
+    if request.headers.get("content-type", "").startswith("multipart/form-data"):
+        form = await request.form()
+        upload = form.get("file")
+        if not isinstance(upload, UploadFile):
+            raise HTTPException(status_code=400, detail="Missing 'file' upload")
+        chunks = _read_upload(upload)
+    else:
+        chunks = request.stream()
+
+    # Counted while reading, so an oversized import is refused before the
+    # rest of it is read or any of it is parsed
+    try:
+        lines = await bulk_import_service.read_lines(chunks, settings.bulk_import_max_items)
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="Body must be UTF-8 NDJSON")
+    if lines is None:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.bulk_import_max_items} items per import",
+        )
+
+    items, rejected = bulk_import_service.parse_items(lines)
+
+    created = await bulk_import_service.create_rows(items)
+
+    return StreamingResponse(
+        bulk_import_service.stream_results(created, rejected),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("")
 async def list_sessions(
+    limit: int = Query(default=settings.session_page_size, ge=1, le=settings.session_page_size_max),
+    cursor: str | None = None,
+    status: SessionStatus | None = None,
+    buyer: str | None = Query(default=None, max_length=255),
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
     db: AsyncSession = Depends(get_session),
 ) -> dict:
-    result = await db.exec(
-        select(Session).order_by(Session.created_at.desc())  # type: ignore[arg-type]
+    """
+    One page of sessions, newest first. Pass the returned ``next_cursor``
+    back as ``cursor`` for the following page; it is null on the last one.
+    Filters: ``status``, ``buyer`` (case-insensitive name prefix) and a
+    ``created_from`` (inclusive) / ``created_to`` (exclusive) range.
+    """
+    after = None
+    if cursor is not None:
+        after = decode_cursor(cursor)
+        if after is None:
+            raise HTTPException(status_code=400, detail="Malformed cursor")
+
+    page = await list_page(
+        db,
+        limit,
+        after=after,
+        status=status.value if status else None,
+        buyer_prefix=buyer,
+        created_from=created_from,
+        created_to=created_to,
     )
-    sessions = result.all()
-    data = [
-        SessionRead.model_validate(s).model_dump(mode="json") for s in sessions
-    ]
-    return api_response(data=data)
+    return api_response(data=page)
 
 
 @router.get("/{session_id}")
@@ -67,57 +159,180 @@ async def get_session_detail(
     return api_response(data=SessionRead.model_validate(session).model_dump(mode="json"))
 
 
+@router.get("/{session_id}/bundle")
+async def get_session_bundle(
+    session_id: uuid.UUID,
+    fields: str = ",".join(BUNDLE_SECTIONS),
+    messages_limit: int = Query(default=50, ge=1, le=500),
+    db: AsyncSession = Depends(get_session),
+) -> dict:
+    """
+    The session, its ordered preferences, buyer profile (null if none yet)
+    and the latest ``messages_limit`` chat messages in one request and one
+    query. ``fields`` is a comma-separated subset of
+    session,preferences,profile,messages; only those sections are loaded.
+    """
+    sections = {f.strip() for f in fields.split(",") if f.strip()}
+    unknown = sections - set(BUNDLE_SECTIONS)
+    if unknown or not sections:
+        raise HTTPException(
+            status_code=400,
+            detail=f"fields must be a subset of {','.join(BUNDLE_SECTIONS)}",
+        )
+
+    bundle = await load_bundle(db, session_id, sections, messages_limit)
+    if bundle is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return api_response(data=bundle)
+
+
+@router.get("/{session_id}/events")
+async def session_event_stream(session_id: uuid.UUID) -> StreamingResponse:
+    """
+    Server-sent events for a session page: a ``snapshot`` of the status,
+    preference count and whether a profile exists, then ``status``,
+    ``preferences`` and ``profile_ready`` events as they happen, and
+    ``resync`` when events may have been missed. Replaces polling; an idle
+    stream costs no database queries.
+    """
+    # Subscribe before reading the snapshot so no change falls in between
+    queue = session_events.subscribe(session_id)
+    try:
+        async with async_session() as db:
+            result = await db.exec(
+                select(
+                    Session.status,
+                    Session.preference_count,
+                    select(BuyerProfile.id)
+                    .where(BuyerProfile.session_id == session_id)  # type: ignore[arg-type]
+                    .exists(),
+                ).where(Session.id == session_id)  # type: ignore[arg-type]
+            )
+            row = result.first()
+    except BaseException:
+        session_events.unsubscribe(session_id, queue)
+        raise
+    if row is None:
+        session_events.unsubscribe(session_id, queue)
+        raise HTTPException(status_code=404, detail="Session not found")
+    status, preferences_count, has_profile = row
+
+    async def frames() -> AsyncIterator[str]:
+        try:
+            snapshot = {
+                "type": "snapshot",
+                "status": status,
+                "preferences": preferences_count,
+                "has_profile": has_profile,
+            }
+            yield f"data: {json.dumps(snapshot)}\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(
+                        queue.get(), timeout=settings.session_events_keepalive_seconds
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"data: {json.dumps(event)}\n\n"
+        finally:
+            session_events.unsubscribe(session_id, queue)
+
+    return sse_response(frames())
+
+
 @router.post("/{session_id}/transcript")
 async def upload_transcript(
     session_id: uuid.UUID,
     body: TranscriptUpload,
-    db: AsyncSession = Depends(get_session),
+    request: Request,
+    response: Response,
+    idempotency_key: str | None = Header(default=None, alias="Idempotency-Key"),
 ) -> dict:
-    session = await db.get(Session, session_id)
-    if not session:
-        raise HTTPException(status_code=404, detail="Session not found")
+    """
+    Store a transcript and parse it (202 + job id, with keyword-extracted
+    draft preferences to show until the parse lands), or answer from the
+    parse cache (200). A retry carrying the same ``Idempotency-Key`` gets the
+    original response back instead of creating a second transcript and job.
+    """
+    return await run_idempotent(
+        request.url.path,
+        idempotency_key,
+        fingerprint(body.model_dump_json()),
+        response,
+        lambda: _upload_transcript(session_id, body),
+    )
 
-    if len(body.raw_text.strip()) < 100:
-        return api_response(
-            error={
-                "code": "TRANSCRIPT_TOO_SHORT",
-                "message": "Transcript seems too short. Paste the full conversation for best results.",
-            }
-        )
 
-    transcript = Transcript(session_id=session_id, raw_text=body.raw_text)
-    db.add(transcript)
+async def _upload_transcript(
+    session_id: uuid.UUID,
+    body: TranscriptUpload,
+) -> tuple[int, dict]:
+    too_short = len(body.raw_text.strip()) < 100
+
+    # Look the transcript up in the parse cache before checking out a
+    # connection for the write, so the two never overlap.
+    cached = None if too_short else await parse_cache.get(cache_key(body.raw_text))
+
+    async with async_session() as db:
+        session = await db.get(Session, session_id)
+        if not session:
+            raise HTTPException(status_code=404, detail="Session not found")
+
+        if too_short:
+            return 200, api_response(
+                error={
+                    "code": "TRANSCRIPT_TOO_SHORT",
+                    "message": "Transcript seems too short. Paste the full conversation for best results.",
+                }
+            )
 
-    # Parse transcript with OpenAI agent to extract preferences
-    result = await parse_transcript(body.raw_text)
+        transcript = Transcript(session_id=session_id, raw_text=body.raw_text)
+        db.add(transcript)
+        session.last_activity_at = datetime.now(timezone.utc)
+
+        # Repeat uploads of the same transcript are answered from the cache
+        if cached is not None:
+            transcript.applied_at = datetime.now(timezone.utc)
+            preferences_count = await apply_parse_result(db, session, cached)
+            await notify_session_event(db, session_id, {"type": "status", "status": session.status})
+            await notify_preferences_changed(db, session_id)
+            await db.commit()
+            return 200, api_response(
+                data={
+                    "transcript_id": str(transcript.id),
+                    "session_id": str(session_id),
+                    "status": "parsed",
+                    "preferences_count": preferences_count,
+                    "cached": True,
+                }
+            )
 
-    # Save each extracted preference to the database
-    for pref in result["preferences"]:
-        preference = Preference(
-            session_id=session_id,
-            category=pref["category"],
-            value=pref["value"],
-            confidence=pref["confidence"],
-            source="transcript",
+        # Parsing runs in the background worker pool; the job row is committed
+        # together with the transcript so a restart cannot lose it.
+        job = Job(
+            kind=PARSE_TRANSCRIPT,
+            payload={"session_id": str(session_id), "transcript_id": str(transcript.id)},
         )
-        db.add(preference)
+        db.add(job)
 
-    # Update session with summary and status
-    if result["summary"]:
-        session.summary = result["summary"]
-    session.status = SessionStatus.parsed
-    session.updated_at = datetime.now(timezone.utc)
-    db.add(session)
+        session.status = SessionStatus.parsing
+        session.updated_at = datetime.now(timezone.utc)
+        db.add(session)
+        await notify_session_event(db, session_id, {"type": "status", "status": session.status})
 
-    await db.commit()
-    await db.refresh(transcript)
+        await db.commit()
+    session_state.invalidate(session_id)
 
-    return api_response(
+    job_queue.submit(job.id)
+
+    return 202, api_response(
         data={
             "transcript_id": str(transcript.id),
             "session_id": str(session_id),
-            "status": "parsed",
-            "preferences_count": len(result["preferences"]),
+            "job_id": str(job.id),
+            "status": "parsing",
+            "draft_preferences": extract_keyword_preferences(body.raw_text),
         }
     )
 
@@ -131,17 +346,10 @@ async def get_preferences(
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
 
-    # Order by confidence (high first) then category alphabetically
-    confidence_order = case(
-        {"high": 0, "medium": 1, "low": 2},
-        value=Preference.confidence,  # type: ignore[arg-type]
-        else_=3,
-    )
-
     result = await db.exec(
         select(Preference)
         .where(Preference.session_id == session_id)  # type: ignore[arg-type]
-        .order_by(confidence_order, Preference.category)  # type: ignore[arg-type]
+        .order_by(Preference.confidence_rank, Preference.category)  # type: ignore[arg-type]
     )
     preferences = result.all()
 
@@ -154,26 +362,70 @@ async def get_preferences(
 @router.post("/{session_id}/generate-profile")
 async def generate_buyer_profile(
     session_id: uuid.UUID,
-    db: AsyncSession = Depends(get_session),
+    request: Request,
+    response: Response,
+    mode: Literal["full", "fast"] = "full",
+    idempotency_key: str | None = Header(default=None, alias="Idempotency-Key"),
 ) -> dict:
-    session = await db.get(Session, session_id)
-    if not session:
-        raise HTTPException(status_code=404, detail="Session not found")
-
-    # Load all preferences for this session
-    pref_result = await db.exec(
-        select(Preference)
-        .where(Preference.session_id == session_id)  # type: ignore[arg-type]
+    """
+    Generate (or incrementally refresh) the session's buyer profile.
+
+    ``mode=fast`` skips OpenAI and scores the preferences with the local
+    rules engine, giving an instant draft profile. Model scores already in
+    the stored profile are kept for unchanged preferences, so a later full
+    run still only sends the new ones to OpenAI.
+
+    Concurrent requests for one session share a single generation: in this
+    process through single-flight, across workers through a lease on the
+    session row, which holds no connection while the model runs. A worker
+    that waited on the lease finds the profile already up to date, so its
+    own run reuses every score without calling OpenAI. A retry carrying the
+    same ``Idempotency-Key`` replays the stored response.
+    """
+    return await run_idempotent(
+        request.url.path,
+        idempotency_key,
+        fingerprint(mode),
+        response,
+        lambda: _profile_generations.run(
+            (session_id, mode), lambda: _generate_exclusive(session_id, mode)
+        ),
     )
-    preferences = pref_result.all()
 
-    if not preferences:
-        return api_response(
-            error={
-                "code": "NO_PREFERENCES",
-                "message": "No preferences found for this session. Upload a transcript or chat first.",
-            }
+
+async def _generate_exclusive(session_id: uuid.UUID, mode: str) -> tuple[int, dict]:
+    async with profile_generation_lease(session_id):
+        return 200, await _generate_profile(session_id, mode)
+
+
+async def _generate_profile(session_id: uuid.UUID, mode: str) -> dict:
+    # Read unit of work — the connection goes back to the pool before the
+    # (slow) OpenAI call and is checked out again only for the write.
+    async with async_session() as db:
+        session = await db.get(Session, session_id)
+        if not session:
+            raise HTTPException(status_code=404, detail="Session not found")
+
+        # Load all preferences for this session
+        pref_result = await db.exec(
+            select(Preference)
+            .where(Preference.session_id == session_id)  # type: ignore[arg-type]
+        )
+        preferences = pref_result.all()
+
+        if not preferences:
+            return api_response(
+                error={
+                    "code": "NO_PREFERENCES",
+                    "message": "No preferences found for this session. Upload a transcript or chat first.",
+                }
+            )
+
+        previous_result = await db.exec(
+            select(BuyerProfile)
+            .where(BuyerProfile.session_id == session_id)  # type: ignore[arg-type]
         )
+        previous = previous_result.first()
 
     pref_dicts = [
         {
@@ -186,22 +438,17 @@ async def generate_buyer_profile(
         for p in preferences
     ]
 
-    # Load chat messages for additional context
-    chat_result = await db.exec(
-        select(ChatMessage)
-        .where(ChatMessage.session_id == session_id)  # type: ignore[arg-type]
-        .order_by(ChatMessage.turn_number)  # type: ignore[arg-type]
-    )
-    chat_messages = chat_result.all()
-
-    chat_dicts: list[dict] | None = None
-    if chat_messages:
-        chat_dicts = [
-            {"role": m.role, "content": m.content} for m in chat_messages
-        ]
-
-    # Generate the profile using the AI agent
-    profile_data = await generate_profile(pref_dicts, chat_dicts)
+    # Generate the profile using the AI agent. Chat preferences are already
+    # in the table (extracted per turn), so no chat log is sent; scores for
+    # preferences unchanged since the last profile are reused.
+    if mode == "fast":
+        profile_data = refresh_profile_locally(
+            pref_dicts, previous.scored_preferences if previous else None
+        )
+    else:
+        profile_data = await generate_profile(
+            pref_dicts, previous.scored_preferences if previous else None
+        )
 
     # Calculate overall_confidence as average score / 10
     scored = profile_data.get("scored_preferences", [])
@@ -211,46 +458,46 @@ async def generate_buyer_profile(
     else:
         overall_confidence = 0.0
 
-    # Save new preferences from profile back to the preferences table
-    existing_categories = {(p.category, p.value) for p in preferences}
-    for sp in scored:
-        if (sp["category"], sp["value"]) not in existing_categories:
-            new_pref = Preference(
+    # Write unit of work
+    async with async_session() as db:
+        session = await db.get(Session, session_id)
+        if not session:
+            raise HTTPException(status_code=404, detail="Session not found")
+
+        # Upsert BuyerProfile — replace if one already exists for this session
+        existing_result = await db.exec(
+            select(BuyerProfile)
+            .where(BuyerProfile.session_id == session_id)  # type: ignore[arg-type]
+        )
+        existing_profile = existing_result.first()
+
+        if existing_profile:
+            existing_profile.scored_preferences = profile_data
+            existing_profile.generated_at = datetime.now(timezone.utc)
+            db.add(existing_profile)
+            buyer_profile = existing_profile
+        else:
+            buyer_profile = BuyerProfile(
                 session_id=session_id,
-                category=sp["category"],
-                value=sp["value"],
-                confidence=sp.get("confidence", "medium"),
-                source="chat",
+                scored_preferences=profile_data,
             )
-            db.add(new_pref)
-
-    # Upsert BuyerProfile — replace if one already exists for this session
-    existing_result = await db.exec(
-        select(BuyerProfile)
-        .where(BuyerProfile.session_id == session_id)  # type: ignore[arg-type]
-    )
-    existing_profile = existing_result.first()
-
-    if existing_profile:
-        existing_profile.scored_preferences = profile_data
-        existing_profile.generated_at = datetime.now(timezone.utc)
-        db.add(existing_profile)
-        buyer_profile = existing_profile
-    else:
-        buyer_profile = BuyerProfile(
-            session_id=session_id,
-            scored_preferences=profile_data,
+            db.add(buyer_profile)
+
+        # Update session status to complete and set overall_confidence
+        session.status = SessionStatus.complete
+        session.overall_confidence = overall_confidence
+        session.updated_at = datetime.now(timezone.utc)
+        db.add(session)
+
+        await notify_session_event(db, session_id, {"type": "status", "status": session.status})
+        await notify_session_event(
+            db,
+            session_id,
+            {"type": "profile_ready", "generated_at": buyer_profile.generated_at.isoformat()},
         )
-        db.add(buyer_profile)
-
-    # Update session status to complete and set overall_confidence
-    session.status = SessionStatus.complete
-    session.overall_confidence = overall_confidence
-    session.updated_at = datetime.now(timezone.utc)
-    db.add(session)
-
-    await db.commit()
-    await db.refresh(buyer_profile)
+        await db.commit()
+        await db.refresh(buyer_profile)
+    session_state.invalidate(session_id)
 
     return api_response(
         data=BuyerProfileRead.model_validate(buyer_profile).model_dump(mode="json")
@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
 
-from sqlmodel import SQLModel
+from sqlmodel import Field, SQLModel
 
 
 class SessionCreate(SQLModel):
@@ -14,14 +14,23 @@ class SessionRead(SQLModel):
     summary: str | None
     status: str
     overall_confidence: float | None
+    message_count: int
+    preference_count: int
     created_at: datetime
     updated_at: datetime
+    last_activity_at: datetime
 
 
 class TranscriptUpload(SQLModel):
     raw_text: str
 
 
+class BulkImportItem(SQLModel):
+    # Column width; longer names are rejected per item, not by the insert
+    buyer_name: str | None = Field(default=None, max_length=255)
+    raw_text: str
+
+
 class TranscriptRead(SQLModel):
     id: uuid.UUID
     session_id: uuid.UUID
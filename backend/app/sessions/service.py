@@ -0,0 +1,237 @@
+"""
+Write paths shared by the session endpoints and background jobs.
+"""
+
+import asyncio
+import uuid
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import case, func, literal_column, or_, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.chat.state import session_state
+from app.core.config import settings
+from app.core.database import async_session
+from app.core.events import notify_session_event
+from app.core.metrics import metrics
+from app.models.preference import Preference, PreferenceSource
+from app.models.session import Session, SessionStatus
+
+_CONFIDENCE_RANK = {"low": 0, "medium": 1, "high": 2}
+
+
+def _build_preference_upsert():
+    # Built once: a parameter list against a fixed statement is sent as a
+    # single multi-row INSERT without recompiling it for every batch
+    table = Preference.__table__
+    stmt = insert(table)
+    excluded_rank = case(
+        {"high": 0, "medium": 1, "low": 2}, value=stmt.excluded.confidence, else_=3
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.session_id, table.c.category, func.md5(table.c.value)],
+        set_={
+            # Confidence only ever goes up; a second source makes it "both"
+            "confidence": case(
+                (excluded_rank < table.c.confidence_rank, stmt.excluded.confidence),
+                else_=table.c.confidence,
+            ),
+            "source": case(
+                (table.c.source == stmt.excluded.source, table.c.source),
+                else_=PreferenceSource.both.value,
+            ),
+        },
+    ).returning(
+        # xmax is 0 only for freshly inserted rows
+        literal_column("xmax = 0")
+    )
+
+
+_PREFERENCE_UPSERT = _build_preference_upsert()
+
+
+def _preference_key(category: str, value: str) -> tuple[str, str]:
+    return category.strip().lower(), " ".join(value.lower().split())
+
+
+async def add_preferences(
+    db: AsyncSession,
+    session_id: uuid.UUID,
+    preferences: list[dict[str, Any]],
+    source: str,
+) -> int:
+    """Write preferences for the session in one upsert; returns how many rows are new.
+
+    A preference already stored with the same category and value is merged
+    instead of duplicated: confidence only ever goes up and a different
+    source makes it ``both``. The session's ``preference_count`` is bumped
+    by the new rows in the same transaction.
+    """
+    if not preferences:
+        return 0
+    # The chat hot state renders preferences into its prompt context
+    session_state.invalidate_on_commit(db, session_id)
+
+    now = datetime.now(timezone.utc)
+    rows: dict[tuple[str, str], dict[str, Any]] = {}
+    for pref in preferences:
+        confidence = pref.get("confidence", "medium")
+        row = rows.get((pref["category"], pref["value"]))
+        if row is None:
+            rows[(pref["category"], pref["value"])] = {
+                "id": uuid.uuid4(),
+                "session_id": session_id,
+                "category": pref["category"],
+                "value": pref["value"],
+                "confidence": confidence,
+                "source": source,
+                "is_confirmed": False,
+                "created_at": now,
+            }
+        elif _CONFIDENCE_RANK.get(confidence, 0) > _CONFIDENCE_RANK.get(row["confidence"], 0):
+            # One statement cannot update a row twice; merge repeats here
+            row["confidence"] = confidence
+
+    result = await db.exec(_PREFERENCE_UPSERT, params=list(rows.values()))  # type: ignore[call-overload]
+    added = sum(1 for (inserted,) in result.all() if inserted)
+
+    await db.exec(
+        update(Session)
+        .where(Session.id == session_id)  # type: ignore[arg-type]
+        .values(
+            preference_count=Session.preference_count + added,
+            last_activity_at=now,
+        )
+    )
+    return added
+
+
+async def merge_chat_preferences(
+    db: AsyncSession,
+    session_id: uuid.UUID,
+    known: list[Preference],
+    extracted: list[dict[str, Any]],
+) -> int:
+    """Upsert preferences found in one chat turn; returns rows added or changed.
+
+    A statement matching a known preference (by the extractor's reference or
+    by category and value) upgrades it: transcript preferences become
+    ``both`` and confidence only ever goes up. Anything else is added with
+    source ``chat``. Both go through the one ``add_preferences`` upsert.
+    """
+    by_key = {_preference_key(p.category, p.value): p for p in known}
+    rows: list[dict[str, Any]] = []
+    new_keys: set[tuple[str, str]] = set()
+    changed: set[uuid.UUID] = set()
+    for pref in extracted:
+        key = _preference_key(pref["category"], pref["value"])
+        index = pref.get("existing")
+        match = known[index] if index is not None else by_key.get(key)
+        confidence = pref.get("confidence", "medium")
+        if match is None:
+            if key not in new_keys:
+                new_keys.add(key)
+                rows.append(pref)
+            continue
+
+        # Written as the stored category and value so the upsert's conflict
+        # target finds the row; the upsert applies the merge rules itself
+        rows.append({"category": match.category, "value": match.value, "confidence": confidence})
+        if match.source == PreferenceSource.transcript.value or _CONFIDENCE_RANK.get(
+            confidence, 0
+        ) > _CONFIDENCE_RANK.get(match.confidence, 0):
+            changed.add(match.id)
+
+    added = await add_preferences(db, session_id, rows, source=PreferenceSource.chat.value)
+    return len(changed) + added
+
+
+async def apply_parse_result(
+    db: AsyncSession,
+    session: Session,
+    result: dict[str, Any],
+) -> int:
+    """Store a transcript parse result on the session and mark it parsed."""
+    count = await add_preferences(db, session.id, result["preferences"], source="transcript")
+
+    if result["summary"]:
+        session.summary = result["summary"]
+    session.status = SessionStatus.parsed
+    session.updated_at = datetime.now(timezone.utc)
+    db.add(session)
+    # The chat hot state caches the status
+    session_state.invalidate_on_commit(db, session.id)
+    return count
+
+
+async def notify_preferences_changed(db: AsyncSession, session_id: uuid.UUID) -> None:
+    """Publish the session's new preference count when ``db`` commits."""
+    result = await db.exec(
+        select(Session.preference_count).where(Session.id == session_id)  # type: ignore[arg-type]
+    )
+    await notify_session_event(
+        db, session_id, {"type": "preferences", "count": result.one()}
+    )
+
+
+@asynccontextmanager
+async def profile_generation_lease(session_id: uuid.UUID) -> AsyncIterator[None]:
+    """Hold the session's profile generation lease for the block.
+
+    The lease is an expiry time on the session row, taken and released by
+    compare-and-swap in short transactions, so no connection is held while
+    the block runs. A caller that finds it taken polls until it is released
+    or expires (a crashed holder never releases it). A missing session runs
+    the block unleased; the block reports the 404.
+    """
+    lease_ends = func.now() + timedelta(seconds=settings.profile_lease_seconds)
+    waited = False
+    while True:
+        async with async_session() as db:
+            result = await db.exec(
+                update(Session)
+                .where(
+                    Session.id == session_id,  # type: ignore[arg-type]
+                    or_(
+                        Session.profile_generating_until.is_(None),  # type: ignore[union-attr]
+                        Session.profile_generating_until < func.now(),  # type: ignore[operator]
+                    ),
+                )
+                .values(profile_generating_until=lease_ends)
+                .returning(Session.profile_generating_until)
+            )
+            token = result.scalar_one_or_none()
+            if token is None:
+                exists = await db.exec(
+                    select(Session.id).where(Session.id == session_id)  # type: ignore[arg-type]
+                )
+                if exists.first() is None:
+                    break
+            await db.commit()
+        if token is not None:
+            break
+        if not waited:
+            waited = True
+            metrics.inc("profile.lease.waits")
+        await asyncio.sleep(settings.profile_lease_poll_seconds)
+
+    try:
+        yield
+    finally:
+        if token is not None:
+            async with async_session() as db:
+                # Only if still ours: an expired lease may have been taken over
+                await db.exec(
+                    update(Session)
+                    .where(
+                        Session.id == session_id,  # type: ignore[arg-type]
+                        Session.profile_generating_until == token,  # type: ignore[arg-type]
+                    )
+                    .values(profile_generating_until=None)
+                )
+                await db.commit()
@@ -10,6 +10,9 @@ from app.core.config import settings
 from app.models import (  # noqa: F401
     BuyerProfile,
     ChatMessage,
+    IdempotencyKey,
+    Job,
+    ParseCacheEntry,
     Preference,
     Session,
     Transcript,
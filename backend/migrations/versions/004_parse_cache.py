@@ -0,0 +1,42 @@
+"""Add parse_cache table for content-addressed transcript parse results
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-17
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects.postgresql import JSONB
+
+revision: str = "004"
+down_revision: Union[str, None] = "003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "parse_cache",
+        sa.Column("key", sa.String(64), primary_key=True),
+        sa.Column("result", JSONB, nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.func.now(),
+        ),
+        sa.Column(
+            "last_hit_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.func.now(),
+        ),
+    )
+    op.create_index("ix_parse_cache_last_hit_at", "parse_cache", ["last_hit_at"])
+
+
+def downgrade() -> None:
+    op.drop_table("parse_cache")
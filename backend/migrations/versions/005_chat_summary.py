@@ -0,0 +1,34 @@
+"""Add rolling chat summary columns to sessions
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-17
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "005"
+down_revision: Union[str, None] = "004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("sessions", sa.Column("chat_summary", sa.Text, nullable=True))
+    op.add_column(
+        "sessions",
+        sa.Column(
+            "chat_summary_turn",
+            sa.Integer,
+            nullable=False,
+            server_default="0",
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("sessions", "chat_summary_turn")
+    op.drop_column("sessions", "chat_summary")
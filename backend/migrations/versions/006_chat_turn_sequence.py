@@ -0,0 +1,82 @@
+"""Per-session chat turn counter and unique (session_id, turn_number)
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-17
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "006"
+down_revision: Union[str, None] = "005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "sessions",
+        sa.Column(
+            "last_turn_number",
+            sa.Integer,
+            nullable=False,
+            server_default="0",
+        ),
+    )
+
+    # Concurrent senders could previously be handed the same turn number.
+    # Renumber only the sessions affected, keeping the existing order.
+    op.execute(
+        """
+        UPDATE chat_messages AS m
+        SET turn_number = r.rn
+        FROM (
+            SELECT id,
+                   row_number() OVER (
+                       PARTITION BY session_id
+                       ORDER BY turn_number, created_at, id
+                   ) AS rn
+            FROM chat_messages
+            WHERE session_id IN (
+                SELECT session_id
+                FROM chat_messages
+                GROUP BY session_id, turn_number
+                HAVING count(*) > 1
+            )
+        ) AS r
+        WHERE m.id = r.id AND m.turn_number <> r.rn
+        """
+    )
+
+    op.execute(
+        """
+        UPDATE sessions AS s
+        SET last_turn_number = t.max_turn
+        FROM (
+            SELECT session_id, max(turn_number) AS max_turn
+            FROM chat_messages
+            GROUP BY session_id
+        ) AS t
+        WHERE s.id = t.session_id
+        """
+    )
+
+    op.create_index(
+        "uq_chat_messages_session_turn",
+        "chat_messages",
+        ["session_id", "turn_number"],
+        unique=True,
+    )
+    # Covered by the leading column of the unique index
+    op.drop_index("ix_chat_messages_session_id", table_name="chat_messages")
+
+
+def downgrade() -> None:
+    op.create_index(
+        "ix_chat_messages_session_id", "chat_messages", ["session_id"]
+    )
+    op.drop_index("uq_chat_messages_session_turn", table_name="chat_messages")
+    op.drop_column("sessions", "last_turn_number")
@@ -0,0 +1,43 @@
+"""Add keyset pagination indexes for the session list
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-17
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "009"
+down_revision: Union[str, None] = "008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Unfiltered and date-range pages. Covers the list columns except the
+    # unbounded summary, which is read from the heap for the page rows only
+    op.create_index(
+        "ix_sessions_created_at_id",
+        "sessions",
+        ["created_at", "id"],
+        postgresql_include=["status", "buyer_name", "overall_confidence", "updated_at"],
+    )
+    op.create_index(
+        "ix_sessions_status_created_at_id",
+        "sessions",
+        ["status", "created_at", "id"],
+    )
+    op.create_index(
+        "ix_sessions_buyer_name_prefix",
+        "sessions",
+        [sa.text("lower(buyer_name) text_pattern_ops"), "created_at", "id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_sessions_buyer_name_prefix", table_name="sessions")
+    op.drop_index("ix_sessions_status_created_at_id", table_name="sessions")
+    op.drop_index("ix_sessions_created_at_id", table_name="sessions")
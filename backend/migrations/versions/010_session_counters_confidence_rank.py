@@ -0,0 +1,119 @@
+"""Add session counters and a preference confidence rank
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-17
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "010"
+down_revision: Union[str, None] = "009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CONFIDENCE_RANK_SQL = (
+    "CASE confidence WHEN 'high' THEN 0 WHEN 'medium' THEN 1 WHEN 'low' THEN 2 ELSE 3 END"
+)
+
+
+def upgrade() -> None:
+    # Generated, so every write path keeps it in step with confidence
+    op.add_column(
+        "preferences",
+        sa.Column(
+            "confidence_rank",
+            sa.SmallInteger,
+            sa.Computed(CONFIDENCE_RANK_SQL, persisted=True),
+        ),
+    )
+    op.create_index(
+        "ix_preferences_session_rank_category",
+        "preferences",
+        ["session_id", "confidence_rank", "category"],
+    )
+    # Covered by the leading column of the new index
+    op.drop_index("ix_preferences_session_id", table_name="preferences")
+
+    op.add_column(
+        "sessions",
+        sa.Column("message_count", sa.Integer, nullable=False, server_default="0"),
+    )
+    op.add_column(
+        "sessions",
+        sa.Column("preference_count", sa.Integer, nullable=False, server_default="0"),
+    )
+    op.add_column(
+        "sessions",
+        sa.Column(
+            "last_activity_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.func.now(),
+        ),
+    )
+
+    op.execute(
+        """
+        UPDATE sessions AS s
+        SET message_count = coalesce(m.n, 0),
+            preference_count = coalesce(p.n, 0),
+            last_activity_at = greatest(
+                s.updated_at, m.latest, p.latest, t.latest
+            )
+        FROM sessions AS s2
+        LEFT JOIN (
+            SELECT session_id, count(*) AS n, max(created_at) AS latest
+            FROM chat_messages
+            GROUP BY session_id
+        ) AS m ON m.session_id = s2.id
+        LEFT JOIN (
+            SELECT session_id, count(*) AS n, max(created_at) AS latest
+            FROM preferences
+            GROUP BY session_id
+        ) AS p ON p.session_id = s2.id
+        LEFT JOIN (
+            SELECT session_id, max(uploaded_at) AS latest
+            FROM transcripts
+            GROUP BY session_id
+        ) AS t ON t.session_id = s2.id
+        WHERE s.id = s2.id
+        """
+    )
+
+    # Rebuild the list index so the counters are covered too
+    op.drop_index("ix_sessions_created_at_id", table_name="sessions")
+    op.create_index(
+        "ix_sessions_created_at_id",
+        "sessions",
+        ["created_at", "id"],
+        postgresql_include=[
+            "status",
+            "buyer_name",
+            "overall_confidence",
+            "updated_at",
+            "message_count",
+            "preference_count",
+            "last_activity_at",
+        ],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_sessions_created_at_id", table_name="sessions")
+    op.create_index(
+        "ix_sessions_created_at_id",
+        "sessions",
+        ["created_at", "id"],
+        postgresql_include=["status", "buyer_name", "overall_confidence", "updated_at"],
+    )
+    op.drop_column("sessions", "last_activity_at")
+    op.drop_column("sessions", "preference_count")
+    op.drop_column("sessions", "message_count")
+
+    op.create_index("ix_preferences_session_id", "preferences", ["session_id"])
+    op.drop_index("ix_preferences_session_rank_category", table_name="preferences")
+    op.drop_column("preferences", "confidence_rank")
@@ -0,0 +1,76 @@
+"""Make preferences unique per session, category and value
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-17
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "011"
+down_revision: Union[str, None] = "010"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Repeat uploads of a transcript used to add its preferences again.
+    # Fold each set of duplicates into its oldest row, merged the way the
+    # upsert now merges: highest confidence, ``both`` for mixed sources.
+    op.execute(
+        """
+        UPDATE preferences AS p
+        SET confidence = d.confidence,
+            source = d.source,
+            is_confirmed = d.is_confirmed
+        FROM (
+            SELECT (array_agg(id ORDER BY created_at, id))[1] AS keep_id,
+                   (array_agg(confidence ORDER BY confidence_rank))[1] AS confidence,
+                   CASE WHEN count(DISTINCT source) > 1 THEN 'both'
+                        ELSE min(source) END AS source,
+                   bool_or(is_confirmed) AS is_confirmed
+            FROM preferences
+            GROUP BY session_id, category, md5(value)
+            HAVING count(*) > 1
+        ) AS d
+        WHERE p.id = d.keep_id
+        """
+    )
+    op.execute(
+        """
+        DELETE FROM preferences AS p
+        USING preferences AS q
+        WHERE q.session_id = p.session_id
+          AND q.category = p.category
+          AND md5(q.value) = md5(p.value)
+          AND (q.created_at, q.id) < (p.created_at, p.id)
+        """
+    )
+    op.execute(
+        """
+        UPDATE sessions AS s
+        SET preference_count = c.n
+        FROM (
+            SELECT s2.id, count(p.id) AS n
+            FROM sessions AS s2
+            LEFT JOIN preferences AS p ON p.session_id = s2.id
+            GROUP BY s2.id
+        ) AS c
+        WHERE s.id = c.id AND s.preference_count <> c.n
+        """
+    )
+
+    # Conflict target of the preference upsert; hashed so long values fit
+    op.create_index(
+        "uq_preferences_session_category_value",
+        "preferences",
+        ["session_id", "category", sa.text("md5(value)")],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("uq_preferences_session_category_value", table_name="preferences")
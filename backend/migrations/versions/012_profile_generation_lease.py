@@ -0,0 +1,29 @@
+"""Add a profile generation lease to sessions
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-17
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "012"
+down_revision: Union[str, None] = "011"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Replaces the transaction-scoped advisory lock, which kept a pooled
+    # connection checked out for the whole generation
+    op.add_column(
+        "sessions",
+        sa.Column("profile_generating_until", sa.DateTime(timezone=True), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("sessions", "profile_generating_until")
@@ -0,0 +1,42 @@
+"""Mark transcripts whose parse result has been applied
+
+Revision ID: 013
+Revises: 012
+Create Date: 2026-10-17
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "013"
+down_revision: Union[str, None] = "012"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "transcripts",
+        sa.Column("applied_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    # Everything but the transcripts still waiting on a parse job has had
+    # its result applied already
+    op.execute(
+        """
+        UPDATE transcripts AS t
+        SET applied_at = t.uploaded_at
+        WHERE NOT EXISTS (
+            SELECT 1
+            FROM jobs AS j
+            WHERE j.kind = 'parse_transcript'
+              AND j.status IN ('queued', 'running')
+              AND j.payload ->> 'transcript_id' = t.id::text
+        )
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("transcripts", "applied_at")
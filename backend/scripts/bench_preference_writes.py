@@ -0,0 +1,93 @@
+"""
+Microbenchmark: preference writes, per-object ORM adds vs the bulk upsert.
+
+Writes batches of preferences the way a detailed transcript produces them,
+once with ``db.add(Preference(...))`` per row (the previous write path) and
+once through ``add_preferences`` (one multi-row ``INSERT ... ON CONFLICT``),
+and prints rows/sec for each. Every batch runs in a transaction against a
+throwaway session that is rolled back, so the database is left untouched.
+
+Run from ``backend/`` against the configured DATABASE_URL:
+
+    python -m scripts.bench_preference_writes --rows 40 --batches 50
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+from typing import Any
+
+from app.core.database import async_session, engine
+from app.models.preference import Preference
+from app.models.session import Session
+from app.sessions.service import add_preferences
+
+_CONFIDENCES = ("high", "medium", "low")
+
+
+def _preferences(rows: int) -> list[dict[str, Any]]:
+    return [
+        {
+            "category": f"category_{i % 12}",
+            "value": f"preference value {i} with some typical descriptive text",
+            "confidence": _CONFIDENCES[i % 3],
+        }
+        for i in range(rows)
+    ]
+
+
+async def _row_by_row(session_id: uuid.UUID, preferences: list[dict[str, Any]], db) -> None:
+    for pref in preferences:
+        db.add(
+            Preference(
+                session_id=session_id,
+                category=pref["category"],
+                value=pref["value"],
+                confidence=pref["confidence"],
+                source="transcript",
+            )
+        )
+    await db.flush()
+
+
+async def _bulk(session_id: uuid.UUID, preferences: list[dict[str, Any]], db) -> None:
+    await add_preferences(db, session_id, preferences, source="transcript")
+
+
+async def _measure(write, rows: int, batches: int) -> float:
+    """Rows/sec for ``batches`` batches of ``rows`` preferences each."""
+    preferences = _preferences(rows)
+    elapsed = 0.0
+    for _ in range(batches):
+        async with async_session() as db:
+            session = Session(buyer_name="bench")
+            db.add(session)
+            await db.flush()
+            start = time.perf_counter()
+            await write(session.id, preferences, db)
+            elapsed += time.perf_counter() - start
+            await db.rollback()
+    return rows * batches / elapsed
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=40, help="preferences per batch")
+    parser.add_argument("--batches", type=int, default=50)
+    args = parser.parse_args()
+
+    # Warm the connection pool and statement caches before timing
+    await _measure(_row_by_row, args.rows, 2)
+    await _measure(_bulk, args.rows, 2)
+
+    before = await _measure(_row_by_row, args.rows, args.batches)
+    after = await _measure(_bulk, args.rows, args.batches)
+    print(f"{args.rows} rows x {args.batches} batches")
+    print(f"  row-by-row ORM add: {before:>10,.0f} rows/sec")
+    print(f"  bulk upsert:        {after:>10,.0f} rows/sec  ({after / before:.1f}x)")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
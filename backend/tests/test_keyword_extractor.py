@@ -0,0 +1,70 @@
+import pytest
+
+from app.agents.keyword_extractor import extract_keyword_preferences
+
+
+def _found(text: str) -> set[tuple[str, str, str]]:
+    return {(p["category"], p["value"], p["confidence"]) for p in extract_keyword_preferences(text)}
+
+
+@pytest.mark.parametrize(
+    ("text", "expected"),
+    [
+        ("Our budget is around $500k.", {("budget", "around $500k", "high")}),
+        ("We can spend between 400k and 450k.", {("budget", "between 400k-450k", "high")}),
+        ("We need at least 3 bedrooms.", {("bedrooms", "at least 3 bedrooms", "high")}),
+        ("Two and a half baths would work.", {("bathrooms", "2.5 bathrooms", "high")}),
+        ("Maybe a condo.", {("property_type", "condo", "low")}),
+        ("A townhouse could work.", {("property_type", "townhouse", "medium")}),
+        ("We want to live in Austin.", {("location", "Austin", "medium")}),
+        (
+            "My commute has to be under 30 minutes.",
+            {("commute", "commute under 30 minutes", "high")},
+        ),
+        ("Good schools matter.", {("schools", "good schools", "high")}),
+        ("We have two dogs and a cat.", {("pets", "pet-friendly (cat, dog)", "medium")}),
+    ],
+)
+def test_extracts_category(text: str, expected: set) -> None:
+    assert _found(text) == expected
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        # A year next to a budget word is a date, not a price
+        "Our budget is around $500k and we want to move by 2025.",
+        "We were pre-approved in 2024 for $500k.",
+    ],
+)
+def test_years_are_not_budgets(text: str) -> None:
+    budgets = {v for c, v, _ in _found(text) if c == "budget"}
+    assert budgets and not any(v.strip("$").startswith(("19", "20")) for v in budgets)
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "We saw 3 houses last week.",
+        "I called the office at 10 to confirm.",
+        "We moved here in 2019.",
+    ],
+)
+def test_bare_numbers_are_not_budgets(text: str) -> None:
+    assert not any(c == "budget" for c, _, _ in _found(text))
+
+
+def test_counts_are_not_budgets() -> None:
+    found = _found("Our budget covers 3 bedrooms.")
+    assert ("bedrooms", "3 bedrooms", "high") in found
+    assert not any(c == "budget" for c, _, _ in found)
+
+
+def test_only_buyer_turns_are_scanned() -> None:
+    text = "Agent: Most people here want 4 bedrooms.\nBuyer: We need 3 bedrooms."
+    assert _found(text) == {("bedrooms", "3 bedrooms", "high")}
+
+
+def test_duplicates_keep_the_highest_confidence() -> None:
+    text = "Maybe 3 bedrooms. Actually we need 3 bedrooms."
+    assert _found(text) == {("bedrooms", "3 bedrooms", "high")}
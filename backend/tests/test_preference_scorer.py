@@ -0,0 +1,105 @@
+import pytest
+
+from app.agents.preference_scorer import build_local_profile, score_preference
+from app.agents.profile_generator import preference_hash, refresh_profile_locally
+
+
+def _pref(category: str, value: str, confidence: str = "medium", **extra) -> dict:
+    return {"category": category, "value": value, "confidence": confidence, **extra}
+
+
+@pytest.mark.parametrize(
+    ("preference", "expected"),
+    [
+        # confidence base + category weight
+        (_pref("style", "modern", "high"), 6),
+        (_pref("bedrooms", "3 bedrooms", "medium"), 6),
+        (_pref("garden", "a garden", "low"), 3),
+        # corroboration and confirmation add a point each
+        (_pref("garden", "a garden", "medium", source="both", is_confirmed=True), 7),
+        # wording bands
+        (_pref("garage", "must have a garage", "low"), 9),
+        (_pref("garage", "a garage is really important", "medium"), 7),
+        (_pref("pool", "maybe a pool", "high"), 3),
+        (_pref("pool", "ideally a pool", "high"), 6),
+        # clamped to 1..10
+        (
+            _pref(
+                "deal_breakers",
+                "no HOA, non-negotiable",
+                "high",
+                source="both",
+                is_confirmed=True,
+            ),
+            10,
+        ),
+        (_pref("nice_to_haves", "maybe a view", "low"), 1),
+    ],
+)
+def test_score_preference(preference: dict, expected: int) -> None:
+    assert score_preference(preference)["score"] == expected
+
+
+def test_score_preference_explains_score() -> None:
+    entry = score_preference(_pref("garage", "must have a garage", "low"))
+    assert entry["notes"] == "Scored locally: low confidence, firm wording"
+    assert "preference_hash" not in entry
+
+
+@pytest.mark.parametrize(
+    ("values", "readiness"),
+    [
+        (["3 bedrooms"], "exploring"),
+        (["relocating in June"], "ready_to_buy"),
+        (["must have 3 bedrooms", "must have a garage", "must be near schools"], "active"),
+    ],
+)
+def test_build_local_profile_readiness(values: list[str], readiness: str) -> None:
+    preferences = [_pref("budget", "$500k", "high")] + [_pref("home", v) for v in values]
+    assert build_local_profile(preferences)["overall_readiness"] == readiness
+
+
+def test_build_local_profile_lists() -> None:
+    profile = build_local_profile(
+        [
+            _pref("budget", "under $500k", "high"),
+            _pref("garage", "must have a garage"),
+            _pref("nice_to_haves", "a view"),
+        ]
+    )
+    assert profile["budget_summary"] == "under $500k"
+    assert "Garage: must have a garage" in profile["deal_breakers"]
+    assert profile["nice_to_haves"] == ["Nice to haves: a view"]
+
+
+def test_build_local_profile_empty() -> None:
+    profile = build_local_profile([])
+    assert profile["scored_preferences"] == []
+    assert profile["profile_summary"] == "No preferences captured yet."
+
+
+def test_refresh_profile_locally_keeps_model_scores() -> None:
+    kept = _pref("bedrooms", "3 bedrooms", "high")
+    new = _pref("yard", "big yard", "low")
+    model_entry = {
+        "category": "bedrooms",
+        "value": "3 bedrooms",
+        "score": 8,
+        "confidence": "high",
+        "notes": "from the model",
+        "preference_hash": preference_hash(kept),
+    }
+    previous = {"scored_preferences": [model_entry], "profile_summary": "model summary"}
+
+    profile = refresh_profile_locally([kept, new], previous)
+
+    assert profile["profile_summary"] == "model summary"
+    assert profile["scored_preferences"][0] == model_entry
+    # Untagged, so the next full run sends only this one to the model
+    assert "preference_hash" not in profile["scored_preferences"][1]
+    assert profile["scored_preferences"][1]["category"] == "yard"
+
+
+def test_refresh_profile_locally_without_model_scores() -> None:
+    preferences = [_pref("bedrooms", "3 bedrooms", "high")]
+    assert refresh_profile_locally(preferences, None) == build_local_profile(preferences)
@@ -0,0 +1,183 @@
+"""
+Merge rules of the preference upsert. Needs the Postgres database from
+DATABASE_URL, migrated to head; skipped when it is unreachable. Every test
+runs in a transaction that is rolled back.
+"""
+
+import uuid
+from collections.abc import AsyncIterator
+
+import pytest
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.database import async_session, engine
+from app.models.preference import Preference
+from app.models.session import Session
+from app.sessions.service import add_preferences, merge_chat_preferences
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def anyio_backend() -> str:
+    return "asyncio"
+
+
+@pytest.fixture
+async def db() -> AsyncIterator[AsyncSession]:
+    async with async_session() as db:
+        try:
+            await db.connection()
+        except OSError as exc:
+            pytest.skip(f"Postgres unavailable: {exc}")
+        yield db
+        await db.rollback()
+    # Pooled connections belong to this test's event loop
+    await engine.dispose()
+
+
+async def _session(db: AsyncSession) -> uuid.UUID:
+    session = Session(buyer_name="test")
+    db.add(session)
+    await db.flush()
+    return session.id
+
+
+async def _rows(db: AsyncSession, session_id: uuid.UUID) -> set[tuple[str, str, str, str]]:
+    # Columns, not entities: the upsert does not refresh loaded objects
+    result = await db.exec(
+        select(
+            Preference.category, Preference.value, Preference.confidence, Preference.source
+        ).where(Preference.session_id == session_id)  # type: ignore[arg-type]
+    )
+    return set(result.all())
+
+
+async def _count(db: AsyncSession, session_id: uuid.UUID) -> int:
+    result = await db.exec(
+        select(Session.preference_count).where(Session.id == session_id)  # type: ignore[arg-type]
+    )
+    return result.one()
+
+
+def _pref(category: str, value: str, confidence: str) -> dict:
+    return {"category": category, "value": value, "confidence": confidence}
+
+
+async def test_inserts_new_rows_and_counts_them(db: AsyncSession) -> None:
+    session_id = await _session(db)
+    added = await add_preferences(
+        db,
+        session_id,
+        [_pref("bedrooms", "3 bedrooms", "high"), _pref("budget", "$500k", "medium")],
+        source="transcript",
+    )
+    assert added == 2
+    assert await _count(db, session_id) == 2
+    assert await _rows(db, session_id) == {
+        ("bedrooms", "3 bedrooms", "high", "transcript"),
+        ("budget", "$500k", "medium", "transcript"),
+    }
+
+
+async def test_repeats_in_one_batch_keep_the_highest_confidence(db: AsyncSession) -> None:
+    session_id = await _session(db)
+    added = await add_preferences(
+        db,
+        session_id,
+        [_pref("yard", "big yard", "low"), _pref("yard", "big yard", "high")],
+        source="chat",
+    )
+    assert added == 1
+    assert await _rows(db, session_id) == {("yard", "big yard", "high", "chat")}
+
+
+@pytest.mark.parametrize(
+    ("first", "second", "expected"),
+    [
+        # confidence only ever goes up
+        (("medium", "transcript"), ("high", "transcript"), ("high", "transcript")),
+        (("high", "transcript"), ("low", "transcript"), ("high", "transcript")),
+        # a second source makes it "both", and "both" stays
+        (("medium", "transcript"), ("medium", "chat"), ("medium", "both")),
+        (("low", "chat"), ("high", "transcript"), ("high", "both")),
+    ],
+)
+async def test_conflicts_merge(
+    db: AsyncSession,
+    first: tuple[str, str],
+    second: tuple[str, str],
+    expected: tuple[str, str],
+) -> None:
+    session_id = await _session(db)
+    await add_preferences(db, session_id, [_pref("pool", "a pool", first[0])], source=first[1])
+    added = await add_preferences(
+        db, session_id, [_pref("pool", "a pool", second[0])], source=second[1]
+    )
+    assert added == 0
+    assert await _count(db, session_id) == 1
+    assert await _rows(db, session_id) == {("pool", "a pool", *expected)}
+
+
+async def test_value_and_category_are_both_part_of_the_key(db: AsyncSession) -> None:
+    session_id = await _session(db)
+    await add_preferences(db, session_id, [_pref("pool", "a pool", "low")], source="chat")
+    added = await add_preferences(
+        db,
+        session_id,
+        [_pref("pool", "an indoor pool", "low"), _pref("amenities", "a pool", "low")],
+        source="chat",
+    )
+    assert added == 2
+    assert await _count(db, session_id) == 3
+
+
+async def _known(db: AsyncSession, session_id: uuid.UUID) -> list[Preference]:
+    result = await db.exec(
+        select(Preference)
+        .where(Preference.session_id == session_id)  # type: ignore[arg-type]
+        .order_by(Preference.category)  # type: ignore[arg-type]
+    )
+    return list(result.all())
+
+
+async def test_chat_merges_into_known_rows_through_the_upsert(db: AsyncSession) -> None:
+    session_id = await _session(db)
+    await add_preferences(
+        db,
+        session_id,
+        [_pref("bedrooms", "3 bedrooms", "medium"), _pref("pool", "a pool", "low")],
+        source="transcript",
+    )
+    known = await _known(db, session_id)
+    changed = await merge_chat_preferences(
+        db,
+        session_id,
+        known,
+        [
+            # by the extractor's reference, with the value reworded
+            {"category": "bedrooms", "value": "three beds", "confidence": "high", "existing": 0},
+            # by category and value, differently cased and spaced
+            {"category": "Pool", "value": "A  pool", "confidence": "low"},
+            {"category": "garage", "value": "2-car garage", "confidence": "medium"},
+        ],
+    )
+    assert changed == 3
+    assert await _count(db, session_id) == 3
+    assert await _rows(db, session_id) == {
+        ("bedrooms", "3 bedrooms", "high", "both"),
+        ("pool", "a pool", "low", "both"),
+        ("garage", "2-car garage", "medium", "chat"),
+    }
+
+
+async def test_chat_restating_a_merged_row_changes_nothing(db: AsyncSession) -> None:
+    session_id = await _session(db)
+    await add_preferences(db, session_id, [_pref("pool", "a pool", "high")], source="both")
+    known = await _known(db, session_id)
+    changed = await merge_chat_preferences(
+        db, session_id, known, [{"category": "pool", "value": "a pool", "confidence": "low"}]
+    )
+    assert changed == 0
+    assert await _rows(db, session_id) == {("pool", "a pool", "high", "both")}
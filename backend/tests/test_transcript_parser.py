@@ -0,0 +1,84 @@
+import pytest
+
+from app.agents import transcript_parser
+from app.agents.transcript_parser import ExtractedPreference, TranscriptParseResult
+from app.core.config import settings
+
+pytestmark = pytest.mark.anyio
+
+# One chunk per turn at the chunk size set below
+TRANSCRIPT = "\n".join(f"Buyer: We need feature number {i} in the house." for i in range(1, 7))
+
+
+@pytest.fixture
+def anyio_backend() -> str:
+    return "asyncio"
+
+
+@pytest.fixture(autouse=True)
+def chunked(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "transcript_chunk_chars", 60)
+    monkeypatch.setattr(settings, "transcript_chunk_overlap_turns", 0)
+    monkeypatch.setattr(transcript_parser, "get_client", lambda: None)
+
+
+def _fake_extract(failing: set[int]):
+    async def extract(client, text: str, chunk_note: str = "") -> TranscriptParseResult:
+        number = int(text.split("number ")[1].split()[0])
+        if number in failing:
+            raise TimeoutError("chunk timed out")
+        return TranscriptParseResult(
+            preferences=[
+                ExtractedPreference(category="feature", value=f"#{number}", confidence="high")
+            ],
+            summary=f"Part {number}.",
+        )
+
+    return extract
+
+
+async def _join(client, summaries: list[str]) -> str:
+    return " ".join(summaries)
+
+
+async def _fail(client, summaries: list[str]) -> str:
+    raise TimeoutError("reduce timed out")
+
+
+def _values(result: dict) -> list[str]:
+    return sorted(p["value"] for p in result["preferences"])
+
+
+async def test_all_chunks_parsed(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(transcript_parser, "_extract", _fake_extract(set()))
+    monkeypatch.setattr(transcript_parser, "_reduce_summaries", _join)
+    result = await transcript_parser._parse(TRANSCRIPT)
+    assert _values(result) == [f"#{i}" for i in range(1, 7)]
+    assert "partial" not in result
+    assert "degraded" not in result
+
+
+async def test_failed_chunks_flag_the_result_partial(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(transcript_parser, "_extract", _fake_extract({2, 4, 6}))
+    monkeypatch.setattr(transcript_parser, "_reduce_summaries", _join)
+    result = await transcript_parser._parse(TRANSCRIPT)
+    assert _values(result) == ["#1", "#3", "#5"]
+    assert result["summary"] == "Part 1. Part 3. Part 5."
+    assert result["partial"] is True
+    assert "degraded" not in result
+
+
+async def test_failed_reduce_joins_chunk_summaries(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(transcript_parser, "_extract", _fake_extract(set()))
+    monkeypatch.setattr(transcript_parser, "_reduce_summaries", _fail)
+    result = await transcript_parser._parse(TRANSCRIPT)
+    assert _values(result) == [f"#{i}" for i in range(1, 7)]
+    assert result["summary"] == " ".join(f"Part {i}." for i in range(1, 7))
+    assert result["partial"] is True
+
+
+async def test_every_chunk_failed_falls_back_to_keywords(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(transcript_parser, "_extract", _fake_extract(set(range(1, 7))))
+    result = await transcript_parser._parse(TRANSCRIPT)
+    assert result["degraded"] is True
+    assert result["summary"] == ""
@@ -0,0 +1,78 @@
+import pytest
+
+from app.agents.transcript_preprocessor import estimate_text_tokens, preprocess_transcript
+
+
+@pytest.mark.parametrize(
+    ("raw", "expected"),
+    [
+        # disfluencies go, hedges stay: they set the preference's confidence
+        ("Buyer: Um, I sort of want a pool.", "Buyer: I sort of want a pool."),
+        ("Buyer: Uh we kinda need a yard, you know.", "Buyer: we kinda need a yard, you know."),
+        ("Buyer: Hmm, I mean, mm-hmm, 3 bedrooms.", "Buyer: I mean 3 bedrooms."),
+        # repeated words
+        ("Buyer: We we need a a garage.", "Buyer: We need a garage."),
+        # recording boilerplate
+        (
+            "This call is being recorded.\nBuyer: 3 bedrooms [inaudible] please.",
+            "Buyer: 3 bedrooms please.",
+        ),
+        # consecutive turns by one speaker are merged; all-caps labels title-cased
+        (
+            "SAM LEE: We need 3 bedrooms.\nSam Lee: And a garage.",
+            "Sam Lee: We need 3 bedrooms. And a garage.",
+        ),
+        # short small talk is dropped, short answers are kept
+        (
+            "Agent: Hi, how are you?\nBuyer: Good, thanks!\nAgent: Budget?\nBuyer: Yes.",
+            "Agent: Budget?\nBuyer: Yes.",
+        ),
+    ],
+)
+def test_cleanup(raw: str, expected: str) -> None:
+    assert preprocess_transcript(raw).text == expected
+
+
+@pytest.mark.parametrize(
+    ("raw", "expected"),
+    [
+        # clock times in speech are schedule and commute constraints
+        (
+            "Buyer: I have to be at work by 8:30 so the commute matters. School starts at 7:45.",
+            "Buyer: I have to be at work by 8:30 so the commute matters. School starts at 7:45.",
+        ),
+        # caption timestamps at the start of a line or next to the label
+        ("[00:01:02] Agent: Budget?\nBuyer (00:01:05): $500k.", "Agent: Budget?\nBuyer: $500k."),
+        ("00:01:02 - Agent: Budget?\nBuyer [01:05]: $500k.", "Agent: Budget?\nBuyer: $500k."),
+        ("Agent: [00:01:02] Budget?\nBuyer: (01:05) $500k.", "Agent: Budget?\nBuyer: $500k."),
+    ],
+)
+def test_timestamps(raw: str, expected: str) -> None:
+    assert preprocess_transcript(raw).text == expected
+
+
+def test_webvtt_captions() -> None:
+    raw = (
+        "WEBVTT\n\n"
+        "1\n00:00:01.000 --> 00:00:04.000\nBuyer: We need 3 bedrooms\n\n"
+        "2\n00:00:04.000 --> 00:00:06.000\nBuyer: under $500k.\n"
+    )
+    assert preprocess_transcript(raw).text == "Buyer: We need 3 bedrooms under $500k."
+
+
+def test_otter_headers() -> None:
+    raw = "Agent  0:03\nWhat is your budget?\n\nBuyer  0:07\nAround $500k.\n"
+    assert preprocess_transcript(raw).text == "Agent: What is your budget?\nBuyer: Around $500k."
+
+
+def test_everything_dropped_falls_back_to_raw_text() -> None:
+    raw = "Agent: Hi!\nBuyer: Hello!"
+    assert preprocess_transcript(raw).text == raw
+
+
+def test_token_counts() -> None:
+    raw = "Buyer: Um, um, um, we need 3 bedrooms. " * 10
+    result = preprocess_transcript(raw)
+    assert result.tokens_before == estimate_text_tokens(raw)
+    assert result.tokens_after == estimate_text_tokens(result.text)
+    assert result.tokens_after < result.tokens_before
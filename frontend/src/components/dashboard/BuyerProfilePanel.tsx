@@ -113,6 +113,8 @@ export function BuyerProfilePanel({ session }: BuyerProfilePanelProps) {
     },
     enabled: isComplete,
     retry: 2,
+    // Usually seeded by the session bundle; only a generation changes it
+    staleTime: 60_000,
   });
 
   /* generate profile mutation */
@@ -1,5 +1,5 @@
 import { Link } from "@tanstack/react-router";
-import { ChevronRight } from "lucide-react";
+import { ChevronRight, ListChecks, MessageSquare } from "lucide-react";
 import type { SessionData } from "@/lib/api";
 import { StatusBadge } from "./StatusBadge";
 import { ConfidenceBar } from "./ConfidenceBar";
@@ -9,7 +9,7 @@ interface SessionCardProps {
 }
 
 export function SessionCard({ session }: SessionCardProps) {
-  const timeAgo = getRelativeTime(session.created_at);
+  const timeAgo = getRelativeTime(session.last_activity_at);
 
   return (
     <Link
@@ -49,6 +49,17 @@ export function SessionCard({ session }: SessionCardProps) {
         </p>
       )}
 
+      <div className="flex items-center gap-4 pl-12 mb-3 text-xs text-muted-foreground/70">
+        <span className="flex items-center gap-1">
+          <ListChecks className="h-3.5 w-3.5" />
+          {session.preference_count} preference{session.preference_count === 1 ? "" : "s"}
+        </span>
+        <span className="flex items-center gap-1">
+          <MessageSquare className="h-3.5 w-3.5" />
+          {session.message_count} message{session.message_count === 1 ? "" : "s"}
+        </span>
+      </div>
+
       {session.overall_confidence != null && (
         <div className="pl-12">
           <ConfidenceBar value={session.overall_confidence} />
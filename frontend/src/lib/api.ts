@@ -34,10 +34,52 @@ export interface SessionData {
   summary: string | null;
   status: "parsing" | "parsed" | "chat_active" | "complete";
   overall_confidence: number | null;
+  message_count: number;
+  preference_count: number;
   created_at: string;
   updated_at: string;
+  last_activity_at: string;
 }
 
+export interface SessionPage {
+  items: SessionData[];
+  // Pass back as `cursor` for the next page; null on the last page
+  next_cursor: string | null;
+}
+
+export interface SessionListParams {
+  cursor?: string;
+  limit?: number;
+  status?: SessionData["status"];
+  buyer?: string;
+  created_from?: string;
+  created_to?: string;
+}
+
+export type BundleField = "session" | "preferences" | "profile" | "messages";
+
+// Sections are present only when requested via `fields`
+export interface SessionBundle {
+  session?: SessionData;
+  preferences?: PreferenceData[];
+  profile?: BuyerProfileData | null;
+  messages?: ChatMessageData[];
+  has_more_messages?: boolean;
+}
+
+// Pushed by GET /sessions/{id}/events
+export type SessionEvent =
+  | {
+      type: "snapshot";
+      status: SessionData["status"];
+      preferences: number;
+      has_profile: boolean;
+    }
+  | { type: "status"; status: SessionData["status"] }
+  | { type: "preferences"; count: number }
+  | { type: "profile_ready"; generated_at: string }
+  | { type: "resync" };
+
 export interface PreferenceData {
   id: string;
   category: string;
@@ -47,6 +89,9 @@ export interface PreferenceData {
   is_confirmed: boolean;
 }
 
+// Keyword-extracted preview returned while the transcript is parsed
+export type DraftPreferenceData = Pick<PreferenceData, "category" | "value" | "confidence">;
+
 export interface ChatMessageData {
   id: string;
   role: "user" | "assistant";
@@ -54,6 +99,8 @@ export interface ChatMessageData {
   strategy_used: string | null;
   turn_number: number;
   created_at: string;
+  // Assistant reply cut short because the client went away
+  is_interrupted?: boolean;
 }
 
 export interface ScoredPreference {
@@ -82,10 +129,23 @@ export interface BuyerProfileData {
 
 export const api = {
   sessions: {
-    list: () => request<SessionData[]>("/sessions"),
+    list: (params: SessionListParams = {}) => {
+      const query = new URLSearchParams();
+      for (const [key, value] of Object.entries(params)) {
+        if (value !== undefined && value !== "") query.set(key, String(value));
+      }
+      const qs = query.toString();
+      return request<SessionPage>(`/sessions${qs ? `?${qs}` : ""}`);
+    },
 
     get: (id: string) => request<SessionData>(`/sessions/${id}`),
 
+    getBundle: (id: string, fields: BundleField[], messagesLimit?: number) => {
+      const query = new URLSearchParams({ fields: fields.join(",") });
+      if (messagesLimit !== undefined) query.set("messages_limit", String(messagesLimit));
+      return request<SessionBundle>(`/sessions/${id}/bundle?${query}`);
+    },
+
     create: (buyer_name?: string) =>
       request<SessionData>("/sessions", {
         method: "POST",
@@ -93,7 +153,13 @@ export const api = {
       }),
 
     uploadTranscript: (sessionId: string, raw_text: string) =>
-      request<{ transcript_id: string; session_id: string; status: string }>(
+      request<{
+        transcript_id: string;
+        session_id: string;
+        job_id: string;
+        status: string;
+        draft_preferences?: DraftPreferenceData[];
+      }>(
         `/sessions/${sessionId}/transcript`,
         {
           method: "POST",
@@ -101,6 +167,10 @@ export const api = {
         },
       ),
 
+    // Caller closes the returned EventSource; it reconnects on its own
+    events: (sessionId: string) =>
+      new EventSource(`${API_BASE}/sessions/${sessionId}/events`),
+
     getPreferences: (sessionId: string) =>
       request<PreferenceData[]>(`/sessions/${sessionId}/preferences`),
 
@@ -23,6 +23,9 @@ export const Route = createFileRoute("/chat/$sessionId")({
 /*  Constants                                                                  */
 /* -------------------------------------------------------------------------- */
 
+// Attempts to resume a dropped reply stream before giving up on it
+const MAX_STREAM_RECONNECTS = 3;
+
 const WELCOME_MESSAGE: ChatMessageData = {
   id: "__welcome__",
   role: "assistant",
@@ -115,6 +118,11 @@ function ChatBubble({ message }: { message: ChatMessageData }) {
         )}
       >
         {message.content}
+        {message.is_interrupted && (
+          <span className="block mt-1 text-xs italic text-muted-foreground">
+            Reply interrupted
+          </span>
+        )}
       </div>
     </motion.div>
   );
@@ -245,8 +253,14 @@ function ChatPage() {
       const controller = new AbortController();
       abortRef.current = controller;
 
+      let accumulated = "";
+      let finalized = false;
+      // Id of the last fully received SSE event, for resuming the stream
+      let lastEventId: string | null = null;
+      let reconnects = 0;
+
       try {
-        const response = await fetch(
+        let response = await fetch(
           `/api/chat/${sessionId}/messages`,
           {
             method: "POST",
@@ -256,66 +270,103 @@ function ChatPage() {
           },
         );
 
-        if (!response.ok) {
-          const text = await response.text();
-          throw new Error(text || `Request failed with status ${response.status}`);
-        }
-
-        if (!response.body) {
-          throw new Error("No response body received");
-        }
-
-        const reader = response.body.getReader();
-        const decoder = new TextDecoder();
-        let buffer = "";
-        let accumulated = "";
-        let finalized = false;
-
         while (true) {
-          const { done, value } = await reader.read();
-          if (done) break;
-
-          buffer += decoder.decode(value, { stream: true });
-          const lines = buffer.split("\n");
-          buffer = lines.pop() || "";
+          if (!response.ok) {
+            const text = await response.text();
+            throw new Error(text || `Request failed with status ${response.status}`);
+          }
 
-          for (const line of lines) {
-            const trimmed = line.trim();
-            if (!trimmed || !trimmed.startsWith("data: ")) continue;
+          if (!response.body) {
+            throw new Error("No response body received");
+          }
 
-            const jsonStr = trimmed.slice(6);
+          const reader = response.body.getReader();
+          const decoder = new TextDecoder();
+          let buffer = "";
+          let pendingId: string | null = null;
+
+          try {
+            while (true) {
+              const { done, value } = await reader.read();
+              if (done) break;
+
+              buffer += decoder.decode(value, { stream: true });
+              const lines = buffer.split("\n");
+              buffer = lines.pop() || "";
+
+              for (const line of lines) {
+                const trimmed = line.trim();
+                if (trimmed.startsWith("id: ")) {
+                  pendingId = trimmed.slice(4);
+                  continue;
+                }
+                if (!trimmed || !trimmed.startsWith("data: ")) continue;
+
+                const jsonStr = trimmed.slice(6);
+
+                // Skip SSE keep-alive or empty data
+                if (!jsonStr || jsonStr === "[DONE]") continue;
+
+                try {
+                  const payload = JSON.parse(jsonStr) as
+                    | { type: "token"; content: string }
+                    | { type: "snapshot"; content: string }
+                    | { type: "done"; message_id: string };
+
+                  if (payload.type === "token") {
+                    accumulated += payload.content;
+                    setStreamingContent(accumulated);
+                  } else if (payload.type === "snapshot") {
+                    // Resumed too far behind to replay token by token
+                    accumulated = payload.content;
+                    setStreamingContent(accumulated);
+                  } else if (payload.type === "done") {
+                    finalized = true;
+                    // Finalize the assistant message
+                    const assistantMessage: ChatMessageData = {
+                      id: payload.message_id,
+                      role: "assistant",
+                      content: accumulated,
+                      strategy_used: null,
+                      turn_number: messages.length + 1,
+                      created_at: new Date().toISOString(),
+                    };
+
+                    setMessages((prev) => [...prev, assistantMessage]);
+                    setStreamingContent("");
+                    setIsStreaming(false);
+                  }
+                } catch {
+                  // Skip malformed JSON lines
+                }
+                if (pendingId) lastEventId = pendingId;
+              }
+            }
+          } catch (err: unknown) {
+            // A dropped connection is resumed below; anything else is fatal
+            if (controller.signal.aborted) throw err;
+          }
 
-            // Skip SSE keep-alive or empty data
-            if (!jsonStr || jsonStr === "[DONE]") continue;
+          if (finalized || !lastEventId) break;
 
+          // Resume the same reply instead of sending the message again
+          let resumed: Response | null = null;
+          while (!resumed && reconnects < MAX_STREAM_RECONNECTS) {
+            reconnects += 1;
+            await new Promise((resolve) => setTimeout(resolve, 500 * reconnects));
             try {
-              const payload = JSON.parse(jsonStr) as
-                | { type: "token"; content: string }
-                | { type: "done"; message_id: string };
-
-              if (payload.type === "token") {
-                accumulated += payload.content;
-                setStreamingContent(accumulated);
-              } else if (payload.type === "done") {
-                finalized = true;
-                // Finalize the assistant message
-                const assistantMessage: ChatMessageData = {
-                  id: payload.message_id,
-                  role: "assistant",
-                  content: accumulated,
-                  strategy_used: null,
-                  turn_number: messages.length + 1,
-                  created_at: new Date().toISOString(),
-                };
-
-                setMessages((prev) => [...prev, assistantMessage]);
-                setStreamingContent("");
-                setIsStreaming(false);
-              }
-            } catch {
-              // Skip malformed JSON lines
+              resumed = await fetch(`/api/chat/${sessionId}/stream`, {
+                headers: { "Last-Event-ID": lastEventId },
+                signal: controller.signal,
+              });
+            } catch (err: unknown) {
+              if (controller.signal.aborted) throw err;
             }
           }
+          // Out of attempts, or the reply is no longer resumable (e.g. it
+          // was served by another worker)
+          if (!resumed || resumed.status === 404) break;
+          response = resumed;
         }
 
         // If the stream ended without a "done" event, finalise anyway
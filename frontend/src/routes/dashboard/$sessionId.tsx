@@ -1,6 +1,6 @@
 import { createFileRoute, Link } from "@tanstack/react-router";
-import { useQuery } from "@tanstack/react-query";
-import { useState } from "react";
+import { useQuery, useQueryClient } from "@tanstack/react-query";
+import { useEffect, useState } from "react";
 import { motion } from "framer-motion";
 import {
   ArrowLeft,
@@ -15,7 +15,12 @@ import {
 } from "lucide-react";
 import { Button } from "@/components/ui/button";
 import { api } from "@/lib/api";
-import type { PreferenceData } from "@/lib/api";
+import type {
+  DraftPreferenceData,
+  PreferenceData,
+  SessionBundle,
+  SessionEvent,
+} from "@/lib/api";
 import { StatusBadge } from "@/components/dashboard/StatusBadge";
 import { PreferenceCard } from "@/components/dashboard/PreferenceCard";
 import { BuyerProfilePanel } from "@/components/dashboard/BuyerProfilePanel";
@@ -37,30 +42,62 @@ function SessionDetailPage() {
   const [copied, setCopied] = useState(false);
   const [activeTab, setActiveTab] = useState<TabId>("preferences");
 
-  const { data: session, isLoading } = useQuery({
-    queryKey: ["sessions", sessionId],
-    queryFn: async () => {
-      const res = await api.sessions.get(sessionId);
-      if (res.error) throw new Error(res.error.message);
-      return res.data!;
-    },
-    refetchInterval: (query) =>
-      query.state.data?.status === "chat_active" ? 5000 : false,
-  });
+  const queryClient = useQueryClient();
 
-  const {
-    data: preferences,
-    isLoading: prefsLoading,
-  } = useQuery({
-    queryKey: ["sessions", sessionId, "preferences"],
+  // Session, preferences and profile in one request
+  const { data: bundle, isLoading } = useQuery({
+    queryKey: ["sessions", sessionId, "bundle"],
     queryFn: async () => {
-      const res = await api.sessions.getPreferences(sessionId);
+      const res = await api.sessions.getBundle(sessionId, [
+        "session",
+        "preferences",
+        "profile",
+      ]);
       if (res.error) throw new Error(res.error.message);
+      // Seed the profile panel's query so it does not fetch again
+      if (res.data!.profile) {
+        queryClient.setQueryData(["sessions", sessionId, "profile"], res.data!.profile);
+      }
       return res.data!;
     },
-    enabled: !!session && session.status !== "parsing",
   });
 
+  // Refetch the bundle only when the server reports a change
+  useEffect(() => {
+    const bundleKey = ["sessions", sessionId, "bundle"];
+    const source = api.sessions.events(sessionId);
+    source.onmessage = (message) => {
+      const event: SessionEvent = JSON.parse(message.data);
+      if (event.type === "snapshot") {
+        // Sent on every (re)connect; skip the refetch if nothing changed
+        // (or if the first load is still in flight)
+        const cached = queryClient.getQueryData<SessionBundle>(bundleKey);
+        if (
+          !cached ||
+          (cached.session?.status === event.status &&
+            cached.preferences?.length === event.preferences &&
+            !!cached.profile === event.has_profile)
+        ) {
+          return;
+        }
+      }
+      // The bundle also re-seeds the profile panel on profile_ready
+      queryClient.invalidateQueries({ queryKey: bundleKey });
+    };
+    return () => source.close();
+  }, [sessionId, queryClient]);
+
+  const session = bundle?.session;
+  const preferences = bundle?.preferences;
+
+  // Keyword-extracted preview stored by the upload page, if any
+  const draftPreferences =
+    queryClient.getQueryData<DraftPreferenceData[]>([
+      "sessions",
+      sessionId,
+      "draft-preferences",
+    ]) ?? [];
+
   const handleCopy = (text: string) => {
     navigator.clipboard.writeText(text);
     setCopied(true);
@@ -189,6 +226,26 @@ function SessionDetailPage() {
           <p className="text-sm text-muted-foreground mt-1.5">
             Extracting preferences, priorities, and buyer signals
           </p>
+          {draftPreferences.length > 0 && (
+            <div className="mt-8 text-left max-w-xl mx-auto">
+              <p className="text-[11px] uppercase tracking-wider text-muted-foreground mb-3">
+                Early signals (draft)
+              </p>
+              <div className="flex flex-wrap gap-2">
+                {draftPreferences.map((pref) => (
+                  <span
+                    key={`${pref.category}:${pref.value}`}
+                    className="text-xs px-2.5 py-1 rounded-full border border-border/40 bg-surface-1 text-foreground/80"
+                  >
+                    <span className="text-muted-foreground capitalize">
+                      {pref.category.replace(/_/g, " ")}:
+                    </span>{" "}
+                    {pref.value}
+                  </span>
+                ))}
+              </div>
+            </div>
+          )}
         </motion.div>
       ) : (
         <>
@@ -244,17 +301,7 @@ function SessionDetailPage() {
                 </motion.div>
               )}
 
-              {prefsLoading ? (
-                <div className="grid grid-cols-1 sm:grid-cols-2 lg:grid-cols-3 gap-3">
-                  {[1, 2, 3, 4, 5, 6].map((i) => (
-                    <div
-                      key={i}
-                      className="h-24 rounded-2xl skeleton-shimmer"
-                      style={{ animationDelay: `${i * 100}ms` }}
-                    />
-                  ))}
-                </div>
-              ) : sortedPreferences.length === 0 ? (
+              {sortedPreferences.length === 0 ? (
                 <div className="rounded-2xl bg-surface-2 border border-border/40 p-8 text-center">
                   <Sparkles className="h-6 w-6 text-muted-foreground/40 mx-auto mb-2" />
                   <p className="text-sm text-muted-foreground">
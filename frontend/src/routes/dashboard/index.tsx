@@ -1,25 +1,55 @@
 import { createFileRoute, Link } from "@tanstack/react-router";
-import { useQuery } from "@tanstack/react-query";
+import { useInfiniteQuery } from "@tanstack/react-query";
+import { useState } from "react";
 import { motion } from "framer-motion";
-import { Plus, Home, Sparkles } from "lucide-react";
+import { Plus, Home, Sparkles, Search, Loader2 } from "lucide-react";
 import { Button } from "@/components/ui/button";
+import { Input } from "@/components/ui/input";
 import { api } from "@/lib/api";
+import type { SessionData } from "@/lib/api";
 import { SessionCard } from "@/components/dashboard/SessionCard";
 
 export const Route = createFileRoute("/dashboard/")({
   component: SessionListPage,
 });
 
+const statusFilters: { value: SessionData["status"] | undefined; label: string }[] = [
+  { value: undefined, label: "All" },
+  { value: "parsing", label: "Parsing" },
+  { value: "parsed", label: "Ready" },
+  { value: "chat_active", label: "Live Chat" },
+  { value: "complete", label: "Complete" },
+];
+
 function SessionListPage() {
-  const { data, isLoading } = useQuery({
-    queryKey: ["sessions"],
-    queryFn: async () => {
-      const res = await api.sessions.list();
+  const [status, setStatus] = useState<SessionData["status"] | undefined>();
+  const [buyer, setBuyer] = useState("");
+  const buyerPrefix = buyer.trim();
+
+  const {
+    data: pages,
+    isLoading,
+    fetchNextPage,
+    hasNextPage,
+    isFetchingNextPage,
+  } = useInfiniteQuery({
+    queryKey: ["sessions", "list", { status, buyer: buyerPrefix }],
+    queryFn: async ({ pageParam }) => {
+      const res = await api.sessions.list({
+        cursor: pageParam,
+        status,
+        buyer: buyerPrefix,
+      });
       if (res.error) throw new Error(res.error.message);
       return res.data!;
     },
+    initialPageParam: undefined as string | undefined,
+    getNextPageParam: (lastPage) => lastPage.next_cursor ?? undefined,
   });
 
+  const data = pages?.pages.flatMap((page) => page.items);
+  const filtered = status !== undefined || buyerPrefix !== "";
+
   return (
     <div className="px-8 py-8 max-w-5xl">
       {/* Header */}
@@ -28,7 +58,9 @@ function SessionListPage() {
           <h1 className="font-serif text-2xl tracking-tight">Sessions</h1>
           <p className="text-sm text-muted-foreground mt-1">
             {data && data.length > 0
-              ? `${data.length} buyer ${data.length === 1 ? "session" : "sessions"}`
+              ? `${data.length}${hasNextPage ? "+" : ""} buyer ${
+                  data.length === 1 && !hasNextPage ? "session" : "sessions"
+                }`
               : "Manage your buyer conversations"}
           </p>
         </div>
@@ -40,6 +72,34 @@ function SessionListPage() {
         </Link>
       </div>
 
+      {/* Filters */}
+      <div className="flex flex-wrap items-center gap-3 mb-6">
+        <div className="relative w-64">
+          <Search className="absolute left-3 top-1/2 -translate-y-1/2 h-4 w-4 text-muted-foreground" />
+          <Input
+            value={buyer}
+            onChange={(e) => setBuyer(e.target.value)}
+            placeholder="Search buyer name..."
+            className="pl-9 rounded-xl"
+          />
+        </div>
+        <div className="flex items-center gap-1">
+          {statusFilters.map((filter) => (
+            <button
+              key={filter.label}
+              onClick={() => setStatus(filter.value)}
+              className={`text-xs px-3 py-1.5 rounded-full border transition-colors duration-200 ${
+                status === filter.value
+                  ? "bg-navy text-primary-foreground border-navy"
+                  : "border-border/40 text-muted-foreground hover:text-foreground"
+              }`}
+            >
+              {filter.label}
+            </button>
+          ))}
+        </div>
+      </div>
+
       {isLoading ? (
         <div className="space-y-3">
           {[1, 2, 3].map((i) => (
@@ -74,7 +134,24 @@ function SessionListPage() {
               <SessionCard session={session} />
             </motion.div>
           ))}
+          {hasNextPage && (
+            <div className="flex justify-center pt-3">
+              <Button
+                variant="outline"
+                className="rounded-xl gap-2"
+                onClick={() => fetchNextPage()}
+                disabled={isFetchingNextPage}
+              >
+                {isFetchingNextPage && <Loader2 className="h-4 w-4 animate-spin" />}
+                Load more
+              </Button>
+            </div>
+          )}
         </motion.div>
+      ) : filtered ? (
+        <p className="text-sm text-muted-foreground py-16 text-center">
+          No sessions match these filters.
+        </p>
       ) : (
         <EmptyState />
       )}
@@ -37,6 +37,12 @@ function NewSessionPage() {
       );
       if (transcriptRes.error) throw new Error(transcriptRes.error.message);
 
+      // Shown on the session page until the full parse finishes
+      queryClient.setQueryData(
+        ["sessions", session.id, "draft-preferences"],
+        transcriptRes.data?.draft_preferences ?? [],
+      );
+
       return session.id;
     },
     onSuccess: (sessionId) => {